@@ -3,11 +3,96 @@
 # Don't forget to add your pipeline to the ITEM_PIPELINES setting
 # See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 
+import logging
+from pymongo import MongoClient, UpdateOne
+from twisted.internet import defer
+from twisted.internet.threads import deferToThread
 
-# useful for handling different item types with a single interface
-from itemadapter import ItemAdapter
+logger = logging.getLogger(__name__)
 
 
-class MarksandspencerPipeline:
+class MongoPipeline:
+    """Buffers upserts and flushes them with bulk_write on the reactor thread pool
+
+    process_item never touches Mongo itself. Every MONGO_BATCH_SIZE items the
+    buffer goes to a worker thread; once MONGO_MAX_PENDING_FLUSHES batches are
+    in flight, process_item hands Scrapy a Deferred that only fires when one of
+    them finishes, which holds back the item flow instead of the reactor.
+    """
+
+    def __init__(self, mongo_uri, mongo_db, mongo_collection, batch_size=100, max_pending=4):
+        self.mongo_uri = mongo_uri
+        self.mongo_db = mongo_db
+        self.mongo_collection = mongo_collection
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            mongo_uri=crawler.settings.get("MONGO_URI"),
+            mongo_db=crawler.settings.get("MONGO_DATABASE", "marksandspencer_scrapy"),
+            mongo_collection=crawler.settings.get("MONGO_COLLECTION", "products"),
+            batch_size=crawler.settings.getint("MONGO_BATCH_SIZE", 100),
+            max_pending=crawler.settings.getint("MONGO_MAX_PENDING_FLUSHES", 4),
+        )
+
+    def open_spider(self, spider):
+        self.client = MongoClient(self.mongo_uri)
+        self.db = self.client[self.mongo_db]
+        self.collection = self.db[self.mongo_collection]
+
+        self.buffer = []
+        self.pending = set()
+        self.waiting = []
+        self.stats = {"written": 0, "failed": 0, "flushes": 0}
+
     def process_item(self, item, spider):
-        return item
+        # Upsert by product page url, unique_id is not always on the page
+        doc = dict(item)
+        self.buffer.append(UpdateOne({"pdp_url": doc.get("pdp_url")}, {"$set": doc}, upsert=True))
+
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+        if len(self.pending) < self.max_pending:
+            return item
+
+        d = defer.Deferred()
+        self.waiting.append((d, item))
+        return d
+
+    def flush(self):
+        if not self.buffer:
+            return
+        ops, self.buffer = self.buffer, []
+        d = deferToThread(self.collection.bulk_write, ops, ordered=False)
+        self.pending.add(d)
+        d.addCallbacks(self.flushed, self.flush_failed, callbackArgs=(len(ops),), errbackArgs=(len(ops),))
+        d.addBoth(self.release, d)
+        self.stats["flushes"] += 1
+
+    def flushed(self, result, count):
+        self.stats["written"] += count
+
+    def flush_failed(self, failure, count):
+        self.stats["failed"] += count
+        logger.error(f"Mongo bulk write of {count} items failed: {failure.getErrorMessage()}")
+
+    def release(self, _, d):
+        """Flush finished: let held-back items through while there is room again"""
+        self.pending.discard(d)
+        while self.waiting and len(self.pending) < self.max_pending:
+            waiter, item = self.waiting.pop(0)
+            waiter.callback(item)
+
+    @defer.inlineCallbacks
+    def close_spider(self, spider):
+        self.flush()
+        if self.pending:
+            yield defer.DeferredList(list(self.pending))
+        logger.info(
+            f"MongoPipeline: {self.stats['written']} items written, {self.stats['failed']} failed "
+            f"in {self.stats['flushes']} bulk writes"
+        )
+        self.client.close()
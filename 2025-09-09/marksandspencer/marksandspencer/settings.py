@@ -58,9 +58,16 @@ DOWNLOAD_DELAY = 2
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
-#ITEM_PIPELINES = {
-#    "marksandspencer.pipelines.MarksandspencerPipeline": 300,
-#}
+ITEM_PIPELINES = {
+    "marksandspencer.pipelines.MongoPipeline": 300,
+}
+
+# Mongo settings
+MONGO_URI = "mongodb://localhost:27017"
+MONGO_DATABASE = "marksandspencer_scrapy"
+MONGO_COLLECTION = "products"
+MONGO_BATCH_SIZE = 100  # items per bulk_write
+MONGO_MAX_PENDING_FLUSHES = 4  # bulk_writes in flight before items are held back
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
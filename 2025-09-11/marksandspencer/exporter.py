@@ -1,49 +1,161 @@
+import os
+import csv
+import gzip
 import json
-import pandas as pd
+import logging
+import argparse
 import pymongo
-import os
 from datetime import datetime
 
+# Logging Setup
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[
+        logging.FileHandler("exporter.log"),
+        logging.StreamHandler()
+    ]
+)
+
 data_folder = "data"
-os.makedirs(data_folder, exist_ok=True)  
+BATCH_SIZE = 500  # documents per cursor round trip, the only thing held in memory
 
 # MongoDB connection
 client = pymongo.MongoClient("mongodb://localhost:27017/")
 db = client["marksandspencer"]
 products_detail_col = db["products_detail"]
 
-docs = list(products_detail_col.find({}, {"_id": 0}))  
 
 def convert_datetime(obj):
     if isinstance(obj, datetime):
         return obj.isoformat()  # e.g. "2025-09-11T18:00:00"
     raise TypeError("Type not serializable")
 
-# JSON ARRAY
-json_array_path = os.path.join(data_folder, "products_array.json")
-with open(json_array_path, "w", encoding="utf-8") as f:
-    json.dump(docs, f, ensure_ascii=False, indent=4, default=convert_datetime)    
 
-# JSON LINES
-json_lines_path = os.path.join(data_folder, "products_lines.jsonl")
-with open(json_lines_path, "w", encoding="utf-8") as f:
-    for doc in docs:
-        f.write(json.dumps(doc, ensure_ascii=False, default=convert_datetime) + "\n")
+def open_output(path, compress):
+    """Text handle for one output file, gzip-compressed when asked"""
+    if compress:
+        return gzip.open(path + ".gz", "wt", encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+class JsonArrayWriter:
+    """Writes `[`, one indented object per write, `]` on close, without holding the array"""
+
+    def __init__(self, path, compress=False):
+        self.file = open_output(path, compress)
+        self.count = 0
+
+    def write(self, doc):
+        text = json.dumps(doc, ensure_ascii=False, indent=4, default=convert_datetime)
+        self.file.write(("[\n" if self.count == 0 else ",\n") + "    " + text.replace("\n", "\n    "))
+        self.count += 1
+
+    def close(self):
+        self.file.write("\n]\n" if self.count else "[]\n")
+        self.file.close()
+
+
+class JsonLinesWriter:
+
+    def __init__(self, path, compress=False):
+        self.file = open_output(path, compress)
+
+    def write(self, doc):
+        self.file.write(json.dumps(doc, ensure_ascii=False, default=convert_datetime) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class CsvWriter:
+    """One row per document; lists and dicts are written as JSON, dates as ISO strings"""
+
+    def __init__(self, path, fields, delimiter=",", compress=False):
+        self.file = open_output(path, compress)
+        self.fields = fields
+        self.writer = csv.writer(self.file, delimiter=delimiter)
+        self.writer.writerow(fields)
+
+    def write(self, doc):
+        self.writer.writerow([self.cell(doc.get(field)) for field in self.fields])
+
+    @staticmethod
+    def cell(value):
+        if value is None:
+            return ""
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if isinstance(value, (list, dict)):
+            return json.dumps(value, ensure_ascii=False, default=convert_datetime)
+        return value
+
+    def close(self):
+        self.file.close()
+
+
+def csv_fields(first_doc):
+    """CSV header: the first document's key order, then any key only later documents have
+
+    Keys are collected server-side so the header is known before the single
+    streaming pass starts.
+    """
+    fields = list(first_doc)
+    pipeline = [
+        {"$project": {"_id": 0, "keys": {"$objectToArray": "$$ROOT"}}},
+        {"$unwind": "$keys"},
+        {"$group": {"_id": "$keys.k"}},
+    ]
+    extra = sorted(k["_id"] for k in products_detail_col.aggregate(pipeline) if k["_id"] not in fields and k["_id"] != "_id")
+    return fields + extra
+
+
+def export(formats, compress=False):
+    os.makedirs(data_folder, exist_ok=True)
+
+    first_doc = products_detail_col.find_one({}, {"_id": 0})
+    if first_doc is None:
+        logging.warning("products_detail is empty, nothing to export")
+        return
+    fields = csv_fields(first_doc)
+
+    writers = []
+    if "json" in formats:
+        writers.append(JsonArrayWriter(os.path.join(data_folder, "products_array.json"), compress))
+    if "jsonl" in formats:
+        writers.append(JsonLinesWriter(os.path.join(data_folder, "products_lines.jsonl"), compress))
+    if "csv" in formats:
+        writers.append(CsvWriter(os.path.join(data_folder, "products.csv"), fields, ",", compress))
+    if "pipe" in formats:
+        writers.append(CsvWriter(os.path.join(data_folder, "products_pipe.csv"), fields, "|", compress))
 
-# CSV 
-df = pd.DataFrame(docs)
-csv_path = os.path.join(data_folder, "products.csv")
-df.to_csv(csv_path, index=False, encoding="utf-8")
+    # One cursor fans out to every writer, each document is seen exactly once
+    count = 0
+    cursor = products_detail_col.find({}, {"_id": 0}, no_cursor_timeout=True, batch_size=BATCH_SIZE)
+    try:
+        for doc in cursor:
+            for writer in writers:
+                writer.write(doc)
+            count += 1
+            if count % 1000 == 0:
+                logging.info(f"Exported {count} products...")
+    finally:
+        cursor.close()
+        for writer in writers:
+            try:
+                writer.close()
+            except Exception as e:
+                logging.error(f"Failed to close {getattr(writer.file, 'name', writer)}: {e}")
 
-# Pipe-Separated CSV
-pipe_csv_path = os.path.join(data_folder, "products_pipe.csv")
-df.to_csv(pipe_csv_path, index=False, sep="|", encoding="utf-8")
+    logging.info(f"Export completed: {count} products as {', '.join(formats)} in '{data_folder}/' folder.")
 
-print("Export completed: JSON array, JSON lines, CSV, and Pipe CSV saved in 'data/' folder.")
 
-# Conversions
-converted_csv_path = os.path.join(data_folder, "converted_from_json.csv")
-df = pd.read_json(json_array_path)
-df.to_csv(converted_csv_path, index=False)
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Stream products_detail to JSON, JSON lines, CSV and pipe CSV")
+    arg_parser.add_argument("--formats", nargs="*", default=["json", "jsonl", "csv", "pipe"],
+                            choices=["json", "jsonl", "csv", "pipe"])
+    arg_parser.add_argument("--gzip", action="store_true", help="write .gz files")
+    args = arg_parser.parse_args()
 
-print("Conversions completed: All formats transformed successfully in 'data/' folder.")
+    export(args.formats, args.gzip)
+    client.close()
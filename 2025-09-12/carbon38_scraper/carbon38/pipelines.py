@@ -1,15 +1,40 @@
-from pymongo import MongoClient
+import logging
+from pymongo import MongoClient, UpdateOne
+from twisted.internet import defer
+from twisted.internet.threads import deferToThread
+
+logger = logging.getLogger(__name__)
+
 
 class MongoPipeline:
-    def __init__(self, mongo_uri, mongo_db):
+    """Buffers upserts and flushes them with bulk_write on the reactor thread pool
+
+    process_item never touches Mongo itself. Every MONGO_BATCH_SIZE items the
+    buffer goes to a worker thread; once MONGO_MAX_PENDING_FLUSHES batches are
+    in flight, process_item hands Scrapy a Deferred that only fires when one of
+    them finishes, which holds back the item flow instead of the reactor.
+    """
+
+    # spider name -> (collection, upsert key)
+    COLLECTIONS = {
+        "product_urls": ("product_urls", "url"),
+        "product_details": ("product_data", "product_id"),
+        "product_catalogue": ("product_data", "product_id"),
+    }
+
+    def __init__(self, mongo_uri, mongo_db, batch_size=100, max_pending=4):
         self.mongo_uri = mongo_uri
         self.mongo_db = mongo_db
+        self.batch_size = batch_size
+        self.max_pending = max_pending
 
     @classmethod
     def from_crawler(cls, crawler):
         return cls(
             mongo_uri=crawler.settings.get('MONGO_URI'),
-            mongo_db=crawler.settings.get('MONGO_DATABASE', 'carbon38')
+            mongo_db=crawler.settings.get('MONGO_DATABASE', 'carbon38'),
+            batch_size=crawler.settings.getint('MONGO_BATCH_SIZE', 100),
+            max_pending=crawler.settings.getint('MONGO_MAX_PENDING_FLUSHES', 4),
         )
 
     def open_spider(self, spider):
@@ -17,18 +42,60 @@ class MongoPipeline:
         self.db = self.client[self.mongo_db]
 
         # Each spider saves to its own collection
-        if spider.name == "product_urls":
-            self.collection = self.db["product_urls"]
-        elif spider.name == "product_details":
-            self.collection = self.db["product_data"]
+        collection_name, self.key = self.COLLECTIONS.get(spider.name, (spider.name, "url"))
+        self.collection = self.db[collection_name]
 
-    def close_spider(self, spider):
-        self.client.close()
+        self.buffer = []
+        self.pending = set()
+        self.waiting = []
+        self.stats = {"written": 0, "failed": 0, "flushes": 0}
 
     def process_item(self, item, spider):
         # Upsert by unique key
-        if spider.name == "product_urls":
-            self.collection.update_one({"url": item["url"]}, {"$set": dict(item)}, upsert=True)
-        elif spider.name == "product_details":
-            self.collection.update_one({"product_id": item["product_id"]}, {"$set": dict(item)}, upsert=True)
-        return item
+        doc = dict(item)
+        self.buffer.append(UpdateOne({self.key: doc.get(self.key)}, {"$set": doc}, upsert=True))
+
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+        if len(self.pending) < self.max_pending:
+            return item
+
+        d = defer.Deferred()
+        self.waiting.append((d, item))
+        return d
+
+    def flush(self):
+        if not self.buffer:
+            return
+        ops, self.buffer = self.buffer, []
+        d = deferToThread(self.collection.bulk_write, ops, ordered=False)
+        self.pending.add(d)
+        d.addCallbacks(self.flushed, self.flush_failed, callbackArgs=(len(ops),), errbackArgs=(len(ops),))
+        d.addBoth(self.release, d)
+        self.stats["flushes"] += 1
+
+    def flushed(self, result, count):
+        self.stats["written"] += count
+
+    def flush_failed(self, failure, count):
+        self.stats["failed"] += count
+        logger.error(f"Mongo bulk write of {count} items failed: {failure.getErrorMessage()}")
+
+    def release(self, _, d):
+        """Flush finished: let held-back items through while there is room again"""
+        self.pending.discard(d)
+        while self.waiting and len(self.pending) < self.max_pending:
+            waiter, item = self.waiting.pop(0)
+            waiter.callback(item)
+
+    @defer.inlineCallbacks
+    def close_spider(self, spider):
+        self.flush()
+        if self.pending:
+            yield defer.DeferredList(list(self.pending))
+        logger.info(
+            f"MongoPipeline: {self.stats['written']} items written, {self.stats['failed']} failed "
+            f"in {self.stats['flushes']} bulk writes"
+        )
+        self.client.close()
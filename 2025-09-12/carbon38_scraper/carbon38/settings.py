@@ -103,6 +103,8 @@ ITEM_PIPELINES = {
 MONGO_URI = 'mongodb://localhost:27017'
 MONGO_DATABASE = 'carbon38_scraper'
 MONGO_COLLECTION = 'product_urls'
+MONGO_BATCH_SIZE = 100  # items per bulk_write
+MONGO_MAX_PENDING_FLUSHES = 4  # bulk_writes in flight before items are held back
 
 # User-Agent
 USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) ' \
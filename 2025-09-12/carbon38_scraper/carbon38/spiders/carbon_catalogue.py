@@ -0,0 +1,89 @@
+import json
+import scrapy
+from w3lib.html import remove_tags
+from carbon38.items import Carbon38ScraperItem
+from carbon38.spiders.carbon_parser import ProductDetailsSpider
+
+
+class ProductCatalogueSpider(ProductDetailsSpider):
+    """Catalogue mode: pages the Shopify collection products.json feed, 250 products per request
+
+    Emits the same Carbon38ScraperItem as product_details. Products the feed
+    cannot fill (no variants or no images) go through the regular PDP parser.
+
+        scrapy crawl product_catalogue -a collections=tops,leggings
+    """
+
+    name = "product_catalogue"
+    base_url = "https://carbon38.com/en-in"
+    page_size = 250
+
+    def __init__(self, collections="tops", *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.collections = [c.strip() for c in collections.split(",") if c.strip()]
+        self.seen = set()
+        self.pdp_fallbacks = 0
+
+    def start_requests(self):
+        for collection in self.collections:
+            yield self.page_request(collection, 1)
+
+    def page_request(self, collection, page):
+        url = f"{self.base_url}/collections/{collection}/products.json?limit={self.page_size}&page={page}"
+        return scrapy.Request(url, callback=self.parse_catalogue, cb_kwargs={"collection": collection, "page": page})
+
+    def parse_catalogue(self, response, collection, page):
+        self.logger.info(f"Response: {response.status} | {response.url}")
+        try:
+            products = json.loads(response.text).get("products", [])
+        except json.JSONDecodeError:
+            self.logger.error(f"Failed to decode products.json on: {response.url}")
+            return
+
+        for product in products:
+            product_id = str(product.get("id", ""))
+            if product_id in self.seen:
+                continue
+            self.seen.add(product_id)
+
+            product_url = f"{self.base_url}/products/{product.get('handle', '')}"
+            if not product.get("variants") or not product.get("images"):
+                self.pdp_fallbacks += 1
+                yield scrapy.Request(product_url, callback=self.parse_product)
+                continue
+
+            yield self.catalogue_item(product, product_url)
+
+        if len(products) >= self.page_size:
+            yield self.page_request(collection, page + 1)
+        else:
+            self.logger.info(f"Collection {collection}: last page {page}")
+
+    def catalogue_item(self, product, product_url):
+        """Carbon38ScraperItem from a products.json entry, same fields as parse_product"""
+        options = [o.get("name", "").lower() for o in product.get("options", [])]
+        colour_key = f"option{options.index('color') + 1}" if "color" in options else "option1"
+        size_key = f"option{options.index('size') + 1}" if "size" in options else "option2"
+
+        variants = product["variants"]
+        first_variant = variants[0]
+        images = [img.get("src", "") for img in product.get("images", []) if img.get("src")]
+
+        item = Carbon38ScraperItem()
+        item["primary_image_url"] = images[0] if images else ""
+        item["brand"] = product.get("vendor", "")
+        item["product_name"] = product.get("title", "")
+        item["price"] = f"₹{float(first_variant.get('price') or 0):.2f}"
+        item["colour"] = first_variant.get(colour_key) or ""
+        item["sizes"] = [v.get(size_key) for v in variants if v.get(size_key)]
+        item["sku"] = first_variant.get("sku", "")
+        item["description"] = remove_tags(product.get("body_html") or "").strip()
+        item["reviews"] = "0 Reviews"
+        item["product_id"] = str(product.get("id", ""))
+        item["product_url"] = product_url
+        item["image_urls"] = images
+        return item
+
+    def closed(self, reason):
+        self.logger.info(f"Catalogue: {len(self.seen)} products, {self.pdp_fallbacks} via PDP")
+        super().closed(reason)
@@ -1,13 +1,16 @@
 import asyncio
+import argparse
 import logging
 import time
 import json
-from typing import List, Dict
+from typing import List, Dict, TextIO
 from urllib.parse import urljoin
 
-import psutil
-from pymongo import MongoClient
+from parsel import Selector
+from pymongo import MongoClient, UpdateOne
 from playwright.async_api import async_playwright, Page, Response, TimeoutError as PlaywrightTimeoutError
+from metrics import RequestMetrics, system_snapshot
+from hybrid import HybridFetcher
 
 # ---------- Configurations ----------
 START_URL = "https://www2.hm.com/en_in/index.html"
@@ -17,6 +20,15 @@ COLLECTION_PRODUCTS = "product_urls"
 
 NAV_TIMEOUT = 30000  # ms
 HEADLESS = True
+METRICS_DIR = "metrics"
+PRODUCT_URLS_FILE = "product_urls.json"
+
+# hybrid mode: browser only for cookies/challenges, pages over a curl_cffi pool
+POOL_SIZE = 8              # pooled HTTP connections
+LISTING_CONCURRENCY = 4    # subcategory listings walked at once
+MAX_REFRESHES = 3          # browser refreshes per url before giving up on it
+
+CATEGORY_PREFIXES = ["/en_in/women", "/en_in/men", "/en_in/kids", "/en_in/home"]
 
 # Browser-like headers
 HEADERS = {
@@ -54,19 +66,10 @@ db = mongo_client[DB_NAME]
 coll_products = db[COLLECTION_PRODUCTS]
 coll_products.create_index("product_url", unique=True)
 
-# ---------- Helpers ----------
-def system_snapshot() -> Dict:
-    proc = psutil.Process()
-    mem = psutil.virtual_memory()
-    return {
-        "timestamp": time.time(),
-        "rss_bytes": proc.memory_info().rss,
-        "system_total_mem": mem.total,
-        "system_used_percent": mem.percent,
-        "cpu_percent": psutil.cpu_percent(interval=None),
-    }
-
+# ---------- Metrics ----------
+metrics = RequestMetrics("hm_crawler", METRICS_DIR)
 
+# ---------- Helpers ----------
 async def record_response_metadata(url: str, response: Response | None, extra: Dict = None):
     meta = {
         "url": url,
@@ -86,6 +89,8 @@ async def record_response_metadata(url: str, response: Response | None, extra: D
         meta.update({"status": None, "ok": False})
     if extra:
         meta.update(extra)
+    size = int(response.headers.get("content-length") or 0) if response else 0
+    metrics.observe(url, meta.get("status"), meta.get("elapsed_s", 0.0), size)
     logger.info(f"Response meta: {meta}")
 
 
@@ -107,8 +112,10 @@ async def safe_goto(page: Page, url: str, timeout: int = NAV_TIMEOUT) -> Respons
         await record_response_metadata(url, response, extra={"elapsed_s": elapsed})
         logger.info("Visited %s (status=%s, time=%.2fs)", url, response.status if response else None, elapsed)
     except PlaywrightTimeoutError:
+        metrics.observe(url, None, time.perf_counter() - start)
         logger.error("Timeout while loading %s", url)
     except Exception:
+        metrics.observe(url, None, time.perf_counter() - start)
         logger.exception("Error while loading %s", url)
     return response
 
@@ -121,10 +128,14 @@ async def extract_category_urls(page: Page) -> List[Dict]:
         "a[href*='/en_in/']",
         "els => els.map(e => ({ href: e.getAttribute('href'), text: e.textContent.trim() }))"
     )
+    return pick_categories(page.url, cats)
+
+
+def pick_categories(base: str, links: List[Dict]) -> List[Dict]:
     categories = []
-    for c in cats:
-        if c["href"] and any(c["href"].startswith(cat) for cat in ["/en_in/women", "/en_in/men", "/en_in/kids", "/en_in/home"]):
-            url = normalize_url(page.url, c["href"])
+    for c in links:
+        if c["href"] and any(c["href"].startswith(cat) for cat in CATEGORY_PREFIXES):
+            url = normalize_url(base, c["href"])
             categories.append({"url": url, "name": c["text"]})
     logger.info("Found %d categories", len(categories))
     return categories
@@ -149,24 +160,53 @@ async def extract_subcategory_urls(page: Page) -> List[Dict]:
 async def extract_product_detail_urls(page: Page) -> List[str]:
     """Extract final product detail page URLs (contain productpage.)"""
     await page.wait_for_load_state("domcontentloaded")
-    anchors = await page.query_selector_all("a[href*='productpage.']")
-    found = set()
-    for a in anchors:
-        href = await a.get_attribute("href")
-        url = normalize_url(page.url, href)
-        if url:
-            found.add(url)
-    return list(found)
+    hrefs = await page.eval_on_selector_all("a[href*='productpage.']", "els => els.map(e => e.getAttribute('href'))")
+    return unique_urls(page.url, hrefs)
+
+
+def unique_urls(base: str, hrefs: List[str]) -> List[str]:
+    return list(dict.fromkeys(url for url in (normalize_url(base, h) for h in hrefs) if url))
 
 
-async def crawl_products_in_listing(page: Page, cat: Dict, sub: Dict) -> List[Dict]:
+def html_links(html: str, css: str) -> List[Dict]:
+    """Same {href, text} pairs the browser-side eval_on_selector_all returns"""
+    return [
+        {"href": a.attrib.get("href"), "text": " ".join(a.css("::text").getall()).strip()}
+        for a in Selector(text=html).css(css)
+    ]
+
+
+def listing_url(sub: Dict, page_num: int) -> str:
+    return f"{sub['url']}&page={page_num}" if "?" in sub["url"] else f"{sub['url']}?page={page_num}"
+
+
+def save_products(cat: Dict, sub: Dict, products: List[str], out: TextIO) -> List[Dict]:
+    """One bulk upsert and one write per listing page"""
+    docs = [{
+        "category_url": cat["url"],
+        "subcategory_url": sub["url"],
+        "product_url": prod,
+        "scraped_ts": time.time(),
+    } for prod in products]
+    try:
+        coll_products.bulk_write(
+            [UpdateOne({"product_url": d["product_url"]}, {"$setOnInsert": d}, upsert=True) for d in docs],
+            ordered=False,
+        )
+    except Exception:
+        logger.exception("Failed to insert products of %s", sub["url"])
+    out.write("".join(json.dumps(d, ensure_ascii=False) + "\n" for d in docs))
+    out.flush()
+    return docs
+
+
+async def crawl_products_in_listing(page: Page, cat: Dict, sub: Dict, out: TextIO) -> List[Dict]:
     """Crawl product detail pages for a given subcategory"""
     all_products = []
     page_num = 1
 
     while True:
-        url = f"{sub['url']}&page={page_num}" if "?" in sub["url"] else f"{sub['url']}?page={page_num}"
-        resp = await safe_goto(page, url)
+        resp = await safe_goto(page, listing_url(sub, page_num))
         if not resp or resp.status >= 400:
             break
 
@@ -174,31 +214,73 @@ async def crawl_products_in_listing(page: Page, cat: Dict, sub: Dict) -> List[Di
         if not products:
             break
 
-        for prod in products:
-            doc = {
-                "category_url": cat["url"],
-                "subcategory_url": sub["url"],
-                "product_url": prod,
-                "scraped_ts": time.time(),
-            }
-            try:
-                coll_products.update_one({"product_url": prod}, {"$setOnInsert": doc}, upsert=True)
-                all_products.append(doc)
+        all_products.extend(save_products(cat, sub, products, out))
+        logger.info("Page %d -> %d products", page_num, len(products))
+        page_num += 1
 
-                # append to JSON file one by one
-                with open("product_urls.json", "a", encoding="utf-8") as f:
-                    f.write(json.dumps(doc, ensure_ascii=False) + "\n")
+    return all_products
 
-            except Exception:
-                logger.exception("Failed to insert %s", prod)
 
-        logger.info("Page %d -> %d products", page_num, len(products))
+# ---------- Hybrid mode ----------
+async def crawl_listing_hybrid(fetcher: HybridFetcher, cat: Dict, sub: Dict, out: TextIO) -> List[Dict]:
+    """crawl_products_in_listing over the HTTP pool, pages parsed with parsel"""
+    all_products = []
+    page_num = 1
+
+    while True:
+        url = listing_url(sub, page_num)
+        resp = await fetcher.get(url)
+        if resp is None or resp.status_code >= 400:
+            break
+
+        products = unique_urls(url, [link["href"] for link in html_links(resp.text, "a[href*='productpage.']")])
+        if not products:
+            break
+
+        all_products.extend(save_products(cat, sub, products, out))
+        logger.info("Page %d -> %d products (%s)", page_num, len(products), sub["url"])
         page_num += 1
 
     return all_products
 
 
-async def process():
+async def process_hybrid(out: TextIO):
+    fetcher = HybridFetcher(
+        START_URL, HEADERS, metrics, pool_size=POOL_SIZE, headless=HEADLESS,
+        nav_timeout=NAV_TIMEOUT, max_refreshes=MAX_REFRESHES,
+    )
+    try:
+        logger.info("Starting hybrid crawl from %s", START_URL)
+        await fetcher.start()
+        resp = await fetcher.get(START_URL)
+        if resp is None or resp.status_code >= 400:
+            logger.error("Failed to fetch start page. Aborting.")
+            return
+
+        """ The nav menu repeats on every category page, so a subcategory is walked once """
+        listings = {}
+        categories = {c["url"]: c for c in pick_categories(START_URL, html_links(resp.text, "a[href*='/en_in/']"))}
+        for cat in categories.values():
+            resp = await fetcher.get(cat["url"])
+            if resp is None or resp.status_code >= 400:
+                continue
+            subs = unique_urls(cat["url"], [link["href"] for link in html_links(resp.text, "a[href*='/shop-by-product/']")])
+            logger.info("Found %d subcategories on %s", len(subs), cat["url"])
+            for sub in subs:
+                listings.setdefault(sub, (cat, {"url": sub}))
+
+        semaphore = asyncio.Semaphore(LISTING_CONCURRENCY)
+
+        async def crawl(cat, sub):
+            async with semaphore:
+                await crawl_listing_hybrid(fetcher, cat, sub, out)
+
+        await asyncio.gather(*(crawl(cat, sub) for cat, sub in listings.values()))
+    finally:
+        await fetcher.close()
+
+
+async def process(out: TextIO):
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=HEADLESS)
         context = await browser.new_context(
@@ -226,16 +308,22 @@ async def process():
 
             subcats = await extract_subcategory_urls(page)
             for sub in subcats:
-                await crawl_products_in_listing(page, cat, sub)
+                await crawl_products_in_listing(page, cat, sub, out)
 
         await browser.close()
 
 
 # ---------- Run ----------
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Collect H&M product urls")
+    arg_parser.add_argument("--mode", choices=["hybrid", "browser"], default="hybrid",
+                            help="hybrid: browser only for cookies and challenges; browser: every page in Playwright")
+    args = arg_parser.parse_args()
+
     start_time = time.time()
     try:
-        asyncio.run(process())
+        with open(PRODUCT_URLS_FILE, "a", encoding="utf-8") as out:
+            asyncio.run(process_hybrid(out) if args.mode == "hybrid" else process(out))
     except KeyboardInterrupt:
         logger.warning("Interrupted by user")
     except Exception:
@@ -248,3 +336,4 @@ if __name__ == "__main__":
             logger.info("Final system snapshot: %s", snap)
         except Exception:
             logger.exception("Failed to capture final system snapshot")
+        metrics.close()
@@ -1,8 +1,13 @@
 import asyncio
+import argparse
 import json
+import time
 import logging
+from parsel import Selector
 from pymongo import MongoClient
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from metrics import RequestMetrics
+from hybrid import HybridFetcher
 
 # ----------------- CONFIG -----------------
 MONGO_URI = "mongodb://localhost:27017"
@@ -11,11 +16,27 @@ URL_COLLECTION = "product_urls"  # URLs collected by crawler
 DETAILS_COLLECTION = "product_details"
 JSON_FILE = "product_details.json"
 LOG_FILE = "parser.log"
+METRICS_DIR = "metrics"
 
 HEADLESS = True
 NAV_TIMEOUT = 90000  # Increase timeout for slow loading pages (ms)
 ELEMENT_TIMEOUT = 60000  # Timeout for waiting specific elements
 
+# hybrid mode: browser only for cookies/challenges, PDPs over a curl_cffi pool
+START_URL = "https://www2.hm.com/en_in/index.html"
+POOL_SIZE = 8
+PDP_CONCURRENCY = 8
+HEADERS = {
+    "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+    "accept-language": "en-US,en;q=0.9",
+    "user-agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/139.0.0.0 Safari/537.36"
+    ),
+    "referer": "https://www2.hm.com/en_in/index.html",
+}
+
 # ----------------- LOGGING -----------------
 logger = logging.getLogger("hm_parser")
 logger.setLevel(logging.INFO)
@@ -37,11 +58,21 @@ db = client[DB_NAME]
 url_col = db[URL_COLLECTION]
 details_col = db[DETAILS_COLLECTION]
 
+# ----------------- METRICS -----------------
+metrics = RequestMetrics("hm_parser", METRICS_DIR)
+
 # ----------------- SCRAPER FUNCTION -----------------
 async def scrape_product(page, url):
     product = {"url": url}
+    started = time.perf_counter()
     try:
-        await page.goto(url, timeout=NAV_TIMEOUT, wait_until="domcontentloaded")
+        try:
+            response = await page.goto(url, timeout=NAV_TIMEOUT, wait_until="domcontentloaded")
+        except Exception:
+            metrics.observe(url, None, time.perf_counter() - started)
+            raise
+        size = int(response.headers.get("content-length") or 0) if response else 0
+        metrics.observe(url, response.status if response else None, time.perf_counter() - started, size)
         # Wait for product name to ensure page fully loaded
         await page.locator("xpath=//h1[contains(@class,'dfcd37')]").wait_for(timeout=ELEMENT_TIMEOUT)
 
@@ -78,8 +109,61 @@ async def scrape_product(page, url):
 
     return product
 
+def parse_product(html, url):
+    """scrape_product's fields from server-rendered html; reviews need clicks, so they are left out
+    and whatever a browser run stored for them is kept"""
+    sel = Selector(text=html)
+    product = {"url": url}
+    product['name'] = sel.xpath("normalize-space(//h1[contains(@class,'dfcd37')])").get()
+    product['price'] = sel.xpath("normalize-space(//span[contains(@class,'eb0a80')])").get()
+    product['color'] = sel.xpath("normalize-space(//p[contains(@class,'c67e97')])").get()
+    sizes = [s.xpath("normalize-space(.)").get() for s in sel.xpath("//div[contains(@id,'sizeButton-')]/div")]
+    product['size'] = [s for s in sizes if s]
+    product['description'] = sel.xpath("normalize-space(//p[contains(@class,'e726c0')])").get()
+    return product
+
+
+def save_product(url, product_data, out):
+    try:
+        details_col.update_one({"url": url}, {"$set": product_data}, upsert=True)
+    except Exception as e:
+        logger.error(f"MongoDB insert failed for {url}: {e}")
+    try:
+        out.write(json.dumps(product_data, ensure_ascii=False) + "\n")
+    except Exception as e:
+        logger.error(f"Failed to write JSON for {url}: {e}")
+
+
+async def main_hybrid(out):
+    fetcher = HybridFetcher(START_URL, HEADERS, metrics, pool_size=POOL_SIZE, headless=HEADLESS,
+                            nav_timeout=NAV_TIMEOUT, log=logger)
+    urls = [u for u in (doc.get("product_url") or doc.get("url") for doc in url_col.find({})) if u]
+    logger.info(f"Found {len(urls)} URLs to scrape.")
+    semaphore = asyncio.Semaphore(PDP_CONCURRENCY)
+
+    async def scrape(url):
+        async with semaphore:
+            response = await fetcher.get(url)
+        if response is None or response.status_code >= 400:
+            logger.error(f"Error scraping {url}: status {response.status_code if response else None}")
+            return
+        product_data = parse_product(response.text, url)
+        if not product_data['name']:
+            logger.error(f"No product name on {url}, not saved")
+            return
+        logger.info(f"Scraped successfully: {url}")
+        save_product(url, product_data, out)
+
+    try:
+        await fetcher.start()
+        await asyncio.gather(*(scrape(url) for url in urls))
+    finally:
+        await fetcher.close()
+    logger.info("Scraping completed.")
+
+
 # ----------------- MAIN FUNCTION -----------------
-async def main():
+async def main(out):
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=HEADLESS)
         page = await browser.new_page()
@@ -94,23 +178,20 @@ async def main():
 
             logger.info(f"Scraping {url}")
             product_data = await scrape_product(page, url)
-
-            # Insert into MongoDB
-            try:
-                details_col.update_one({"url": url}, {"$set": product_data}, upsert=True)
-            except Exception as e:
-                logger.error(f"MongoDB insert failed for {url}: {e}")
-
-            # Append to JSON file line by line
-            try:
-                with open(JSON_FILE, "a", encoding="utf-8") as f:
-                    f.write(json.dumps(product_data, ensure_ascii=False) + "\n")
-            except Exception as e:
-                logger.error(f"Failed to write JSON for {url}: {e}")
+            save_product(url, product_data, out)
 
         await browser.close()
         logger.info("Scraping completed.")
 
 # ----------------- RUN -----------------
 if __name__ == "__main__":
-    asyncio.run(main())
+    arg_parser = argparse.ArgumentParser(description="Scrape H&M product detail pages")
+    arg_parser.add_argument("--mode", choices=["hybrid", "browser"], default="browser",
+                            help="browser: every PDP in Playwright; hybrid: browser only for cookies and challenges, no reviews")
+    args = arg_parser.parse_args()
+
+    try:
+        with open(JSON_FILE, "a", encoding="utf-8") as out:
+            asyncio.run(main_hybrid(out) if args.mode == "hybrid" else main(out))
+    finally:
+        metrics.close()
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import time
+from curl_cffi.requests import AsyncSession
+from playwright.async_api import async_playwright
+
+logger = logging.getLogger("hm_scraper")
+
+CHALLENGE_STATUSES = {403, 429}
+CHALLENGE_MARKERS = ("access denied", "captcha", "sec-if-cpt", "px-captcha", "cf-chl", "are you a robot")
+
+
+class HybridFetcher:
+    """Playwright only for the session, a pooled curl_cffi client for the pages
+
+    start() opens the start url in a real browser once and copies its cookies
+    and user agent into an AsyncSession (max_clients connections). get() fetches
+    through that session; when a response looks like a challenge the browser
+    is brought back to solve it on that url, fresh cookies are handed over and
+    the request is retried. Concurrent requests hitting a challenge share one
+    browser refresh.
+    """
+
+    def __init__(self, start_url, headers, metrics, pool_size=8, headless=True,
+                 nav_timeout=30000, timeout=30, max_refreshes=3, impersonate="chrome", log=None):
+        self.start_url = start_url
+        self.headers = dict(headers)
+        self.metrics = metrics
+        self.pool_size = pool_size
+        self.headless = headless
+        self.nav_timeout = nav_timeout
+        self.timeout = timeout
+        self.max_refreshes = max_refreshes
+        self.impersonate = impersonate
+        self.logger = log or logger
+        self.playwright = None
+        self.browser = None
+        self.context = None
+        self.session = None
+        self.generation = 0
+        self.refresh_lock = asyncio.Lock()
+
+    async def start(self):
+        self.playwright = await async_playwright().start()
+        self.browser = await self.playwright.chromium.launch(headless=self.headless)
+        self.context = await self.browser.new_context(
+            user_agent=self.headers["user-agent"],
+            extra_http_headers=self.headers,
+            viewport={"width": 1366, "height": 768},
+            locale="en-US",
+            timezone_id="Asia/Kolkata",
+        )
+        self.session = AsyncSession(impersonate=self.impersonate, max_clients=self.pool_size, timeout=self.timeout)
+        await self.handoff(self.start_url)
+
+    async def handoff(self, url):
+        """Let the browser pass whatever check `url` serves, then copy its cookies into the pool"""
+        page = await self.context.new_page()
+        started = time.perf_counter()
+        try:
+            response = await page.goto(url, timeout=self.nav_timeout, wait_until="domcontentloaded")
+            self.metrics.observe(url, response.status if response else None, time.perf_counter() - started)
+            await page.wait_for_load_state("networkidle", timeout=self.nav_timeout)
+            self.headers["user-agent"] = await page.evaluate("navigator.userAgent")
+        except Exception as e:
+            self.logger.warning("Browser handoff on %s did not settle: %s", url, e)
+        finally:
+            await page.close()
+
+        cookies = await self.context.cookies()
+        self.session.cookies.clear()
+        for c in cookies:
+            self.session.cookies.set(c["name"], c["value"], domain=c["domain"], path=c.get("path", "/"))
+        self.generation += 1
+        self.logger.info("Handed %d browser cookies to the HTTP pool (session %d)", len(cookies), self.generation)
+
+    def is_challenge(self, response):
+        if response.status_code in CHALLENGE_STATUSES:
+            return True
+        head = response.text[:20000].lower()
+        return any(marker in head for marker in CHALLENGE_MARKERS)
+
+    async def get(self, url):
+        """Response for url, or None when it failed or stayed challenged after max_refreshes"""
+        for attempt in range(self.max_refreshes + 1):
+            generation = self.generation
+            started = time.perf_counter()
+            try:
+                response = await self.session.get(url, headers=self.headers)
+            except Exception as e:
+                self.metrics.observe(url, None, time.perf_counter() - started)
+                self.logger.error("Error while loading %s: %s", url, e)
+                return None
+            self.metrics.observe_response(url, response, started)
+
+            if not self.is_challenge(response):
+                return response
+
+            if attempt == self.max_refreshes:
+                break
+            self.logger.warning("Challenge on %s (status=%s), back to the browser", url, response.status_code)
+            self.metrics.retry(url)
+            async with self.refresh_lock:
+                """ Only the first request to see this session challenged refreshes it """
+                if generation == self.generation:
+                    await self.handoff(url)
+        self.logger.error("Still challenged after %d browser refreshes: %s", self.max_refreshes, url)
+        return None
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+        if self.browser:
+            await self.browser.close()
+        if self.playwright:
+            await self.playwright.stop()
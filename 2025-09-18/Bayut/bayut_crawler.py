@@ -1,16 +1,26 @@
 import asyncio
 import logging
-import json
 import time
 from urllib.parse import urljoin
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from waits import Waiter
+from sink import WriteSink
+from pagepool import PagePool
 
 # CONFIG
 BASE_URL = "https://www.bayut.sa/en"
 OUTPUT_FILE = "bayut_product_urls.json"
 MAX_PAGES = 50  
 
+# Pool: listing pages are spread over WORKERS tabs, each pausing PAGE_DELAY seconds between pages
+WORKERS = 4
+PAGE_DELAY = 1.0
+HEADLESS = False
+
+# Waits: listing pages hydrate property cards after domcontentloaded
+LISTING_WAIT = {"selector": "xpath=//a[contains(@href, '/property/')]", "quiet_ms": 300, "within": "main", "timeout": 10000}
+
 PROPERTY_TYPES = [
     "apartments", "villas", "floors", "residential-buildings", "residential-lands",
     "houses", "rest-houses", "chalets", "rooms", "townhouses"
@@ -28,13 +38,15 @@ logging.basicConfig(
     handlers=[logging.FileHandler("crawler.log"), logging.StreamHandler()],
 )
 
+waiter = Waiter("bayut_crawler")
+
 async def safe_goto(page, url, retries=3):
     """Goto with retries and relaxed wait condition"""
     for attempt in range(1, retries + 1):
         try:
             await page.goto(url, timeout=120000, wait_until="domcontentloaded")
             return True
-        except TimeoutError:
+        except PlaywrightTimeoutError:
             logging.warning(f"Timeout loading {url} (attempt {attempt}/{retries})")
             if attempt == retries:
                 return False
@@ -43,11 +55,10 @@ async def safe_goto(page, url, retries=3):
 
 
 async def extract_links(page, xpath_expr, filter_keywords=None):
-    """Extract links from page using XPath and optional keyword filtering"""
+    """Extract links from page using XPath and optional keyword filtering, in one round trip"""
+    hrefs = await page.eval_on_selector_all(f"xpath={xpath_expr}", "els => els.map(e => e.getAttribute('href'))")
     links = set()
-    elements = await page.locator(f"xpath={xpath_expr}").all()
-    for el in elements:
-        href = await el.get_attribute("href")
+    for href in hrefs:
         if href:
             full_url = urljoin(BASE_URL, href)
             if not filter_keywords or any(k in full_url for k in filter_keywords):
@@ -76,56 +87,38 @@ async def extract_subcategory_urls(page, category_url):
 
 
 # PRODUCT URLS with PAGINATION 
-async def extract_product_urls(page, category_url, subcategory_url, json_file):
-    page_num = 1
-    total_saved = 0
-
-    while page_num <= MAX_PAGES:  
-        url = f"{subcategory_url}?page={page_num}"
-        ok = await safe_goto(page, url)
-        if not ok:
-            break
-
-        page_products = await extract_links(page, "//a[@href]", ["/property/"])
-        if not page_products:
-            logging.info(f"No products on {url}, stopping pagination.")
-            break
-
-        logging.info(f"{subcategory_url} page {page_num} → {len(page_products)} products")
-
-        for product_url in page_products:
-            record = {
-                "category_url": category_url,
-                "subcategory_url": subcategory_url,
-                "product_url": product_url,
-                "page": page_num,
-                "scraped_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-            }
-
-    
-            product_urls_col.update_one(
-                {"product_url": product_url},
-                {"$set": record},
-                upsert=True,
-            )
-
-    
-            json_file.write(json.dumps(record, ensure_ascii=False) + "\n")
-            json_file.flush()
-
-            total_saved += 1
-            logging.info(f"Saved → {product_url}")
-
-        page_num += 1
-        time.sleep(1) 
-
-    logging.info(f"Total saved for {subcategory_url}: {total_saved}")
+async def extract_product_urls(page, category_url, subcategory_url, page_num, sink):
+    """One listing page; True when it had products and the next page is worth a visit"""
+    url = f"{subcategory_url}?page={page_num}"
+    if not await safe_goto(page, url):
+        return False
+    await waiter.wait(page, "listing", LISTING_WAIT)
+
+    page_products = await extract_links(page, "//a[@href]", ["/property/"])
+    if not page_products:
+        logging.info(f"No products on {url}, stopping pagination.")
+        return False
+
+    logging.info(f"{subcategory_url} page {page_num} → {len(page_products)} products")
+
+    scraped_at = time.strftime("%Y-%m-%d %H:%M:%S")
+    for product_url in page_products:
+        record = {
+            "category_url": category_url,
+            "subcategory_url": subcategory_url,
+            "product_url": product_url,
+            "page": page_num,
+            "scraped_at": scraped_at,
+        }
+        await sink.put(op=UpdateOne({"product_url": product_url}, {"$set": record}, upsert=True), line=record)
+
+    return page_num < MAX_PAGES
 
 
 async def main():
     async with async_playwright() as pw:
         browser = await pw.chromium.launch(
-            headless=False,
+            headless=HEADLESS,
             args=["--disable-blink-features=AutomationControlled"]
         )
         context = await browser.new_context(
@@ -137,22 +130,33 @@ async def main():
             locale="en-US"
         )
         page = await context.new_page()
-
         categories = await extract_category_urls(page)
+        await page.close()
 
-        with open(OUTPUT_FILE, "w", encoding="utf-8") as json_file:
-            for cat in categories:
-                subcats = await extract_subcategory_urls(page, cat)
-
-                if not subcats: 
-                    subcats = [cat]
-
-                for sub in subcats:
-                    await extract_product_urls(page, cat, sub, json_file)
-                    time.sleep(1)  
-
+        open(OUTPUT_FILE, "w", encoding="utf-8").close()
+        sink = WriteSink(product_urls_col, OUTPUT_FILE)
+        try:
+            # Subcategories of every category, then each subcategory paginated; page n+1 is
+            # queued as soon as page n had products, so all pages stay busy across subcategories
+            listings = []
+
+            async def discover(page, cat):
+                subcats = await extract_subcategory_urls(page, cat) or [cat]
+                listings.extend((cat, sub, 1) for sub in subcats)
+
+            async def paginate(page, item):
+                cat, sub, page_num = item
+                if await extract_product_urls(page, cat, sub, page_num, sink):
+                    listing_pool.add((cat, sub, page_num + 1))
+
+            await PagePool(context, discover, WORKERS, PAGE_DELAY, "subcategories").run(categories)
+            listing_pool = PagePool(context, paginate, WORKERS, PAGE_DELAY, "listings")
+            await listing_pool.run(listings)
+        finally:
+            await sink.close()
         logging.info(f"All data saved incrementally to {OUTPUT_FILE}")
         await browser.close()
+        waiter.close()
 
 
 if __name__ == "__main__":
@@ -1,10 +1,12 @@
 import asyncio
 import logging
 import time
-import json
 import re
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from waits import Waiter
+from sink import WriteSink
+from pagepool import PagePool
 
 # CONFIG
 MONGO_URI = "mongodb://localhost:27017"
@@ -13,6 +15,31 @@ URL_COLLECTION = "product_urls"
 DETAILS_COLLECTION = "product_details"  
 OUTPUT_FILE = "bayut_product_details.json"
 
+# Pool: property pages are spread over WORKERS tabs, each pausing PAGE_DELAY seconds between pages
+WORKERS = 4
+PAGE_DELAY = 1.0
+HEADLESS = False
+
+FIELDS = {
+    "broker_display_name": "a[aria-label='Agent name'] h2",
+    "broker": "h3[aria-label*='Agency name']",
+    "category": "ol.breadcrumb li:last-child",
+    "title": "h1",
+    "description": "._812d3f30, .c-property-description",
+    "location": "div[aria-label='Property header']",
+    "price": "span[aria-label='Price']",
+    "currency": "span[aria-label='Currency']",
+    "price_per": "span[aria-label*='per']",
+    "bedrooms": "span._3458a9d4:has-text('Bed')",
+    "bathrooms": "span._3458a9d4:has-text('Bath')",
+    "furnished": "span[aria-label='Furnishing']",
+    "rera_permit_number": "span[aria-label='Permit number']",
+    "dtcm_licence": "span:has-text('DTCM Licence') + span",
+}
+
+# Waits: property page is ready once the price is rendered; the fields are read right after, no DOM settle needed
+PROPERTY_WAIT = {"selector": "span[aria-label='Price']", "timeout": 10000}
+
 # MongoDB 
 client = MongoClient(MONGO_URI)
 db = client[DB_NAME]
@@ -26,6 +53,8 @@ logging.basicConfig(
     handlers=[logging.FileHandler("parser.log"), logging.StreamHandler()],
 )
 
+waiter = Waiter("bayut_parser")
+
 
 async def safe_goto(page, url, retries=3):
     """Goto with retries"""
@@ -33,7 +62,7 @@ async def safe_goto(page, url, retries=3):
         try:
             await page.goto(url, timeout=120000, wait_until="domcontentloaded")
             return True
-        except TimeoutError:
+        except PlaywrightTimeoutError:
             logging.warning(f"Timeout loading {url} (attempt {attempt}/{retries})")
             if attempt == retries:
                 return False
@@ -56,8 +85,14 @@ async def parse_property(page, url):
     ok = await safe_goto(page, url)
     if not ok:
         return None
-
-    raw_ref = await extract_text(page, "span[aria-label='Reference']")
+    await waiter.wait(page, "property", PROPERTY_WAIT)
+
+    # Fields are independent lookups, so they go to the browser together
+    raw_ref, *values = await asyncio.gather(
+        extract_text(page, "span[aria-label='Reference']"),
+        *(extract_text(page, selector) for selector in FIELDS.values()),
+    )
+    fields = dict(zip(FIELDS, values))
     reference_number = ""
     if raw_ref:
         match = re.search(r"(\d+)", raw_ref)
@@ -67,21 +102,21 @@ async def parse_property(page, url):
     data = {
         "reference_number": reference_number,
         "url": url,
-        "broker_display_name": await extract_text(page, "a[aria-label='Agent name'] h2"),
-        "broker": await extract_text(page, "h3[aria-label*='Agency name']"),
-        "category": await extract_text(page, "ol.breadcrumb li:last-child"),
+        "broker_display_name": fields["broker_display_name"],
+        "broker": fields["broker"],
+        "category": fields["category"],
         "category_url": url.split("?")[0].rsplit("/", 1)[0],
-        "title": await extract_text(page, "h1"),
-        "description": await extract_text(page, "._812d3f30, .c-property-description"),
-        "location": await extract_text(page, "div[aria-label='Property header']"),
-        "price": await extract_text(page, "span[aria-label='Price']"),
-        "currency": await extract_text(page, "span[aria-label='Currency']"),
-        "price_per": await extract_text(page, "span[aria-label*='per']"),
-        "bedrooms": await extract_text(page, "span._3458a9d4:has-text('Bed')"),
-        "bathrooms": await extract_text(page, "span._3458a9d4:has-text('Bath')"),
-        "furnished": await extract_text(page, "span[aria-label='Furnishing']"),
-        "rera_permit_number": await extract_text(page, "span[aria-label='Permit number']"),
-        "dtcm_licence": await extract_text(page, "span:has-text('DTCM Licence') + span"),
+        "title": fields["title"],
+        "description": fields["description"],
+        "location": fields["location"],
+        "price": fields["price"],
+        "currency": fields["currency"],
+        "price_per": fields["price_per"],
+        "bedrooms": fields["bedrooms"],
+        "bathrooms": fields["bathrooms"],
+        "furnished": fields["furnished"],
+        "rera_permit_number": fields["rera_permit_number"],
+        "dtcm_licence": fields["dtcm_licence"],
         "scraped_ts": time.strftime("%Y-%m-%d %H:%M:%S"),
         "amenities": [],
     }
@@ -99,17 +134,11 @@ async def parse_property(page, url):
     return data
 
 
-async def save_to_json(data, filename):
-    """Append one property to JSON file"""
-    with open(filename, "a", encoding="utf-8") as f:
-        f.write(json.dumps(data, ensure_ascii=False) + "\n")
-
-
 # MAIN
 async def main():
     async with async_playwright() as pw:
         browser = await pw.chromium.launch(
-            headless=False,
+            headless=HEADLESS,
             args=["--disable-blink-features=AutomationControlled"]
         )
         context = await browser.new_context(
@@ -120,42 +149,29 @@ async def main():
             ),
             locale="en-US"
         )
-        page = await context.new_page()
 
-        total = urls_col.count_documents({})
+        urls = [u for u in (doc.get("product_url") or doc.get("url") for doc in urls_col.find({})) if u]
+        total = len(urls)
         logging.info(f"Found {total} product URLs to parse")
-
-        cursor = urls_col.find({})
-        for idx, doc in enumerate(cursor, start=1):
-            url = doc.get("product_url") or doc.get("url")
-            if not url:
-                continue
-
-            logging.info(f"[{idx}/{total}] Parsing {url}")
-
-            try:
-                data = await parse_property(page, url)
-                if not data:
-                    continue
-
-                # Save to MongoDB
-                details_col.update_one(
-                    {"url": url},
-                    {"$set": data},
-                    upsert=True,
-                )
-
-                # Save to JSON
-                await save_to_json(data, OUTPUT_FILE)
-
-                logging.info(f"✅ Saved details for {url}")
-
-            except Exception as e:
-                logging.error(f"❌ Error parsing {url}: {e}")
-
-            time.sleep(1)
-
+        sink = WriteSink(details_col, OUTPUT_FILE)
+        try:
+            async def parse(page, item):
+                idx, url = item
+                logging.info(f"[{idx}/{total}] Parsing {url}")
+                try:
+                    data = await parse_property(page, url)
+                    if not data:
+                        return
+                    await sink.put(op=UpdateOne({"url": url}, {"$set": data}, upsert=True), line=data)
+                    logging.info(f"✅ Saved details for {url}")
+                except Exception as e:
+                    logging.error(f"❌ Error parsing {url}: {e}")
+
+            await PagePool(context, parse, WORKERS, PAGE_DELAY, "properties").run(enumerate(urls, start=1))
+        finally:
+            await sink.close()
         await browser.close()
+        waiter.close()
 
 
 if __name__ == "__main__":
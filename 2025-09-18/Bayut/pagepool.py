@@ -0,0 +1,56 @@
+import asyncio
+import logging
+
+STOP = object()
+
+
+class PagePool:
+    """N Playwright pages of one context pulling work items off a shared queue
+
+    `handler(page, item)` runs for each item on whichever page is free. After
+    each item a worker waits `delay` seconds with asyncio.sleep, so pacing is
+    per page and the other pages keep working meanwhile. Handlers may call
+    `add()` to queue follow-up items; `run()` returns once the queue drains.
+    """
+
+    def __init__(self, context, handler, workers=4, delay=1.0, name="pool"):
+        self.context = context
+        self.handler = handler
+        self.workers = workers
+        self.delay = delay
+        self.name = name
+        self.queue = asyncio.Queue()
+        self.stats = {"done": 0, "failed": 0}
+
+    def add(self, item):
+        self.queue.put_nowait(item)
+
+    async def worker(self, index):
+        page = await self.context.new_page()
+        try:
+            while True:
+                item = await self.queue.get()
+                if item is STOP:
+                    self.queue.task_done()
+                    return
+                try:
+                    await self.handler(page, item)
+                    self.stats["done"] += 1
+                except Exception as e:
+                    self.stats["failed"] += 1
+                    logging.error(f"[{self.name} {index}] {item}: {e}")
+                finally:
+                    self.queue.task_done()
+                await asyncio.sleep(self.delay)
+        finally:
+            await page.close()
+
+    async def run(self, items=()):
+        for item in items:
+            self.add(item)
+        tasks = [asyncio.create_task(self.worker(i)) for i in range(self.workers)]
+        await self.queue.join()
+        for _ in tasks:
+            self.add(STOP)
+        await asyncio.gather(*tasks)
+        logging.info(f"[{self.name}] {self.stats['done']} done, {self.stats['failed']} failed on {self.workers} pages")
@@ -4,7 +4,12 @@ from pathlib import Path
 from datetime import datetime
 from urllib.parse import urljoin
 from playwright.async_api import async_playwright
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
+from sink import WriteSink
+from waits import Waiter
+
+# Lazy-loaded tiles: after scrolling to the bottom, wait until the page grows, give up after 3 s
+SCROLL_WAIT = {"function": "h => document.body.scrollHeight > h", "timeout": 3000}
 
 
 class BillaCrawler:
@@ -22,26 +27,33 @@ class BillaCrawler:
             format="%(asctime)s [%(levelname)s] %(message)s",
         )
         self.logger = logging.getLogger("BillaCrawler")
+        self.sink = None
+        self.waiter = Waiter("billa_crawler")
 
     async def run(self):
         """Main entry point"""
         self.logger.info("Starting Billa crawler...")
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=False)
-            context = await browser.new_context(user_agent="Mozilla/5.0 (compatible; BillaCrawler/1.0)")
-            page = await context.new_page()
-
-            categories = await self.get_categories(page)
-
-            for name, url in categories.items():
-                self.logger.info(f"Scraping category: {name} -> {url}")
-                try:
-                    product_urls = await self.scrape_category(page, url)
-                    self.save_to_mongo(name, url, product_urls)
-                except Exception as e:
-                    self.logger.error(f"Failed scraping {name}: {e}")
-
-            await browser.close()
+        self.sink = WriteSink(self.product_urls_col, logger=self.logger)
+        try:
+            async with async_playwright() as p:
+                browser = await p.chromium.launch(headless=False)
+                context = await browser.new_context(user_agent="Mozilla/5.0 (compatible; BillaCrawler/1.0)")
+                page = await context.new_page()
+
+                categories = await self.get_categories(page)
+
+                for name, url in categories.items():
+                    self.logger.info(f"Scraping category: {name} -> {url}")
+                    try:
+                        product_urls = await self.scrape_category(page, url)
+                        await self.save_to_mongo(name, url, product_urls)
+                    except Exception as e:
+                        self.logger.error(f"Failed scraping {name}: {e}")
+
+                await browser.close()
+        finally:
+            await self.sink.close()
+        self.waiter.close()
         self.logger.info("Crawler finished successfully.")
 
     async def get_categories(self, page):
@@ -77,15 +89,11 @@ class BillaCrawler:
                 break
 
         
-            prev_height = 0
             while True:
                 current_height = await page.evaluate("document.body.scrollHeight")
                 await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await page.wait_for_timeout(2000)
-                new_height = await page.evaluate("document.body.scrollHeight")
-                if new_height == prev_height:
+                if not await self.waiter.wait(page, "scroll", SCROLL_WAIT, arg=current_height):
                     break
-                prev_height = new_height
 
 
             items = await page.query_selector_all("xpath=//a[@data-test='product-tile-link']")
@@ -113,18 +121,16 @@ class BillaCrawler:
         return list(product_urls)
 
 
-    def save_to_mongo(self, category_name, category_url, product_urls):
-        """Save category & product URLs to MongoDB"""
+    async def save_to_mongo(self, category_name, category_url, product_urls):
+        """Queue category & product URLs for the MongoDB writer thread"""
         record = {
             "category_name": category_name,
             "category_url": category_url,
             "product_urls": product_urls,
             "scraped_at": datetime.utcnow(),
         }
-        self.product_urls_col.update_one(
-            {"category_url": category_url}, {"$set": record}, upsert=True
-        )
-        self.logger.info(f"Saved {len(product_urls)} products for category: {category_name}")
+        await self.sink.put(op=UpdateOne({"category_url": category_url}, {"$set": record}, upsert=True))
+        self.logger.info(f"Queued {len(product_urls)} products for category: {category_name}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,116 @@
+import os
+import json
+import time
+import logging
+
+DEFAULT_TIMEOUT = 10000  # ms
+
+QUIET_JS = """
+([quietMs, timeoutMs, within]) => new Promise(resolve => {
+    const root = (within && document.querySelector(within)) || document.body;
+    let timer = setTimeout(done, quietMs);
+    const hardStop = setTimeout(() => { observer.disconnect(); resolve(false); }, timeoutMs);
+    const observer = new MutationObserver(() => { clearTimeout(timer); timer = setTimeout(done, quietMs); });
+    function done() { observer.disconnect(); clearTimeout(hardStop); resolve(true); }
+    observer.observe(root, {childList: true, subtree: true});
+})
+"""
+
+
+class Waiter:
+    """Event-driven page waits with per-site specs and a record of how long each one took
+
+    A spec is a dict with any of:
+        selector  - locator that must reach `state` (default "visible")
+        function  - JS predicate polled until truthy, called with `arg`
+        response  - url substring of a response the action must trigger (see `after`)
+        quiet_ms  - no nodes added or removed for this long
+        within    - CSS selector the quiet_ms watch is scoped to (document body by default),
+                    so carousels, timers and ads elsewhere on the page cannot keep it busy
+        timeout   - ms budget for the whole spec
+    Steps run in that order and a wait returns False on the first one that times out.
+    """
+
+    def __init__(self, site, timeout=DEFAULT_TIMEOUT):
+        self.site = site
+        self.timeout = timeout
+        self.stats = {}
+
+    def record(self, name, started, ok):
+        elapsed = (time.perf_counter() - started) * 1000
+        stats = self.stats.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "timeouts": 0})
+        stats["count"] += 1
+        stats["total_ms"] += elapsed
+        stats["max_ms"] = max(stats["max_ms"], elapsed)
+        if not ok:
+            stats["timeouts"] += 1
+        logging.debug(f"[{self.site}] wait {name}: {elapsed:.0f} ms{'' if ok else ' (timeout)'}")
+
+    async def steps(self, page, spec, arg, deadline):
+        def remaining():
+            return max(1, int((deadline - time.perf_counter()) * 1000))
+
+        if spec.get("selector"):
+            await page.locator(spec["selector"]).first.wait_for(state=spec.get("state", "visible"), timeout=remaining())
+        if spec.get("function"):
+            await page.wait_for_function(spec["function"], arg=arg, timeout=remaining())
+        if spec.get("quiet_ms"):
+            return bool(await page.evaluate(QUIET_JS, [spec["quiet_ms"], remaining(), spec.get("within")]))
+        return True
+
+    async def wait(self, page, name, spec, arg=None):
+        """Run the spec against the current page, True when every step was satisfied in time"""
+        started = time.perf_counter()
+        deadline = started + spec.get("timeout", self.timeout) / 1000
+        try:
+            ok = await self.steps(page, spec, arg, deadline)
+        except Exception:
+            ok = False
+        self.record(name, started, ok)
+        return ok
+
+    async def after(self, page, name, action, spec, arg=None):
+        """Run the action (a coroutine function) and wait for what it should cause
+
+        With a `response` step the wait starts before the action so the triggered
+        request cannot be missed; the remaining steps run once it has arrived.
+        """
+        if not spec.get("response"):
+            await action()
+            return await self.wait(page, name, spec, arg)
+
+        started = time.perf_counter()
+        timeout = spec.get("timeout", self.timeout)
+        deadline = started + timeout / 1000
+        try:
+            async with page.expect_response(lambda r: spec["response"] in r.url, timeout=timeout):
+                await action()
+            ok = await self.steps(page, spec, arg, deadline)
+        except Exception:
+            ok = False
+        self.record(name, started, ok)
+        return ok
+
+    def summary(self):
+        return {
+            name: {
+                "count": s["count"],
+                "avg_ms": round(s["total_ms"] / s["count"], 1) if s["count"] else 0,
+                "max_ms": round(s["max_ms"], 1),
+                "timeouts": s["timeouts"],
+            }
+            for name, s in self.stats.items()
+        }
+
+    def close(self, output_dir="metrics"):
+        """Log per-wait timings and write them to <output_dir>/<site>_waits.json"""
+        summary = self.summary()
+        for name, s in summary.items():
+            logging.info(f"[{self.site}] wait {name}: {s['count']} waits, avg {s['avg_ms']} ms, "
+                         f"max {s['max_ms']} ms, {s['timeouts']} timeouts")
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+            with open(os.path.join(output_dir, f"{self.site}_waits.json"), "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2)
+        except Exception as e:
+            logging.error(f"Failed to write wait timings: {e}")
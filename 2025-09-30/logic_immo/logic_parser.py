@@ -1,12 +1,13 @@
 import asyncio
-import json
 import logging
 import re
 from pathlib import Path
 
 from lxml import html
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 from playwright.async_api import async_playwright, Page, Browser, BrowserContext
+from sink import WriteSink
+from waits import Waiter
 
 # Logging
 LOG_FILE = "parser.log"
@@ -29,6 +30,10 @@ details_collection = db[DETAILS_COLLECTION]
 DETAILS_JSON_FILE = Path("product_details.json")
 DETAILS_JSON_FILE.touch(exist_ok=True)
 
+# Waits: listing is ready once the price is rendered and the DOM settles, phone once its block shows
+LISTING_WAIT = {"selector": 'xpath=//span[contains(@class,"css-9wpf20")]', "timeout": 8000}
+PHONE_WAIT = {"selector": 'xpath=//div[@class="css-12m0k8p"]', "timeout": 4000}
+
 
 # Helper
 def clean_text(text: str) -> str:
@@ -52,6 +57,8 @@ class LogicImmoParser:
                 "Chrome/139.0.0.0 Safari/537.36"
             )
         }
+        self.sink = None
+        self.waiter = Waiter("logic_immo")
 
     async def launch_browser(self) -> Browser:
         logging.info("Launching browser...")
@@ -66,14 +73,13 @@ class LogicImmoParser:
             # Navigate
             await page.goto(url, timeout=30000)
             await page.wait_for_load_state("domcontentloaded")
-            await page.wait_for_timeout(3000)
+            await self.waiter.wait(page, "listing", LISTING_WAIT)
 
             # --- Try clicking "show phone" button if present ---
             try:
                 phone_button = page.locator('xpath=//button[@aria-label="Tel"]')
                 if await phone_button.count() > 0:
-                    await phone_button.first.click()
-                    await page.wait_for_timeout(2000)
+                    await self.waiter.after(page, "phone", phone_button.first.click, PHONE_WAIT)
             except Exception:
                 pass
 
@@ -127,31 +133,32 @@ class LogicImmoParser:
 
     async def save_details(self, details: dict):
         if details:
-            # Save to JSON
-            with open(DETAILS_JSON_FILE, "a", encoding="utf-8") as f:
-                json.dump(details, f, ensure_ascii=False)
-                f.write("\n")
-            logging.info(f"Saved to JSON: {details['URL']}")
-
-            # Save to MongoDB
-            if not details_collection.find_one({"URL": details["URL"]}):
-                details_collection.insert_one(details)
-                logging.info(f"Saved to MongoDB: {details['URL']}")
+            # JSONL line + insert-if-missing, written in batches by the sink thread
+            await self.sink.put(
+                op=UpdateOne({"URL": details["URL"]}, {"$setOnInsert": details}, upsert=True),
+                line=details,
+            )
+            logging.info(f"Queued for JSON/MongoDB: {details['URL']}")
 
     async def parse(self):
-        browser = await self.launch_browser()
-        context: BrowserContext = await browser.new_context(extra_http_headers=self.headers)
-        page: Page = await context.new_page()
-
-        urls_cursor = url_collection.find({}, {"url": 1})
-        for url_doc in urls_cursor:
-            url = url_doc.get("url")
-            if url:
-                details = await self.parse_listing(page, url)
-                await self.save_details(details)
-
-        await browser.close()
-        await self.playwright.stop()
+        self.sink = WriteSink(details_collection, DETAILS_JSON_FILE)
+        try:
+            browser = await self.launch_browser()
+            context: BrowserContext = await browser.new_context(extra_http_headers=self.headers)
+            page: Page = await context.new_page()
+
+            urls_cursor = url_collection.find({}, {"url": 1})
+            for url_doc in urls_cursor:
+                url = url_doc.get("url")
+                if url:
+                    details = await self.parse_listing(page, url)
+                    await self.save_details(details)
+
+            await browser.close()
+            await self.playwright.stop()
+        finally:
+            await self.sink.close()
+        self.waiter.close()
         logging.info("Parsing finished.")
 
 
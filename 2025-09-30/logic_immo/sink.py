@@ -0,0 +1,114 @@
+import json
+import time
+import queue
+import asyncio
+import logging
+import threading
+from pymongo.errors import BulkWriteError
+
+BATCH_SIZE = 100
+FLUSH_INTERVAL = 1.0  # seconds a partial batch may wait
+MAX_QUEUE = 10000
+STOP = object()
+
+
+class WriteSink:
+    """Writer thread that takes JSONL lines and pymongo write ops off the event loop
+
+    Coroutines call `await sink.put(...)`, which only blocks (asynchronously) when
+    the queue is full. The thread groups everything it receives into batches:
+    one file append per batch and one unordered bulk_write per batch.
+    """
+
+    def __init__(self, collection=None, jsonl_path=None, batch_size=BATCH_SIZE,
+                 flush_interval=FLUSH_INTERVAL, max_queue=MAX_QUEUE, logger=None):
+        self.collection = collection
+        self.jsonl_path = jsonl_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.logger = logger or logging.getLogger(__name__)
+        self.stats = {"lines": 0, "mongo_ops": 0, "duplicates": 0, "errors": 0, "batches": 0}
+        self.thread = threading.Thread(target=self.run, name="write-sink", daemon=True)
+        self.thread.start()
+
+    async def put(self, op=None, line=None):
+        """Queue a pymongo write op and/or a JSONL record without touching the disk or the db"""
+        while True:
+            try:
+                self.queue.put_nowait((op, line))
+                return
+            except queue.Full:
+                await asyncio.sleep(0.05)
+
+    def run(self):
+        ops, lines = [], []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                entry = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                entry = None
+
+            if entry is STOP:
+                self.flush(ops, lines)
+                return
+            if entry is not None:
+                op, line = entry
+                if op is not None:
+                    ops.append(op)
+                if line is not None:
+                    lines.append(line)
+
+            if len(ops) + len(lines) >= self.batch_size or time.monotonic() >= deadline:
+                self.flush(ops, lines)
+                ops, lines = [], []
+                deadline = time.monotonic() + self.flush_interval
+
+    def flush(self, ops, lines):
+        if not ops and not lines:
+            return
+        self.stats["batches"] += 1
+
+        if lines and self.jsonl_path:
+            try:
+                with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                    f.writelines(json.dumps(line, ensure_ascii=False, default=str) + "\n" for line in lines)
+                self.stats["lines"] += len(lines)
+            except Exception as e:
+                self.stats["errors"] += len(lines)
+                self.logger.error(f"JSONL write failed for {len(lines)} records: {e}")
+
+        if ops and self.collection is not None:
+            try:
+                self.collection.bulk_write(ops, ordered=False)
+                self.stats["mongo_ops"] += len(ops)
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                duplicates = sum(1 for err in errors if err.get("code") == 11000)
+                self.stats["duplicates"] += duplicates
+                self.stats["errors"] += len(errors) - duplicates
+                self.stats["mongo_ops"] += len(ops) - len(errors)
+                other = [err for err in errors if err.get("code") != 11000]
+                if other:
+                    self.logger.error(
+                        f"Mongo bulk write: {len(other)} of {len(ops)} ops failed, first: "
+                        f"{other[0].get('errmsg')} (code {other[0].get('code')})"
+                    )
+            except Exception as e:
+                self.stats["errors"] += len(ops)
+                self.logger.error(f"Mongo bulk write failed for {len(ops)} ops: {e}")
+
+    async def close(self):
+        """Flush what is queued and stop the writer thread"""
+        while True:
+            try:
+                self.queue.put_nowait(STOP)
+                break
+            except queue.Full:
+                await asyncio.sleep(0.05)
+        await asyncio.get_running_loop().run_in_executor(None, self.thread.join)
+        self.logger.info(
+            f"Sink closed: {self.stats['mongo_ops']} mongo ops, {self.stats['lines']} JSONL lines, "
+            f"{self.stats['duplicates']} duplicates, {self.stats['errors']} errors in {self.stats['batches']} batches"
+        )
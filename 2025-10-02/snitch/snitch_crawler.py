@@ -1,9 +1,13 @@
+import json
 import asyncio
 import logging
-from typing import List, Set
+from typing import Dict, List, Optional, Set
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
 
-from pymongo import MongoClient, errors
-from playwright.async_api import async_playwright, Page
+from pymongo import MongoClient, UpdateOne
+from curl_cffi.requests import AsyncSession
+from playwright.async_api import async_playwright, Page, Response
+from sink import WriteSink
 
 MONGODB_URI = "mongodb://localhost:27017"
 DB_NAME = "snitch_db"
@@ -39,10 +43,95 @@ EXTRA_HTTP_HEADERS = {
     "user-agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36",
 }
 
-SCROLL_WAIT = 10  # wait 10 seconds for new products
-BROWSER_HEADLESS = False
+SCROLL_WAIT = 10  # wait 10 seconds for new products (browser fallback only)
+BROWSER_HEADLESS = True
 MAX_PRODUCTS_PER_CATEGORY = 500  # <-- Set the max products per category here
 
+# Discovery mode: capture the listing XHR fired by scrolling, then paginate it over plain HTTP
+API_DISCOVERY = True
+API_CAPTURE_SCROLLS = 3  # scroll attempts to trigger the listing request
+API_CAPTURE_TIMEOUT = 15000  # ms to wait for it per scroll
+API_REQUEST_TIMEOUT = 30
+SITE_URL = "https://www.snitch.com"
+PAGE_PARAMS = ("page", "pageNo", "page_no", "pageNumber", "offset", "skip", "start", "from")
+OFFSET_PARAMS = ("offset", "skip", "start", "from")
+PRODUCT_URL_FIELDS = ("url", "product_url", "productUrl", "link", "href", "permalink")
+DROP_HEADERS = ("cookie", "content-length", "host")
+
+
+def find_product_list(payload) -> List[Dict]:
+    """Largest list of objects anywhere in the JSON payload, taken to be the product listing"""
+    best = []
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            if len(node) > len(best) and all(isinstance(x, dict) for x in node):
+                best = node
+            stack.extend(node)
+    return best
+
+
+def learn_url_template(products: List[Dict], dom_links: Set[str]) -> Optional[str]:
+    """Path template like /{handle}/{id}/buy, learned by matching JSON fields against product links in the DOM"""
+    paths = [urlsplit(link).path for link in dom_links if link.startswith(SITE_URL)]
+    for item in products:
+        values = {k: str(v) for k, v in item.items() if isinstance(v, (str, int)) and len(str(v)) >= 4}
+        if not values:
+            continue
+        for path in paths:
+            segments = path.strip("/").split("/")
+            matched = False
+            for i, segment in enumerate(segments):
+                for key, value in values.items():
+                    if segment == value:
+                        segments[i] = "{" + key + "}"
+                        matched = True
+                        break
+            if matched:
+                return "/" + "/".join(segments)
+    return None
+
+
+class ListingEndpoint:
+    """Captured listing request with its pagination parameter, replayable over plain HTTP"""
+
+    def __init__(self, method, url, headers, body, param, location, value, step, template):
+        self.method = method
+        self.url = url
+        self.headers = headers
+        self.body = body
+        self.param = param
+        self.location = location  # "query" or "body"
+        self.value = value
+        self.step = step
+        self.template = template
+
+    def request_for(self, value: int) -> Dict:
+        if self.location == "query":
+            parts = urlsplit(self.url)
+            query = [(k, str(value) if k == self.param else v) for k, v in parse_qsl(parts.query, keep_blank_values=True)]
+            return {"url": urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), "")), "data": self.body}
+
+        body = json.loads(self.body)
+        body[self.param] = value
+        return {"url": self.url, "data": json.dumps(body)}
+
+    def product_urls(self, products: List[Dict]) -> List[str]:
+        urls = []
+        for item in products:
+            direct = next((item[f] for f in PRODUCT_URL_FIELDS if isinstance(item.get(f), str) and item[f]), None)
+            if direct:
+                urls.append(urljoin(SITE_URL, direct))
+            elif self.template:
+                try:
+                    urls.append(SITE_URL + self.template.format_map({k: str(v) for k, v in item.items()}))
+                except (KeyError, ValueError, IndexError):
+                    continue
+        return urls
+
 
 class SnitchCrawler:
     def __init__(self, mongo_uri: str, db_name: str, collection_name: str):
@@ -62,6 +151,7 @@ class SnitchCrawler:
             self.collection.create_index("url", unique=True)
         except Exception as e:
             self.logger.warning(f"Could not create index: {e}")
+        self.sink = None
 
     async def extract_product_links_via_dom(self, page: Page) -> Set[str]:
         js = """
@@ -124,8 +214,8 @@ class SnitchCrawler:
             await page.evaluate("window.scrollBy(0, window.innerHeight);")
             return 0
 
-    async def scroll_until_end(self, page: Page) -> Set[str]:
-        collected = set(await self.extract_product_links_via_dom(page))
+    async def scroll_until_end(self, page: Page, collected: Optional[Set[str]] = None) -> Set[str]:
+        collected = set(collected or set()) | await self.extract_product_links_via_dom(page)
         self.logger.info(f"Initial products found: {len(collected)}")
 
         previous_height = -1
@@ -153,6 +243,106 @@ class SnitchCrawler:
 
         return collected
 
+    @staticmethod
+    def pagination_param(response: Response):
+        """(param, location, value) of the page/offset parameter of a listing request, or None"""
+        request = response.request
+        if request.resource_type not in ("xhr", "fetch"):
+            return None
+
+        query = dict(parse_qsl(urlsplit(request.url).query))
+        for param in PAGE_PARAMS:
+            if str(query.get(param, "")).isdigit():
+                return param, "query", int(query[param])
+
+        try:
+            body = json.loads(request.post_data or "")
+        except ValueError:
+            return None
+        if isinstance(body, dict):
+            for param in PAGE_PARAMS:
+                if isinstance(body.get(param), int):
+                    return param, "body", body[param]
+        return None
+
+    async def capture_listing_endpoint(self, page: Page, dom_links: Set[str]):
+        """Scroll until the site fires its JSON listing request and turn it into a ListingEndpoint"""
+        for attempt in range(API_CAPTURE_SCROLLS):
+            try:
+                async with page.expect_response(
+                    lambda r: self.pagination_param(r) is not None, timeout=API_CAPTURE_TIMEOUT
+                ) as info:
+                    await self.scroll_last_product_into_view(page)
+                response = await info.value
+                payload = await response.json()
+            except Exception as e:
+                self.logger.debug(f"No listing request on scroll {attempt + 1}: {e}")
+                continue
+
+            products = find_product_list(payload)
+            if not products:
+                continue
+
+            param, location, value = self.pagination_param(response)
+            dom_links = dom_links | await self.extract_product_links_via_dom(page)
+            template = learn_url_template(products, dom_links)
+            headers = {k: v for k, v in (await response.request.all_headers()).items()
+                       if not k.startswith(":") and k.lower() not in DROP_HEADERS}
+            endpoint = ListingEndpoint(
+                method=response.request.method,
+                url=response.request.url,
+                headers=headers,
+                body=response.request.post_data,
+                param=param,
+                location=location,
+                value=value,
+                step=len(products) if param in OFFSET_PARAMS else 1,
+                template=template,
+            )
+            if not endpoint.product_urls(products):
+                self.logger.warning(f"Listing request {endpoint.url} found but product urls could not be built")
+                return None, []
+            self.logger.info(f"Captured listing endpoint {endpoint.method} {endpoint.url} ({param}={value}, {location})")
+            return endpoint, products
+        return None, []
+
+    async def paginate_endpoint(self, endpoint: ListingEndpoint, cookies: Dict, collected: Set[str]) -> bool:
+        """Walk the captured endpoint over HTTP; False means it stopped working and the browser should take over"""
+        value = endpoint.value + endpoint.step
+        pages = 0
+        async with AsyncSession(impersonate="chrome", headers=endpoint.headers, cookies=cookies) as session:
+            while not (MAX_PRODUCTS_PER_CATEGORY and len(collected) >= MAX_PRODUCTS_PER_CATEGORY):
+                request = endpoint.request_for(value)
+                try:
+                    response = await session.request(endpoint.method, request["url"], data=request["data"],
+                                                     timeout=API_REQUEST_TIMEOUT)
+                    products = find_product_list(response.json()) if response.status_code == 200 else None
+                except Exception as e:
+                    self.logger.warning(f"Listing endpoint failed at {endpoint.param}={value}: {e}")
+                    return False
+
+                if products is None:
+                    self.logger.warning(f"Listing endpoint returned {response.status_code} at {endpoint.param}={value}")
+                    return False
+                if not products:
+                    break
+
+                urls = endpoint.product_urls(products)
+                if not urls:
+                    self.logger.warning(f"Listing payload changed shape at {endpoint.param}={value}")
+                    return False
+
+                added = len(set(urls) - collected)
+                collected.update(urls)
+                pages += 1
+                self.logger.info(f"API {endpoint.param}={value}: total collected {len(collected)} (added {added})")
+                if not added:
+                    break
+                value += endpoint.step
+
+        self.logger.info(f"Paginated {pages} pages over HTTP")
+        return True
+
     async def crawl_category(self, page: Page, category_url: str) -> Set[str]:
         self.logger.info(f"Crawling category: {category_url}")
         try:
@@ -161,36 +351,49 @@ class SnitchCrawler:
         except Exception:
             self.logger.warning(f"Timeout or load issue at {category_url}, continuing.")
 
-        collected = await self.scroll_until_end(page)
+        collected = await self.extract_product_links_via_dom(page)
+        if API_DISCOVERY:
+            endpoint, products = await self.capture_listing_endpoint(page, collected)
+            if endpoint:
+                collected.update(endpoint.product_urls(products))
+                cookies = {c["name"]: c["value"] for c in await page.context.cookies()}
+                if await self.paginate_endpoint(endpoint, cookies, collected):
+                    collected = set(list(collected)[:MAX_PRODUCTS_PER_CATEGORY]) if MAX_PRODUCTS_PER_CATEGORY else collected
+                    self.logger.info(f"Finished crawling {category_url} via API. Total collected: {len(collected)}")
+                    return collected
+                self.logger.warning(f"Captured endpoint stopped working, falling back to scrolling for {category_url}")
+            else:
+                self.logger.info(f"No listing endpoint captured for {category_url}, scrolling in browser")
+
+        collected = await self.scroll_until_end(page, collected)
         self.logger.info(f"Finished crawling {category_url}. Total collected: {len(collected)}")
         return collected
 
-    def save_one(self, url: str, source_category: str):
-        doc = {"url": url, "source": source_category}
-        try:
-            self.collection.insert_one(doc)
-            self.logger.info(f"Inserted: {url}")
-        except errors.DuplicateKeyError:
-            self.logger.debug(f"Skipped duplicate: {url}")
-        except Exception as e:
-            self.logger.error(f"Mongo insert error for {url}: {e}")
+    async def save_one(self, url: str, source_category: str):
+        # Insert-if-missing, batched by the sink thread; existing urls keep their first source
+        await self.sink.put(op=UpdateOne({"url": url}, {"$setOnInsert": {"url": url, "source": source_category}}, upsert=True))
 
     async def run(self, category_urls: List[str]):
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=BROWSER_HEADLESS)
-            context = await browser.new_context(extra_http_headers=EXTRA_HTTP_HEADERS)
-            page = await context.new_page()
+        self.sink = WriteSink(self.collection, logger=self.logger)
+        try:
+            async with async_playwright() as p:
+                browser = await p.chromium.launch(headless=BROWSER_HEADLESS)
+                context = await browser.new_context(extra_http_headers=EXTRA_HTTP_HEADERS)
+                page = await context.new_page()
 
-            for cat in category_urls:
-                try:
-                    product_urls = await self.crawl_category(page, cat)
-                    for url in product_urls:
-                        self.save_one(url, cat)
-                except Exception as e:
-                    self.logger.exception(f"Error crawling {cat}: {e}")
+                for cat in category_urls:
+                    try:
+                        product_urls = await self.crawl_category(page, cat)
+                        for url in product_urls:
+                            await self.save_one(url, cat)
+                        self.logger.info(f"Queued {len(product_urls)} urls from {cat}")
+                    except Exception as e:
+                        self.logger.exception(f"Error crawling {cat}: {e}")
 
-            await browser.close()
-            self.logger.info("Crawl finished.")
+                await browser.close()
+        finally:
+            await self.sink.close()
+        self.logger.info("Crawl finished.")
 
 
 async def main():
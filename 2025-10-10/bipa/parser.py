@@ -1,12 +1,18 @@
 import logging
 import re
 import json
+import argparse
 from datetime import datetime, timezone
 from parsel import Selector
 import requests
 from mongoengine import connect
-from settings import HEADERS, MONGO_COLLECTION_DATA, MONGO_DB
+from settings import (
+    HEADERS, MONGO_COLLECTION_DATA, MONGO_DB, CONDITIONAL_GET, MONGO_HOST,
+    MONGO_COL_URL, SHARD_COLLECTION, QUEUE_LEASE_SECONDS, QUEUE_MAX_ATTEMPTS, iteration,
+)
 from items import ProductItem, ProductUrlItem
+from conditional import ConditionalGet
+from workqueue import WorkQueue, shard_spec, run_workers
 
 
 class Parser:
@@ -16,10 +22,32 @@ class Parser:
         """initialize connections"""
         self.mongo = connect(alias="default", db=MONGO_DB, host="mongodb://localhost:27017/")
         logging.info("MongoDB connected")
+        self.conditional = ConditionalGet(enabled=CONDITIONAL_GET)
 
-    def start(self):
+    def fetch(self, url, conditional=True):
+        """GET with stored validators, a 304 means the stored product is still current"""
+        headers = self.conditional.headers_for(url, HEADERS) if conditional else HEADERS
+        return requests.get(url, headers=headers, timeout=30)
+
+    def start(self, queue=None):
+        """Parse every stored url, or with a WorkQueue only the urls this worker claims"""
         logging.info("Starting parser")
 
+        if queue is not None:
+            for record in queue.claims():
+                url = record["url"]
+                logging.info(f"[{queue.worker_id}] Processing: {url}")
+                try:
+                    if self.process(url):
+                        queue.ack(record)
+                    else:
+                        queue.fail(record, "fetch_failed")
+                except Exception as e:
+                    logging.error(f"Error processing {url}: {e}")
+                    queue.fail(record, e)
+            logging.info(f"[{queue.worker_id}] Queue drained: {queue.stats}")
+            return
+
         urls = ProductUrlItem.objects().only("url")
         total_urls = urls.count()
         
@@ -34,14 +62,38 @@ class Parser:
             logging.info(f"[{idx}/{total_urls}] Processing: {url}")
             
             try:
-                response = requests.get(url, headers=HEADERS, timeout=30)
-                if response.status_code == 200:
-                    self.parse_item(url, response)
-                else:
-                    logging.error(f"Failed: {url} ({response.status_code})")
+                self.process(url)
             except Exception as e:
                 logging.error(f"Error processing {url}: {e}")
 
+        if self.conditional.not_modified:
+            logging.info(f"{self.conditional.not_modified} products not modified, carried forward")
+
+    def process(self, url):
+        """Fetch and parse one url, False when the page could not be fetched"""
+        response = self.fetch(url)
+        if response.status_code == 304:
+            response = self.carry_forward(url)
+        if response is None:
+            return True
+        if response.status_code == 200:
+            self.parse_item(url, response)
+            self.conditional.remember(url, response)
+            return True
+        logging.error(f"Failed: {url} ({response.status_code})")
+        return False
+
+    def carry_forward(self, url):
+        """304 - keep the previous product document, refetch in full if there is none"""
+        updated = ProductItem.objects(pdp_url=url).update_one(set__extraction_date=datetime.now(timezone.utc))
+        if updated:
+            self.conditional.count_not_modified()
+            logging.info(f"Not modified: {url}")
+            return None
+
+        self.conditional.forget(url)
+        return self.fetch(url, conditional=False)
+
 
     def parse_item(self, url, response):
         """item part"""
@@ -161,7 +213,45 @@ class Parser:
         self.mongo.close()
         logging.info("Parser completed")
 
-if __name__ == "__main__":
+def url_queue():
+    return WorkQueue(MONGO_HOST, MONGO_DB, shard_spec(SHARD_COLLECTION, MONGO_COL_URL),
+                     QUEUE_LEASE_SECONDS, QUEUE_MAX_ATTEMPTS)
+
+
+def run_worker():
+    """One queue worker process: claim, parse and ack urls until the queue is empty"""
+    queue = url_queue()
     parser = Parser()
-    parser.start()
-    parser.close()
\ No newline at end of file
+    try:
+        parser.start(queue)
+    finally:
+        queue.close()
+        parser.close()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--seed", nargs="?", const=iteration, metavar="RUN_ID",
+                            help="one-shot: open run RUN_ID (default today's iteration) on the queue and exit")
+    arg_parser.add_argument("--queue", action="store_true", help="claim urls from the shared lease queue")
+    arg_parser.add_argument("--workers", type=int, default=1, help="queue worker processes on this node")
+    args = arg_parser.parse_args()
+
+    if args.seed:
+        queue = url_queue()
+        queue.seed(args.seed)
+        logging.info(f"Queue status: {queue.summary()[0]}")
+        queue.client.close()
+    elif args.queue:
+        queue = url_queue()
+        run_workers(run_worker, args.workers)
+        counts, workers = queue.summary()
+        logging.info(f"Queue status: {counts}")
+        for worker in workers:
+            logging.info(f"Worker {worker['_id']}: {worker['acked']} done, {worker['failed']} failed, "
+                         f"{worker['urls_per_minute']} urls/min")
+        queue.client.close()
+    else:
+        parser = Parser()
+        parser.start()
+        parser.close()
\ No newline at end of file
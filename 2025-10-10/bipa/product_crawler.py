@@ -1,9 +1,12 @@
 import logging
+from datetime import datetime, timezone
 import requests
 from parsel import Selector
 from mongoengine import connect
+from pymongo import UpdateOne
+from concurrent.futures import ThreadPoolExecutor
 from items import ProductUrlItem, CategoryUrlItem
-from settings import HEADERS, BASE_URL, PRODUCTS_PER_PAGE, MONGO_DB
+from settings import HEADERS, BASE_URL, PRODUCTS_PER_PAGE, PAGINATION_WORKERS, MONGO_DB
 
 
 class ProductCrawler:
@@ -12,6 +15,8 @@ class ProductCrawler:
     def __init__(self):
         """Initialize connections"""
         self.mongo = connect(alias="default", db=MONGO_DB, host="mongodb://localhost:27017/")
+        self.session = requests.Session()
+        self.session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=PAGINATION_WORKERS))
         logging.info("MongoDB connected successfully")
 
     def start(self):
@@ -25,43 +30,104 @@ class ProductCrawler:
 
         self.close()
 
-    def process_category(self, category):
-        """Parse category with pagination"""
-        page = 0
-        empty_page_count = 0
-        
-        """ Stop after 2 consecutive empty pages """
-        while empty_page_count < 2:  
-            offset = page * PRODUCTS_PER_PAGE
-            paged_url = f"{category.url}?offset={offset}"
-
-            try:
-                response = requests.get(paged_url, headers=HEADERS, timeout=30)
-                
-                if response.status_code != 200:
-                    logging.warning(f"[{category.name}] Failed to fetch page {page + 1}")
-                    break
-
-                """ Check if page has products """
-                has_products = self.parse_item(response, category)
-                
-                if has_products:
-                    empty_page_count = 0  
-                    page += 1
-                else:
-                    empty_page_count += 1
-                    if empty_page_count < 2:  
-                        page += 1
-                        
-            except requests.RequestException as e:
-                logging.error(f"[{category.name}] Error fetching page {page + 1}: {e}")
+    def fetch_page(self, category, page):
+        """Product URLs on one ?offset= page, None when the request failed"""
+        paged_url = f"{category.url}?offset={page * PRODUCTS_PER_PAGE}"
+        try:
+            response = self.session.get(paged_url, headers=HEADERS, timeout=30)
+        except requests.RequestException as e:
+            logging.error(f"[{category.name}] Error fetching page {page + 1}: {e}")
+            return None
+        if response.status_code != 200:
+            logging.warning(f"[{category.name}] Failed to fetch page {page + 1}")
+            return None
+        return self.parse_item(response)
+
+    def find_last_page(self, category, pages):
+        """Index of the last non-empty page, -1 for an empty category, None when a probe failed
+
+        Pages double (1, 2, 4, ...) until one comes back empty, then a binary
+        search between the last non-empty and the first empty page finds the
+        end: O(log pages) requests instead of a walk to the end plus two empty
+        pages. As in that walk, an empty page only counts as the end when the
+        page after it is empty too, so one spurious empty page does not cut the
+        category short. Fetched pages are kept in `pages` so they are not fetched twice.
+        """
+        def probe(page):
+            if page not in pages:
+                pages[page] = self.fetch_page(category, page)
+            return pages[page]
+
+        def is_end(page):
+            """True when page and page + 1 are both empty, None when a probe failed"""
+            for p in (page, page + 1):
+                urls = probe(p)
+                if urls is None:
+                    return None
+                if urls:
+                    return False
+            return True
+
+        first = probe(0)
+        if first is None:
+            return None
+        if not first:
+            end = is_end(0)
+            if end is None:
+                return None
+            if end:
+                return -1
+
+        low, high = 0, 1
+        while True:
+            end = is_end(high)
+            if end is None:
+                return None
+            if end:
                 break
+            low = high if pages[high] else high + 1
+            high = low * 2
+
+        """ low has products (or sits right after a lone empty page), high is empty and so is high + 1 """
+        while high - low > 1:
+            mid = (low + high) // 2
+            end = is_end(mid)
+            if end is None:
+                return None
+            if end:
+                high = mid
+            else:
+                low = mid if pages[mid] else mid + 1
+        return low
+
+    def process_category(self, category):
+        """Parse category with pagination: probe for the last page, then fetch the rest concurrently"""
+        pages = {}
+        last_page = self.find_last_page(category, pages)
+        if last_page is None:
+            logging.warning(f"[{category.name}] Pagination probe failed")
+            last_page = max([p for p, urls in pages.items() if urls] or [-1])
+        probes = len(pages)
+
+        missing = [page for page in range(last_page + 1) if page not in pages]
+        with ThreadPoolExecutor(max_workers=PAGINATION_WORKERS) as executor:
+            for page, urls in zip(missing, executor.map(lambda p: self.fetch_page(category, p), missing)):
+                pages[page] = urls
+
+        urls = set()
+        for page in range(last_page + 1):
+            urls.update(pages[page] or [])
+        self.item_yield(urls, category)
 
-        logging.info(f"[{category.name}] Pagination completed at page {page}")
+        failed = sum(1 for page in range(last_page + 1) if pages[page] is None)
+        logging.info(
+            f"[{category.name}] Pagination completed: {last_page + 1} pages, {probes} probes, "
+            f"{len(missing)} fetched concurrently, {failed} failed"
+        )
 
     """ PARSE ITEM """
-    def parse_item(self, response, category):
-        """Extract product URLs from a category page - returns True if products found"""
+    def parse_item(self, response):
+        """Extract product URLs from a category page"""
         sel = Selector(response.text)
 
         """ XPATH """
@@ -69,13 +135,7 @@ class ProductCrawler:
 
         """ EXTRACT """
         product_links = sel.xpath(PRODUCT_XPATH).getall()
-        urls = self.clean_urls(product_links)
-
-        if not urls:
-            return False
-
-        self.item_yield(urls, category)
-        return True
+        return self.clean_urls(product_links)
 
     def clean_urls(self, links):
         """Normalize and deduplicate product URLs"""
@@ -96,21 +156,22 @@ class ProductCrawler:
 
     """ ITEM YIELD """
     def item_yield(self, urls, category):
-        """Save product URLs to MongoDB"""
-        saved_count = 0
-        for url in urls:
-            try:
-                """ Check if URL already exists """
-                if not ProductUrlItem.objects(url=url).first():
-                    ProductUrlItem(url=url, category_url=category.url).save()
-                    saved_count += 1
-            except Exception as e:
-                logging.warning(f"Failed to save URL {url}: {e}")
-        
-        logging.info(f"Saved {saved_count} new product URLs")
+        """Save product URLs to MongoDB, one bulk insert-if-missing per category"""
+        if not urls:
+            return
+        now = datetime.now(timezone.utc)
+        ops = [UpdateOne({"url": url}, {"$setOnInsert": {"url": url, "category_url": category.url, "timestamp": now}},
+                         upsert=True)
+               for url in urls]
+        try:
+            result = ProductUrlItem._get_collection().bulk_write(ops, ordered=False)
+            logging.info(f"Saved {result.upserted_count} new product URLs")
+        except Exception as e:
+            logging.warning(f"Failed to save URLs of {category.url}: {e}")
 
     def close(self):
         """Close connections"""
+        self.session.close()
         logging.info("Product crawling completed")
 
 if __name__ == "__main__":
@@ -52,6 +52,7 @@ MONGO_COLLECTION_MISMATCH = f"{PROJECT_NAME}_mismatch"
 MONGO_COLLECTION_EMPTY = f"{PROJECT_NAME}_empty"
 MONGO_COLLECTION_COUNT = f"{PROJECT_NAME}_count"
 MONGO_COLLECTION_PAGINATION = f"{PROJECT_NAME}_pagination"
+MONGO_COLLECTION_VALIDATORS = f"{PROJECT_NAME}_validators"
 
 """ MongoDB Connection """
 connect(db=MONGO_DB, host=f"mongodb://localhost:27017/{MONGO_DB}", alias="default")
@@ -61,6 +62,11 @@ MONGO_COL_URL = MONGO_COLLECTION_URL
 SHARD_COLLECTION = [
     {"col": MONGO_COL_URL, "unique": True, "indexfield": "url"},
 ]
+MONGO_HOST = "mongodb://localhost:27017/"
+
+""" WORK QUEUE (parser.py --queue) """
+QUEUE_LEASE_SECONDS = 300   # a url leased by a crashed worker is handed out again after this
+QUEUE_MAX_ATTEMPTS = 3
 
 """ HEADERS AND NETWORK CONFIG """
 HEADERS = {
@@ -78,8 +84,12 @@ HEADERS = {
 
 
 
+""" CONDITIONAL GET (If-None-Match / If-Modified-Since) FOR PDP REFRESH RUNS """
+CONDITIONAL_GET = True
+
 """ PAGINATION CONFIGURATION """
 PRODUCTS_PER_PAGE = 24
+PAGINATION_WORKERS = 8      # category pages fetched at once once the last offset is known
 
 
 FILE_HEADERS = [
@@ -1,146 +1,193 @@
 import logging
+import datetime
 import requests
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pymongo import UpdateOne
 from mongoengine import connect
-from items import QatarLivingPropertyItem, ProductFailedItem
-from settings import HEADERS, MONGO_DB, PROPERTIES_BASE_URL, PER_PAGE, CATEGORIES
+from items import QatarLivingPropertyItem, ProductUrlItem, ProductCategoryUrlItem, ProductFailedItem
+from settings import HEADERS, MONGO_DB, PROPERTIES_BASE_URL, PER_PAGE, CATEGORIES, PAGE_WORKERS, BULK_SIZE, SHARD_COLLECTION
 
 
 class Parser:
-    """parser"""
+    """Single pass over the listing API: every page already carries the full ad, so
+    urls and property items are written from the same response"""
 
     def __init__(self):
         self.session = requests.Session()
         self.initialize_mongo_connection()
-        
+        self.item_ops = []
+        self.url_ops = []
+        self.saved = 0
+
     def initialize_mongo_connection(self):
         """Initialize MongoDB connection for MongoEngine"""
 
         connect(db=MONGO_DB, alias='default', host='mongodb://localhost:27017/')
         logging.info(f"MongoDB connected to database: {MONGO_DB}")
+
+        self.item_collection = QatarLivingPropertyItem._get_collection()
+        self.url_collection = ProductUrlItem._get_collection()
+        self.item_collection.create_index("unique_id", unique=True)
+        for spec in SHARD_COLLECTION:
+            self.item_collection.database[spec["col"]].create_index(spec["indexfield"], unique=spec.get("unique", False))
         return True
 
     def start(self):
         """start code - Parse all properties directly from API"""
         logging.info("Starting to parse properties from API...")
-        
-        # Track failed API calls
+
         failed_categories = []
-        
-        for category in CATEGORIES:
-            logging.info(f"Parsing category {category}...")
-            page = 1
-            category_failed = False
-            
-            while True:
-                try:
-                    params = {
-                        "category": category,
-                        "cur_page": page,
-                        "per_page": PER_PAGE
-                    }
-
-                    response = self.session.get(PROPERTIES_BASE_URL, params=params, headers=HEADERS, timeout=15)
-                    if response.status_code == 200:
-                        data = response.json()
-                        ads = data.get("ads", [])
-                        meta = data.get("meta", {})
-
-                        if not ads:
-                            logging.info(f"No more ads found for category {category}")
-                            break
-
-                        """Process all ads in this page"""
-                        ads_processed = 0
-                        for ad in ads:
-                            if self.process_ad_data(ad, category):
-                                ads_processed += 1
-
-                        total_pages = meta.get("totalPages", 1)
-                        logging.info(f"Processed page {page}/{total_pages} for category {category} - {ads_processed} ads saved")
-
-                        if page >= total_pages:
-                            break
-                        page += 1
-                        time.sleep(1) 
-                    else:
-                        logging.error(f"API error for category {category} page {page}: Status {response.status_code}")
-                        self.save_failed_url(f"Category {category} page {page}", f"HTTP {response.status_code}")
-                        category_failed = True
-                        break
-
-                except Exception as e:
-                    logging.error(f"Error processing category {category} page {page}: {e}")
-                    self.save_failed_url(f"Category {category} page {page}", str(e))
-                    category_failed = True
-                    break
-
-            if category_failed:
-                failed_categories.append(category)
+        try:
+            with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as executor:
+                for category in CATEGORIES:
+                    if not self.parse_category(category, executor):
+                        failed_categories.append(category)
+        finally:
+            self.flush()
 
         # Save failed categories summary
         if failed_categories:
             self.save_failed_url(f"Failed categories: {failed_categories}", "Category parsing failed")
-        
-        logging.info("Property parsing completed")
-        if failed_categories:
             logging.warning(f"Failed to parse categories: {failed_categories}")
 
+        logging.info(f"Property parsing completed - {self.saved} ads saved")
+
+    def parse_category(self, category, executor):
+        """Page 1 gives totalPages, the remaining pages are fetched concurrently"""
+        logging.info(f"Parsing category {category}...")
+
+        category_url = f"{PROPERTIES_BASE_URL}?category={category}"
+        ProductCategoryUrlItem(url=category_url, category_id=category).save()
+
+        data = self.fetch_page(category, 1)
+        if data is None:
+            return False
+
+        total_pages = data.get("meta", {}).get("totalPages", 1)
+        ok = self.safe_process_page(data, category, 1, total_pages)
+
+        futures = {executor.submit(self.fetch_page, category, page): page for page in range(2, total_pages + 1)}
+        for future in as_completed(futures):
+            data = future.result()
+            if data is None:
+                ok = False
+                continue
+            ok = self.safe_process_page(data, category, futures[future], total_pages) and ok
+        return ok
+
+    def safe_process_page(self, data, category, page, total_pages):
+        """process_page, with a bad page recorded instead of aborting the remaining categories"""
+        try:
+            self.process_page(data, category, page, total_pages)
+            return True
+        except Exception as e:
+            logging.error(f"Error processing category {category} page {page}: {e}")
+            self.save_failed_url(f"Category {category} page {page}", str(e))
+            return False
+
+    def fetch_page(self, category, page):
+        """Runs on the worker threads, returns the decoded page or None after recording the failure"""
+        params = {
+            "category": category,
+            "cur_page": page,
+            "per_page": PER_PAGE
+        }
+        try:
+            response = self.session.get(PROPERTIES_BASE_URL, params=params, headers=HEADERS, timeout=15)
+            if response.status_code == 200:
+                return response.json()
+            logging.error(f"API error for category {category} page {page}: Status {response.status_code}")
+            self.save_failed_url(f"Category {category} page {page}", f"HTTP {response.status_code}")
+        except Exception as e:
+            logging.error(f"Error processing category {category} page {page}: {e}")
+            self.save_failed_url(f"Category {category} page {page}", str(e))
+        return None
+
+    def process_page(self, data, category, page, total_pages):
+        """Queue one upsert per ad, keyed on adId"""
+        ads = data.get("ads", [])
+        ads_processed = 0
+        for ad in ads:
+            if self.process_ad_data(ad, category):
+                ads_processed += 1
+
+        logging.info(f"Processed page {page}/{total_pages} for category {category} - {ads_processed} ads queued")
+        if len(self.item_ops) >= BULK_SIZE:
+            self.flush()
+
     def process_ad_data(self, ad, category_id):
-        """Process individual ad data and save to MongoDB"""
-        
+        """Build the property item for one ad and queue its upserts"""
+
         try:
             ad_id = ad.get("adId")
             if not ad_id:
                 logging.warning(f"Ad missing ID, skipping...")
                 return False
 
-            """Check if ad already exists"""
-            existing_ad = QatarLivingPropertyItem.objects(unique_id=str(ad_id)).first()
-            if existing_ad:
-                logging.debug(f"Ad {ad_id} already exists, skipping...")
-                return False
-
             """Build the URL from the API data"""
-            url_path = ad.get('urls', [{}])[0].get('urlAlias', '')
+            url_path = (ad.get('urls') or [{}])[0].get('urlAlias', '')
             url = f"https://qlp.qatarliving.com{url_path}" if url_path else ""
 
-            item = QatarLivingPropertyItem(
-                unique_id=str(ad_id),
-                url=url,
-                title=ad.get("title", "").strip(),
-                price=str(ad.get("price", "")),
-                bedroom=ad.get("bedroom", {}).get("name", ""),
-                bathroom=ad.get("bathroom", {}).get("name", ""),
-                furnishing=ad.get("furnishing", {}).get("name", ""),
-                property_type=ad.get("propertyType", {}).get("name", ""),
-                square_meters=str(ad.get("squareMeters", "")),
-                country=ad.get("location", {}).get("country", {}).get("name", ""),
-                city=ad.get("location", {}).get("city", {}).get("name", ""),
-                agent_name=ad.get("user", {}).get("name", ""),
-                company=ad.get("companyUser", {}).get("name", ""),
-                images=[
+            item = {
+                "unique_id": str(ad_id),
+                "url": url,
+                "title": ad.get("title", "").strip(),
+                "price": str(ad.get("price", "")),
+                "bedroom": ad.get("bedroom", {}).get("name", ""),
+                "bathroom": ad.get("bathroom", {}).get("name", ""),
+                "furnishing": ad.get("furnishing", {}).get("name", ""),
+                "property_type": ad.get("propertyType", {}).get("name", ""),
+                "square_meters": str(ad.get("squareMeters", "")),
+                "country": ad.get("location", {}).get("country", {}).get("name", ""),
+                "city": ad.get("location", {}).get("city", {}).get("name", ""),
+                "agent_name": ad.get("user", {}).get("name", ""),
+                "company": ad.get("companyUser", {}).get("name", ""),
+                "images": [
                     f"https://qlp.qatarliving.com/{img.get('uri')}"
                     for img in ad.get("images", [])
                     if img.get("uri")
                 ],
-                category_id=category_id
-            )
-
-            item.save()
-            logging.info(f"Saved ad: {ad_id} - {ad.get('title', '')}")
+                "category_id": category_id,
+            }
+
+            self.item_ops.append(UpdateOne(
+                {"unique_id": item["unique_id"]},
+                {"$set": item, "$setOnInsert": {"timestamp": datetime.datetime.utcnow()}},
+                upsert=True,
+            ))
+            if url:
+                self.url_ops.append(UpdateOne({"url": url}, {"$setOnInsert": {"url": url}}, upsert=True))
             return True
-            
+
         except Exception as e:
-            logging.error(f"Error saving ad {ad.get('adId', 'unknown')}: {e}")
+            logging.error(f"Error building ad {ad.get('adId', 'unknown')}: {e}")
 
             """Save failed ad URL if available"""
-            url_path = ad.get('urls', [{}])[0].get('urlAlias', '')
+            url_path = ((ad.get('urls') or [{}])[0] or {}).get('urlAlias', '')
             if url_path:
                 failed_url = f"https://qlp.qatarliving.com{url_path}"
-                self.save_failed_url(failed_url, f"Failed to save ad: {str(e)}")
+                self.save_failed_url(failed_url, f"Failed to build ad: {str(e)}")
             return False
 
+    def flush(self):
+        """Write the queued item and url upserts in one bulk call each"""
+        if self.item_ops:
+            ops, self.item_ops = self.item_ops, []
+            try:
+                self.item_collection.bulk_write(ops, ordered=False)
+                self.saved += len(ops)
+                logging.info(f"Bulk upserted {len(ops)} ads ({self.saved} total)")
+            except Exception as e:
+                logging.error(f"Bulk upsert of {len(ops)} ads failed: {e}")
+                self.save_failed_url(f"Bulk upsert of {len(ops)} ads", str(e))
+
+        if self.url_ops:
+            ops, self.url_ops = self.url_ops, []
+            try:
+                self.url_collection.bulk_write(ops, ordered=False)
+            except Exception as e:
+                logging.error(f"Bulk upsert of {len(ops)} urls failed: {e}")
+
     def save_failed_url(self, url, error_message=""):
         """Save failed URL to ProductFailedItem collection"""
         failed_item = ProductFailedItem(
@@ -158,4 +205,4 @@ class Parser:
 if __name__ == "__main__":
     parser_obj = Parser()
     parser_obj.start()
-    parser_obj.close()
\ No newline at end of file
+    parser_obj.close()
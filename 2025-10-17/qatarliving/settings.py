@@ -57,4 +57,7 @@ HEADERS = {
 # Qatar Living Properties specific settings
 PROPERTIES_BASE_URL = "https://qlpbackendprod.azurewebsites.net/properties"
 PER_PAGE = 20
-CATEGORIES = [1, 2, 3, 4, 5]  # Categories 1 to 5
\ No newline at end of file
+CATEGORIES = [1, 2, 3, 4, 5]  # Categories 1 to 5
+# Single-pass parser: pages fetched concurrently per category, ads upserted in bulk
+PAGE_WORKERS = 5
+BULK_SIZE = 200
@@ -0,0 +1,90 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from uuid import uuid4
+import zstandard
+from items import ProductResponseItem
+from settings import ARCHIVE_DIR, ARCHIVE_LEVEL, iteration
+
+
+class ArchivedResponse:
+    """Response rebuilt from the archive, exposes the attributes parse_item uses"""
+
+    def __init__(self, url, content, status_code=200, headers=None):
+        self.url = url
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class ResponseArchive:
+    """Content-addressed, zstd compressed store of raw responses keyed by url and fetch date
+
+    Safe to share between parser threads: the zstd contexts are used under a
+    lock and every blob is written through its own temp file.
+    """
+
+    def __init__(self, root=ARCHIVE_DIR, level=ARCHIVE_LEVEL):
+        self.root = root
+        self.compressor = zstandard.ZstdCompressor(level=level)
+        self.decompressor = zstandard.ZstdDecompressor()
+        self.lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def blob_path(self, digest):
+        return os.path.join(self.root, digest[:2], f"{digest}.zst")
+
+    def save(self, url, response, fetch_date=iteration):
+        """Store response body once per digest and index it against url + fetch date"""
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.blob_path(digest)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with self.lock:
+                compressed = self.compressor.compress(content)
+            tmp_path = f"{path}.{uuid4().hex}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+
+        try:
+            ProductResponseItem.objects(url=url, fetch_date=fetch_date).update_one(
+                set__sha256=digest,
+                set__status_code=response.status_code,
+                set__size=len(content),
+                upsert=True,
+            )
+        except Exception as e:
+            logging.error(f"Archive index error for {url}: {e}")
+        return digest
+
+    def load(self, url, fetch_date=None):
+        """Return the archived response for url, latest fetch unless a date is given"""
+        query = ProductResponseItem.objects(url=url)
+        if fetch_date:
+            query = query.filter(fetch_date=fetch_date)
+        record = query.order_by("-fetch_date").first()
+        if not record:
+            return None
+
+        path = self.blob_path(record.sha256)
+        if not os.path.exists(path):
+            logging.warning(f"Archive blob missing for {url}: {record.sha256}")
+            return None
+
+        with open(path, "rb") as f:
+            data = f.read()
+        with self.lock:
+            content = self.decompressor.decompress(data)
+        return ArchivedResponse(url, content, record.status_code or 200)
@@ -0,0 +1,41 @@
+import time
+import random
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+
+class HostBudget:
+    """Per-host request budget shared by every thread of a run
+
+    At most `concurrency` requests are in flight to one host, and request
+    starts to that host are spaced at least `min_interval` seconds apart (plus
+    up to `jitter` seconds). Threads waiting for a slot block; the rest keep
+    working against other hosts or on parsing.
+    """
+
+    def __init__(self, concurrency=4, min_interval=0.5, jitter=0.5):
+        self.concurrency = concurrency
+        self.min_interval = min_interval
+        self.jitter = jitter
+        self.lock = threading.Lock()
+        self.hosts = {}
+
+    def host(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.hosts:
+                self.hosts[host] = {"slots": threading.BoundedSemaphore(self.concurrency), "next_start": 0.0}
+            return self.hosts[host]
+
+    @contextmanager
+    def slot(self, url):
+        state = self.host(url)
+        with state["slots"]:
+            with self.lock:
+                now = time.monotonic()
+                start = max(now, state["next_start"])
+                state["next_start"] = start + self.min_interval + random.uniform(0, self.jitter)
+            if start > now:
+                time.sleep(start - now)
+            yield
@@ -1,25 +1,54 @@
 import logging
-import random
+import argparse
+import threading
 import time
 from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from parsel import Selector
 from curl_cffi import requests
 from mongoengine import connect
 from items import ProductUrlItem, ProductFailedItem
-from settings import HEADERS, BASE_URL, MONGO_DB
+from metrics import RequestMetrics
+from httpcache import HttpCache
+import settings
+from budget import HostBudget
+from settings import (
+    HEADERS, BASE_URL, MONGO_DB, PROJECT_NAME, METRICS_DIR,
+    HTTP_CACHE_PATH, HTTP_CACHE_MAX_MB, HTTP_CACHE_RULES,
+    SUBCATEGORY_WORKERS, HOST_CONCURRENCY, HOST_MIN_INTERVAL, HOST_JITTER,
+)
 
 
 class Crawler:
     """REWE Crawler"""
 
-    def __init__(self):
+    def __init__(self, use_cache=None, budget=None, on_product=None):
         self.mongo = connect(alias="default", db=MONGO_DB, host="mongodb://localhost:27017/")
         logging.info("MongoDB connected successfully")
+        self.metrics = RequestMetrics(f"{PROJECT_NAME}_crawler", METRICS_DIR)
+        if use_cache is None:
+            use_cache = settings.HTTP_CACHE   # read per instance, so a runner can switch it off after import
+        self.cache = HttpCache(HTTP_CACHE_PATH, HTTP_CACHE_RULES, HTTP_CACHE_MAX_MB, enabled=use_cache)
+        self.budget = budget or HostBudget(HOST_CONCURRENCY, HOST_MIN_INTERVAL, HOST_JITTER)
+        self.on_product = on_product
+        self.seen = set()
+        self.seen_lock = threading.Lock()
 
     def fetch(self, url):
-        response = requests.get(url, headers=HEADERS, impersonate="chrome120", timeout=30)
+        response = self.cache.get(lambda: self.request(url), url)
         return response.text if response.status_code == 200 else ""
 
+    def request(self, url):
+        with self.budget.slot(url):
+            started = time.perf_counter()
+            try:
+                response = requests.get(url, headers=HEADERS, impersonate="chrome120", timeout=30)
+            except Exception:
+                self.metrics.observe_response(url, None, started)
+                raise
+            self.metrics.observe_response(url, response, started)
+        return response
+
     def start(self):
         """Requesting Start url"""
         logging.info(" Starting REWE crawler ")
@@ -28,43 +57,60 @@ class Crawler:
         categories = Selector(text=home_html).xpath('//nav//a[contains(@href,"/c/")]/@href').extract()
         logging.info(f"Found {len(categories)} categories")
 
-        for cat in categories[5:]:
-            meta = {'category_url': urljoin(BASE_URL, cat)}
-            logging.info(f"Category: {meta['category_url']}")
-            self.parse_category(meta)
+        """ Phase 1: subcategories of every category, phase 2: each subcategory paginated as its own job """
+        with ThreadPoolExecutor(max_workers=SUBCATEGORY_WORKERS) as executor:
+            metas = [{'category_url': urljoin(BASE_URL, cat)} for cat in categories[5:]]
+            jobs = []
+            for subcats in executor.map(self.parse_category, metas):
+                jobs.extend(subcats)
+            logging.info(f"Found {len(jobs)} subcategories")
 
+            futures = {executor.submit(self.crawl_subcategory, meta): meta for meta in jobs}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    logging.error(f"Subcategory {futures[future]['subcategory_url']} failed: {e}")
 
     def parse_category(self, meta):
-        """Parse category page"""
-        cat_html = self.fetch(meta['category_url'])
+        """Parse category page, subcategory jobs of the category (itself when it has none)"""
+        logging.info(f"Category: {meta['category_url']}")
+        try:
+            cat_html = self.fetch(meta['category_url'])
+        except Exception as e:
+            logging.error(f"Category {meta['category_url']} failed: {e}")
+            return []
         subcats = Selector(text=cat_html).xpath('//a[contains(@class,"plr-CategoryNavigationTile__Item")]/@href').extract() or [meta['category_url']]
-
-        for sub in subcats:
-            meta = {"subcategory_url": urljoin(BASE_URL, sub), "page": 1}
-            logging.info(f"Processing Subcategory: {meta['subcategory_url']}")
-            
-            while True:
-                is_next = self.parse_subcategory(meta)
-                if not is_next:
-                    logging.info("Pagination completed")
-                    break
-                meta["page"] += 1
-
-
+        return [
+            {"category_url": meta['category_url'], "subcategory_url": urljoin(BASE_URL, sub), "page": 1}
+            for sub in subcats
+        ]
+
+    def crawl_subcategory(self, meta):
+        logging.info(f"Processing Subcategory: {meta['subcategory_url']}")
+        meta = dict(meta, page_url=meta['subcategory_url'])
+        while self.parse_subcategory(meta):
+            meta["page"] += 1
+        logging.info(f"Pagination completed: {meta['subcategory_url']} ({meta['page']} pages)")
 
     def parse_subcategory(self, meta):
-        """Parse subcategory page with products"""
-        html = self.fetch(meta['subcategory_url'])
-        products = Selector(text=html).xpath('//a[contains(@class,"a-pt__product-tile__link")]/@href').extract()
+        """Parse subcategory page with products, one Selector per page"""
+        sel = Selector(text=self.fetch(meta['page_url']))
+        products = sel.xpath('//a[contains(@class,"a-pt__product-tile__link")]/@href').extract()
         
         if products:
-            logging.info(f"    Found {len(products)} products")
+            logging.info(f"    Found {len(products)} products on page {meta['page']} of {meta['subcategory_url']}")
             for product_url in products:
                 item = {}
                 item['url'] = urljoin(BASE_URL, product_url)
                 item['category_url'] = meta.get('category_url')
                 item['subcategory_url'] = meta.get('subcategory_url')
                 
+                with self.seen_lock:
+                    if item['url'] in self.seen:
+                        continue
+                    self.seen.add(item['url'])
+
                 try:
                     """ save """
                     ProductUrlItem(**item).save()
@@ -73,11 +119,14 @@ class Crawler:
                 except Exception as e:
                     logging.error(f"Save error for {item['url']}: {e}")
 
+                """ Hand the url straight to the parser when running as a pipeline """
+                if self.on_product:
+                    self.on_product(item['url'])
+
             """ Next_page """
-            next_page = Selector(text=html).xpath('//a[contains(@class,"plr-pagination-button-right")]/@href').extract_first()
+            next_page = sel.xpath('//a[contains(@class,"plr-pagination-button-right")]/@href').extract_first()
             if next_page:
-                meta['subcategory_url'] = urljoin(BASE_URL, next_page)
-                time.sleep(random.uniform(1, 2))
+                meta['page_url'] = urljoin(BASE_URL, next_page)
                 return True
             return False
         return False
@@ -88,10 +137,16 @@ class Crawler:
 
     def close(self):
         """Close function for all module object closing"""
+        self.metrics.close()
+        self.cache.close()
         logging.info("Crawler finished")
 
 if __name__ == "__main__":
-    crawler = Crawler()
+    arg_parser = argparse.ArgumentParser(description="REWE category and product url crawler")
+    arg_parser.add_argument("--no-cache", action="store_true", help="fetch every page, ignoring the HTTP cache")
+    args = arg_parser.parse_args()
+
+    crawler = Crawler(use_cache=False if args.no_cache else None)
     crawler.start()
     crawler.close()
  
\ No newline at end of file
@@ -1,7 +1,11 @@
 import csv
 import logging
+import argparse
 from pymongo import MongoClient
-from settings import MONGO_DB, MONGO_COLLECTION_DATA, FILE_NAME, FILE_HEADERS
+from settings import (
+    MONGO_DB, MONGO_COLLECTION_DATA, MONGO_COLLECTION_DELTA,
+    FILE_NAME, DELTA_FILE_NAME, FILE_HEADERS, iteration
+)
 
 
 class Export:
@@ -59,6 +63,36 @@ class Export:
         logging.info("MongoDB connection closed")
 
 
+class DeltaExport:
+    """Export only the fields that changed in this iteration, one row per field"""
+
+    DELTA_HEADERS = ["unique_id", "change_type", "field", "old_value", "new_value", "iteration"]
+
+    def __init__(self, writer):
+        self.client = MongoClient("mongodb://localhost:27017/")
+        self.collection = self.client[MONGO_DB][MONGO_COLLECTION_DELTA]
+        self.writer = writer
+
+    def start(self):
+        self.writer.writerow(self.DELTA_HEADERS)
+        count = 0
+        for delta in self.collection.find({"iteration": iteration}, no_cursor_timeout=True):
+            for field, change in delta.get("fields", {}).items():
+                self.writer.writerow([
+                    delta["key"],
+                    delta.get("change_type", ""),
+                    field,
+                    change.get("old", ""),
+                    change.get("new", ""),
+                    delta.get("iteration", ""),
+                ])
+            count += 1
+        logging.info(f"Delta export completed. Products with changes: {count}")
+
+    def close(self):
+        self.client.close()
+
+
 if __name__ == "__main__":
     logging.basicConfig(
         level=logging.INFO,
@@ -66,10 +100,15 @@ if __name__ == "__main__":
         datefmt="%Y-%m-%d %H:%M:%S",
     )
 
-    with open(FILE_NAME, "w", newline="", encoding="utf-8") as file:
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--delta", action="store_true", help="export only changed fields of this iteration")
+    args = arg_parser.parse_args()
+
+    file_name = DELTA_FILE_NAME if args.delta else FILE_NAME
+    with open(file_name, "w", newline="", encoding="utf-8") as file:
         writer = csv.writer(file, delimiter=",", quotechar='"', quoting=csv.QUOTE_MINIMAL)
-        export = Export(writer)
+        export = DeltaExport(writer) if args.delta else Export(writer)
         export.start()
         export.close()
 
-    logging.info(f"CSV file '{FILE_NAME}' created successfully")
+    logging.info(f"CSV file '{file_name}' created successfully")
@@ -0,0 +1,141 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from urllib.parse import urlencode
+
+DEFAULT_MAX_MB = 200
+
+
+class CachedResponse:
+    """The parts of a requests/curl_cffi response the crawlers read, rebuilt from the cache"""
+
+    def __init__(self, url, status_code, headers, content, from_cache=True):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise Exception(f"HTTP {self.status_code} for {self.url}")
+
+
+class HttpCache:
+    """On-disk response cache shared across runs, for pages that rarely change
+
+    `rules` is a list of (url regex, ttl seconds); the first match decides the
+    ttl and urls matching no rule are never cached. Entries are keyed on
+    method, url, sorted params and `store` (service point, pin code, ... for
+    responses that differ per store) and live in one sqlite file. Every hit
+    refreshes the entry's access time; once the bodies pass `max_mb` the least
+    recently used entries are evicted. Only 200 responses are stored.
+    """
+
+    def __init__(self, path, rules, max_mb=DEFAULT_MAX_MB, enabled=True):
+        self.rules = [(re.compile(pattern), ttl) for pattern, ttl in rules]
+        self.max_bytes = max_mb * 1024 * 1024
+        self.enabled = enabled
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+        self.lock = threading.Lock()
+        self.db = None
+        if not enabled:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, url TEXT, status INTEGER, headers TEXT, "
+            "body BLOB, size INTEGER, stored_at REAL, expires_at REAL, accessed_at REAL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+        self.db.commit()
+
+    def ttl(self, url):
+        for pattern, ttl in self.rules:
+            if pattern.search(url):
+                return ttl
+        return None
+
+    def key(self, method, url, params=None, store=None):
+        query = urlencode(sorted((params or {}).items()), doseq=True)
+        return hashlib.sha1(f"{method.upper()} {url}?{query} @{store or ''}".encode("utf-8")).hexdigest()
+
+    def get(self, fetch, url, method="GET", params=None, store=None):
+        """Cached response for the request, or the result of `fetch()` (stored when cacheable)"""
+        ttl = self.ttl(url) if self.enabled else None
+        if ttl is None:
+            return fetch()
+
+        key = self.key(method, url, params, store)
+        now = time.time()
+        with self.lock:
+            row = self.db.execute(
+                "SELECT status, headers, body FROM entries WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row:
+                self.db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+                self.db.commit()
+                self.stats["hits"] += 1
+        if row:
+            logging.info(f"Cache hit: {url}")
+            return CachedResponse(url, row[0], json.loads(row[1]), row[2])
+
+        with self.lock:
+            self.stats["misses"] += 1
+        response = fetch()
+        if response is not None and response.status_code == 200:
+            self.put(key, url, response, ttl)
+        return response
+
+    def put(self, key, url, response, ttl):
+        body = response.content or b""
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, response.status_code, json.dumps(dict(response.headers)), body, len(body), now, now + ttl, now),
+            )
+            self.stats["stored"] += 1
+            self.evict()
+            self.db.commit()
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until the cache fits max_mb"""
+        self.stats["evicted"] += self.db.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),)).rowcount
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.db.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall():
+            self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self.stats["evicted"] += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        if self.db is not None:
+            with self.lock:
+                self.db.execute("DELETE FROM entries")
+                self.db.commit()
+
+    def close(self):
+        if self.db is None:
+            return
+        logging.info(
+            f"HTTP cache: {self.stats['hits']} hits, {self.stats['misses']} misses, "
+            f"{self.stats['stored']} stored, {self.stats['evicted']} evicted"
+        )
+        self.db.close()
+        self.db = None
@@ -4,7 +4,8 @@ from settings import (
     MONGO_COL_URL, MONGO_COLLECTION_CATEGORY, MONGO_COLLECTION_EMPTY,
     MONGO_COLLECTION_URL_FAILED,
     MONGO_COLLECTION_DATA, MONGO_COLLECTION_MISMATCH,
-    MONGO_COLLECTION_RESPONSE, MONGO_COLLECTION_PAGINATION
+    MONGO_COLLECTION_RESPONSE, MONGO_COLLECTION_PAGINATION,
+    MONGO_COLLECTION_VALIDATORS
 )
 
 
@@ -111,6 +112,10 @@ class ProductResponseItem(DynamicDocument):
 
     meta = {"db_alias": "default", "collection": MONGO_COLLECTION_RESPONSE}
     url = StringField(required=True)
+    fetch_date = StringField()
+    sha256 = StringField()
+    status_code = IntField()
+    size = IntField()
 
 
 class ProductCategoryUrlItem(DynamicDocument):
@@ -124,4 +129,14 @@ class ProductPageItem(DynamicDocument):
     """initializing URL fields and its Data-Types"""
 
     meta = {"db_alias": "default", "collection": MONGO_COLLECTION_PAGINATION}
-    url = StringField(required=True)
\ No newline at end of file
+    url = StringField(required=True)
+
+
+class ProductValidatorItem(DynamicDocument):
+    """initializing ETag / Last-Modified validator fields and its Data-Types"""
+
+    meta = {"db_alias": "default", "collection": MONGO_COLLECTION_VALIDATORS}
+    url = StringField(required=True, unique=True)
+    etag = StringField()
+    last_modified = StringField()
+    updated_at = DateTimeField()
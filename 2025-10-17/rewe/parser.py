@@ -1,20 +1,87 @@
 import logging
+import argparse
+import threading
+import time
 import re
 import json
 from datetime import datetime
-from parsel import Selector
 from curl_cffi import requests
 from mongoengine import connect
-from settings import HEADERS, MONGO_DB
+from settings import (
+    HEADERS, MONGO_DB, PROJECT_NAME, METRICS_DIR, CONDITIONAL_GET,
+    MONGO_COLLECTION_FINGERPRINT, MONGO_COLLECTION_DELTA, iteration,
+    HOST_CONCURRENCY, HOST_MIN_INTERVAL, HOST_JITTER,
+)
 from items import ProductItem, ProductUrlItem, ProductFailedItem
+from archive import ResponseArchive
+from metrics import RequestMetrics
+from conditional import ConditionalGet
+from fingerprint import ChangeTracker
+from extractor import Extractor
+from budget import HostBudget
+
+
+""" FIELD SPEC - compiled once by Extractor, relative to the product container """
+PRODUCT_CONTAINER = "//main"
+BREADCRUMB_NAV = './/nav[contains(@aria-label,"Breadcrumb") or contains(@aria-label,"Seitenpfad")]'
+PRODUCT_FIELDS = {
+    "json_script": {"xpath": './/script[contains(@id,"pdpr-propstore")]/text()', "page": True},
+    "store_address": {"xpath": './/span[contains(@class,"gbmc-header-link__text") and contains(@class,"gbmc-customer-zipcode-qa")]/text()', "page": True},
+    "description": {"xpath": './/div[contains(@class,"pdpr-ProductDescription__Content")]//text()', "mode": "join", "default": ""},
+    "article_number": {"xpath": './/div[contains(@class,"pdpr-ArticleNumber")]/text()', "default": ""},
+    "breadcrumbs": {"xpath": f'{BREADCRUMB_NAV}//a/text() | {BREADCRUMB_NAV}//span/text()', "mode": "all", "page": True},
+    "country_of_origin": {"xpath": './/div[contains(@class,"pdpr-Attribute")][.//h3[contains(., "Ursprung")]]', "mode": "string", "default": ""},
+    "nutrition": {
+        "xpath": './/table[contains(@class,"pdpr-NutritionTable")]//tr',
+        "mode": "items",
+        "fields": {"key": {"xpath": './td[1]//text()'}, "value": {"xpath": './td[2]//text()'}},
+    },
+    "ingredients": {"xpath": './/div[h3[contains(.,"Ingredients") or contains(.,"Zutaten")]]//text()', "mode": "join", "default": ""},
+    "allergens": {"xpath": './/div[h3[contains(.,"Allergens") or contains(.,"Allergene")]]//text()', "mode": "join", "default": ""},
+}
 
 
 class Parser:
     """REWE Parser """
 
-    def __init__(self):
+    def __init__(self, reparse=False, archive_date=None, budget=None):
         self.mongo = connect(alias="default", db=MONGO_DB, host="mongodb://localhost:27017/")
         logging.info(" MongoDB connected")
+        self.archive = ResponseArchive()
+        self.reparse = reparse
+        self.archive_date = archive_date
+        self.metrics = RequestMetrics(f"{PROJECT_NAME}_parser", METRICS_DIR)
+        self.extractor = Extractor(PRODUCT_FIELDS, container=PRODUCT_CONTAINER)
+        self.conditional = ConditionalGet(enabled=CONDITIONAL_GET and not reparse)
+        self.changes = ChangeTracker(
+            self.mongo[MONGO_DB][MONGO_COLLECTION_FINGERPRINT],
+            self.mongo[MONGO_DB][MONGO_COLLECTION_DELTA],
+            key_field="unique_id",
+            iteration=iteration,
+        )
+        self.budget = budget or HostBudget(HOST_CONCURRENCY, HOST_MIN_INTERVAL, HOST_JITTER)
+        """ Fetches run in parallel under the pipeline, extraction and change tracking one page at a time """
+        self.parse_lock = threading.Lock()
+        if self.reparse:
+            logging.info(f" Reparse mode: reading responses from archive ({archive_date or 'latest'})")
+
+    def fetch(self, url, conditional=True):
+        """Fetch PDP from network and archive it, or from the archive in reparse mode"""
+        if self.reparse:
+            return self.archive.load(url, self.archive_date)
+
+        headers = self.conditional.headers_for(url, HEADERS) if conditional else HEADERS
+        with self.budget.slot(url):
+            started = time.perf_counter()
+            try:
+                response = requests.get(url, headers=headers, impersonate="chrome120", timeout=30)
+            except Exception:
+                self.metrics.observe_response(url, None, started)
+                raise
+            self.metrics.observe_response(url, response, started)
+        if response.status_code == 200:
+            self.archive.save(url, response)
+        return response
 
     def start(self):
 
@@ -24,65 +91,81 @@ class Parser:
             return
 
         for record in urls:
-            url = record.url
-            response = requests.get(url, headers=HEADERS, impersonate="chrome120", timeout=30)
-            if response.status_code == 200:
+            self.process(record.url)
+        self.log_stats()
+
+    def process(self, url):
+        """Fetch, parse and save one PDP"""
+        response = self.fetch(url)
+        if response is not None and response.status_code == 304:
+            response = self.carry_forward(url)
+            if response is None:
+                return
+
+        if response is None:
+            logging.warning(f" Not archived: {url}")
+        elif response.status_code == 200:
+            with self.parse_lock:
                 self.parse_item(url, response)
-            else:
-                logging.error(f" HTTP {response.status_code} for {url}")
-                self.failed(url)
+            self.conditional.remember(url, response)
+        else:
+            logging.error(f" HTTP {response.status_code} for {url}")
+            self.failed(url)
+
+    def log_stats(self):
+        if self.conditional.not_modified:
+            logging.info(f" {self.conditional.not_modified} products not modified, carried forward")
+        self.changes.log_stats()
 
+    def carry_forward(self, url):
+        """304 - keep the previously parsed document, only refresh its extraction date"""
+        updated = ProductItem.objects(pdp_url=url).update_one(set__extraction_date=datetime.now())
+        if updated:
+            self.conditional.count_not_modified()
+            logging.info(f" Not modified: {url}")
+            return None
+
+        """ No stored document to carry forward, fetch in full """
+        self.conditional.forget(url)
+        return self.fetch(url, conditional=False)
 
     def close(self):
+        self.extractor.log_timings()
+        self.metrics.close()
         self.mongo.close()
         logging.info("Parser completed")
 
     def parse_item(self, url, response):
         """item part"""
 
-        sel = Selector(text=response.text)
-
-        """ XPATH """
-        JSON_SCRIPT_XPATH = '//script[contains(@id,"pdpr-propstore")]/text()'
-        STORE_ADDRESS_XPATH = '//span[contains(@class,"gbmc-header-link__text") and contains(@class,"gbmc-customer-zipcode-qa")]/text()'
-        DESCRIPTION_XPATH = '//div[contains(@class,"pdpr-ProductDescription__Content")]//text()'
-        ARTICLE_NUMBER_XPATH = '//div[contains(@class,"pdpr-ArticleNumber")]/text()'
-        BREADCRUMBS_XPATH = '//nav[contains(@aria-label,"Breadcrumb") or contains(@aria-label,"Seitenpfad")]//a/text() | //nav[contains(@aria-label,"Breadcrumb") or contains(@aria-label,"Seitenpfad")]//span/text()'
-        NUTRITION_TABLE_XPATH = '//table[contains(@class,"pdpr-NutritionTable")]//tr'
-        COUNTRY_OF_ORIGIN_XPATH = '//div[contains(@class,"pdpr-Attribute")][.//h3[contains(., "Ursprung")]]'
-
         """ EXTRACT """
-        json_data = self.extract_json_data(sel.xpath(JSON_SCRIPT_XPATH).get())
-        store_address = sel.xpath(STORE_ADDRESS_XPATH).get()
-        
+        fields, _ = self.extractor.extract(response.text)
+        json_data = self.extract_json_data(fields["json_script"])
+        store_address = fields["store_address"]
+
         """ Product Description """
-        description = " ".join(sel.xpath(DESCRIPTION_XPATH).getall()).strip() or (
+        description = fields["description"] or (
             (lambda m: f"Artikelnummer {m.group()}" if m else "Product description not available")(
-                re.search(r"\d+", (sel.xpath(ARTICLE_NUMBER_XPATH).get() or "").strip())
+                re.search(r"\d+", fields["article_number"].strip())
             )
         )
 
         """ Breadcrumbs """
-        breadcrumbs = [x.strip() for x in sel.xpath(BREADCRUMBS_XPATH).getall() if x.strip()]
-        
+        breadcrumbs = [x.strip() for x in fields["breadcrumbs"] if x.strip()]
+
         """ Country of Origin """
-        country_origin = (
-            re.sub(r'^.*Ursprung\s*:\s*', '', (sel.xpath(COUNTRY_OF_ORIGIN_XPATH).xpath('string()').get() or ''), flags=re.IGNORECASE).strip()
-            if sel.xpath(COUNTRY_OF_ORIGIN_XPATH).get()
-            else ''
-        )
+        country_origin = re.sub(r'^.*Ursprung\s*:\s*', '', fields["country_of_origin"], flags=re.IGNORECASE).strip()
 
         """ Nutrition table """
-        nutrition = []
-        for row in sel.xpath(NUTRITION_TABLE_XPATH):
-            key = row.xpath('./td[1]//text()').get()
-            val = row.xpath('./td[2]//text()').get()
-            if key and val:
-                nutrition.append(f"{key.strip()}: {val.strip()}")
-        
+        nutrition = [
+            f"{row['key'].strip()}: {row['value'].strip()}"
+            for row in fields["nutrition"]
+            if row["key"] and row["value"]
+        ]
+
         """ Ingredients & Allergens """
-        ingredients = self.extract_section_text(sel, "Ingredients", "Zutaten")
-        allergens = self.extract_section_text(sel, "Allergens", "Allergene")
+        ingredients = fields["ingredients"]
+        allergens = fields["allergens"]
 
         """ product_name/id """
         unique_id = str(json_data.get("productId", "")).strip()
@@ -170,9 +253,16 @@ class Parser:
             else:
                 cleaned_item[k] = v
         
+        """ Skip the write when nothing changed since the last run """
+        change = self.changes.check(cleaned_item)
+        if change is None:
+            logging.info(f" Unchanged: {product_name}")
+            return
+
         """Save to MongoDB"""
-        self.save_product(cleaned_item)
-        logging.info(f" Saved: {product_name}")
+        if self.save_product(cleaned_item):
+            self.changes.commit(change)
+            logging.info(f" Saved: {product_name}")
 
     def extract_json_data(self, script):
         """Extract JSON data from script"""
@@ -186,12 +276,6 @@ class Parser:
         except json.JSONDecodeError:
             return {}
 
-    def extract_section_text(self, sel, english_key, german_key):
-        """Extract section text by heading"""
-        xpath = f'//div[h3[contains(.,"{english_key}") or contains(.,"{german_key}")]]//text()'
-        texts = sel.xpath(xpath).getall()
-        return " ".join([x.strip() for x in texts if x.strip()])
-
     def format_price(self, price):
         """Format price to string"""
         if not price:
@@ -211,11 +295,15 @@ class Parser:
         return "", ""
 
     def save_product(self, item):
-        """Save product to MongoDB"""
+        """Upsert product to MongoDB by unique_id"""
         try:
-            ProductItem(**item).save()
+            ProductItem.objects(unique_id=item["unique_id"]).update_one(
+                upsert=True, **{f"set__{key}": value for key, value in item.items()}
+            )
+            return True
         except Exception as e:
             logging.error(f" Save error: {e}")
+            return False
 
     def failed(self, url):
         """Record failed URL"""
@@ -230,6 +318,11 @@ if __name__ == "__main__":
         datefmt="%Y-%m-%d %H:%M:%S",
     )
 
-    parser = Parser()
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--reparse", action="store_true", help="re-run parse_item from the response archive, no network")
+    arg_parser.add_argument("--date", default=None, help="archive fetch date to reparse (YYYY_MM_DD), latest by default")
+    args = arg_parser.parse_args()
+
+    parser = Parser(reparse=args.reparse, archive_date=args.date)
     parser.start()
     parser.close()
\ No newline at end of file
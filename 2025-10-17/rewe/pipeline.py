@@ -0,0 +1,71 @@
+import queue
+import logging
+import argparse
+import threading
+from crawler import Crawler
+from parser import Parser
+from budget import HostBudget
+from settings import PARSER_WORKERS, HOST_CONCURRENCY, HOST_MIN_INTERVAL, HOST_JITTER
+
+STOP = None
+QUEUE_SIZE = 1000   # crawler threads wait once the parsers fall this far behind
+
+
+class Pipeline:
+    """Crawler and parser in one run: PDPs are parsed while listings are still being discovered
+
+    Every new product url the crawler finds goes onto a bounded queue that
+    PARSER_WORKERS threads drain through Parser.process. Crawler and parser
+    share one HostBudget, so together they stay within the per-host limits.
+    """
+
+    def __init__(self, use_cache=None, parser_workers=PARSER_WORKERS):
+        self.budget = HostBudget(HOST_CONCURRENCY, HOST_MIN_INTERVAL, HOST_JITTER)
+        self.queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self.crawler = Crawler(use_cache=use_cache, budget=self.budget, on_product=self.queue.put)
+        self.parser = Parser(budget=self.budget)
+        self.parser_workers = parser_workers
+        self.parsed = 0
+        self.lock = threading.Lock()
+
+    def parse_worker(self):
+        while True:
+            url = self.queue.get()
+            if url is STOP:
+                return
+            try:
+                self.parser.process(url)
+            except Exception as e:
+                logging.error(f" Parse error for {url}: {e}")
+                self.parser.failed(url)
+            with self.lock:
+                self.parsed += 1
+
+    def start(self):
+        workers = [threading.Thread(target=self.parse_worker, name=f"parser-{i}") for i in range(self.parser_workers)]
+        for worker in workers:
+            worker.start()
+        try:
+            self.crawler.start()
+        finally:
+            for _ in workers:
+                self.queue.put(STOP)
+            for worker in workers:
+                worker.join()
+        logging.info(f"Pipeline done: {len(self.crawler.seen)} product urls discovered, {self.parsed} parsed")
+        self.parser.log_stats()
+
+    def close(self):
+        self.crawler.close()
+        self.parser.close()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="REWE crawl and PDP parse, overlapped")
+    arg_parser.add_argument("--workers", type=int, default=PARSER_WORKERS, help="PDP parser threads")
+    arg_parser.add_argument("--no-cache", action="store_true", help="fetch every category page, ignoring the HTTP cache")
+    args = arg_parser.parse_args()
+
+    pipeline = Pipeline(use_cache=False if args.no_cache else None, parser_workers=args.workers)
+    pipeline.start()
+    pipeline.close()
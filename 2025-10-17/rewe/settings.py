@@ -26,6 +26,7 @@ MONTH_VALUE = calendar.month_abbr[int(MONTH.lstrip("0"))]
 WEEK = (int(DAY) - 1) // 7 + 1
 
 FILE_NAME = f"rewe_{iteration}.csv"
+DELTA_FILE_NAME = f"rewe_{iteration}_delta.csv"
 
 # Mongo db and collections
 MONGO_DB = f"rewe_db"
@@ -37,6 +38,36 @@ MONGO_COLLECTION_EMPTY = f"{PROJECT_NAME}_empty"
 MONGO_COLLECTION_MISMATCH = f"{PROJECT_NAME}_mismatch"
 MONGO_COLLECTION_RESPONSE = f"{PROJECT_NAME}_response"
 MONGO_COLLECTION_PAGINATION = f"{PROJECT_NAME}_pagination"
+MONGO_COLLECTION_VALIDATORS = f"{PROJECT_NAME}_validators"
+MONGO_COLLECTION_FINGERPRINT = f"{PROJECT_NAME}_fingerprint"
+MONGO_COLLECTION_DELTA = f"{PROJECT_NAME}_delta"
+
+# Conditional GET (If-None-Match / If-Modified-Since) for PDP refresh runs
+CONDITIONAL_GET = True
+
+# Cross-run HTTP cache for category discovery: (url regex, ttl seconds), first match wins
+HTTP_CACHE = True
+HTTP_CACHE_PATH = "cache/http_cache.sqlite"
+HTTP_CACHE_MAX_MB = 200
+HTTP_CACHE_RULES = [
+    (r"^https://www\.rewe\.de/shop/?$", 24 * 3600),           # homepage nav
+    (r"^https://www\.rewe\.de/shop/c/[^?]*$", 12 * 3600),     # category tiles / first listing page
+]
+
+# Concurrency: subcategories paginate as parallel jobs, every request to a host
+# goes through one shared budget (in-flight cap + spacing between request starts)
+SUBCATEGORY_WORKERS = 6
+PARSER_WORKERS = 4          # pipeline.py: PDP fetch threads fed by the crawler
+HOST_CONCURRENCY = 4
+HOST_MIN_INTERVAL = 0.5     # seconds between request starts per host
+HOST_JITTER = 0.5
+
+# Run metrics (prometheus textfile + json summary)
+METRICS_DIR = "metrics"
+
+# Raw response archive
+ARCHIVE_DIR = "archive"
+ARCHIVE_LEVEL = 10
 
 # Headers and useragents
 HEADERS = {
@@ -1,9 +1,15 @@
 import logging
+import argparse
 from urllib.parse import urljoin
 from curl_cffi import requests
+from pymongo import MongoClient
 from mongoengine import connect
 from items import CategoryUrlItem
-from settings import BASE_URL, API_URL, HEADERS, MONGO_DB
+from categorytree import CategoryTreeExplorer
+from settings import (
+    BASE_URL, API_URL, HEADERS, MONGO_DB, MONGO_COLLECTION_CATEGORY_TREE,
+    CATEGORY_MAX_DEPTH, CATEGORY_CONCURRENCY,
+)
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
 
@@ -12,43 +18,59 @@ class CategoryCrawler:
 
     def __init__(self):
         self.mongo = connect(alias="default", db=MONGO_DB, host="mongodb://localhost:27017/")
+        self.client = MongoClient("mongodb://localhost:27017/")
+        self.tree = self.client[MONGO_DB][MONGO_COLLECTION_CATEGORY_TREE]
         logging.info("MongoDB connected")
 
-    def start(self):
-        """Fetch data from API"""
-        response = requests.get(API_URL, headers=HEADERS, timeout=30)
-        if response.status_code != 200:
-            logging.error(f"API returned {response.status_code}")
-            return
-
-        items = response.json().get("items", [])
-        categories = self.parse_categories(items)
+    def start(self, max_depth=CATEGORY_MAX_DEPTH, refresh=False):
+        """Walk the menu tree breadth-first, then flatten it into category/subcategory records"""
+        explorer = CategoryTreeExplorer(
+            self.tree, self.fetch_children, max_depth=max_depth, concurrency=CATEGORY_CONCURRENCY, refresh=refresh,
+        )
+        explorer.start([{"url": API_URL, "name": "root"}])
+        categories = self.parse_categories(explorer.nodes())
         self.save(categories)
         logging.info(f"Total saved: {len(categories)}")
 
-    def parse_categories(self, items, parent_title="", parent_url=""):
-        """Recursively extract category and subcategory URLs"""
-        results = []
+    def fetch_children(self, node):
+        """Root comes from the API, every other node carries its children in the API payload"""
+        if "payload" in node:
+            items = node["payload"]
+        else:
+            response = requests.get(node["url"], headers=HEADERS, timeout=30)
+            if response.status_code != 200:
+                raise Exception(f"API returned {response.status_code}")
+            items = response.json().get("items", [])
 
+        children = []
         for item in items:
             title = item.get("title")
             target = item.get("target")
             if not title or not target:
                 continue
+            children.append({
+                "url": urljoin(BASE_URL, target.strip()),
+                "name": title,
+                "payload": item.get("items", []),
+            })
+        return children
 
-            full_url = urljoin(BASE_URL, target.strip())
-
-            if parent_title:
-                results.append({
-                    "category_title": parent_title,
-                    "subcategory_title": title,
-                    "category_url": parent_url,
-                    "subcategory_url": full_url,
-                })
+    def parse_categories(self, nodes):
+        """Every node below a top-level category becomes a subcategory of that top-level category"""
+        nodes = list(nodes)
+        by_id = {node["_id"]: node for node in nodes}
+        results = []
 
-            child_items = item.get("items", [])
-            if child_items:
-                results.extend(self.parse_categories(child_items, parent_title or title, parent_url or full_url))
+        for node in nodes:
+            if node["depth"] < 2 or node["path"][1] not in by_id:
+                continue
+            category = by_id[node["path"][1]]
+            results.append({
+                "category_title": category["name"],
+                "subcategory_title": node["name"],
+                "category_url": category["url"],
+                "subcategory_url": node["url"],
+            })
         return results
     
     def save(self, data):
@@ -62,9 +84,15 @@ class CategoryCrawler:
 
     def close(self):
         self.mongo.close()
+        self.client.close()
         logging.info("MongoDB connection closed")
 
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Crawl the FatFace category tree")
+    arg_parser.add_argument("--max-depth", type=int, default=CATEGORY_MAX_DEPTH)
+    arg_parser.add_argument("--refresh", action="store_true", help="only re-walk subtrees whose children changed")
+    args = arg_parser.parse_args()
+
     crawler = CategoryCrawler()
-    crawler.start()
+    crawler.start(args.max_depth, args.refresh)
     crawler.close()
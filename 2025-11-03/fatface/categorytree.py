@@ -0,0 +1,171 @@
+import json
+import time
+import hashlib
+import logging
+from datetime import datetime, timezone
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+TRACKING_PARAMS = ("utm_", "intid", "gclid", "fbclid")
+
+
+def canonical_url(url):
+    """Same category reached through different links -> same key"""
+    parts = urlsplit(url.strip())
+    query = sorted((k, v) for k, v in parse_qsl(parts.query) if not k.lower().startswith(TRACKING_PARAMS))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+class CategoryTreeExplorer:
+    """Breadth-first category tree discovery with a concurrency cap
+
+    `fetch_children(node)` returns the child nodes ({"url", "name", optional
+    "payload"}) of one node. A level of the tree is fetched concurrently,
+    `concurrency` nodes at a time; nodes are deduplicated by canonical url, so a
+    category linked from two parents is expanded once. Each node is upserted
+    into `collection` as soon as it is fetched:
+
+        _id (canonical url), url, name, parent, depth, path (ancestor ids),
+        children, fingerprint (hash of the child list, payloads included), run_id, status
+
+    With refresh=True a node whose fingerprint matches the stored one is not
+    expanded again; its stored subtree is carried into this run as-is. A child
+    payload usually holds that child's whole subtree, so it is hashed in full and
+    a change anywhere below still re-walks the node. Children that disappeared
+    from a changed node are marked removed with their subtree, except nodes that
+    moved under another parent and are already part of this run.
+    """
+
+    def __init__(self, collection, fetch_children, max_depth=None, concurrency=8, refresh=False):
+        self.collection = collection
+        self.fetch_children = fetch_children
+        self.max_depth = max_depth
+        self.concurrency = concurrency
+        self.refresh = refresh
+        self.run_id = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+        self.seen = set()
+        self.stats = {"fetched": 0, "unchanged": 0, "carried": 0, "removed": 0, "failed": 0}
+        self.collection.create_index("path")
+        self.collection.create_index("run_id")
+
+    def start(self, roots):
+        started = time.perf_counter()
+        frontier = []
+        for root in roots:
+            node_id = canonical_url(root["url"])
+            if node_id not in self.seen:
+                self.seen.add(node_id)
+                frontier.append({**root, "_id": node_id, "parent": None, "depth": 0, "path": []})
+
+        while frontier:
+            depth = frontier[0]["depth"]
+            logging.info(f"Category tree depth {depth}: {len(frontier)} nodes")
+            if self.max_depth is not None and depth >= self.max_depth:
+                for node in frontier:
+                    self.save(node, None)
+                break
+            frontier = self.expand_level(frontier)
+
+        logging.info(
+            f"Category tree: {len(self.seen)} nodes in {time.perf_counter() - started:.1f}s "
+            f"({self.stats['fetched']} fetched, {self.stats['unchanged']} unchanged, "
+            f"{self.stats['carried']} carried over, {self.stats['removed']} removed, {self.stats['failed']} failed)"
+        )
+        return self.stats
+
+    def expand_level(self, level):
+        next_level = []
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {executor.submit(self.fetch_children, node): node for node in level}
+            for future in as_completed(futures):
+                node = futures[future]
+                try:
+                    children = future.result() or []
+                except Exception as e:
+                    logging.error(f"Category {node['url']} failed: {e}")
+                    self.stats["failed"] += 1
+                    continue
+
+                self.stats["fetched"] += 1
+                stored = self.collection.find_one({"_id": node["_id"]}, {"fingerprint": 1, "children": 1})
+                children = self.dedupe(node, children)
+                fingerprint = self.fingerprint(children)
+                self.save(node, [c["_id"] for c in children], fingerprint)
+
+                if self.refresh and stored and stored.get("fingerprint") == fingerprint:
+                    self.carry_subtree(node["_id"])
+                    continue
+
+                if stored:
+                    gone = set(stored.get("children") or []) - {c["_id"] for c in children}
+                    for child_id in gone:
+                        self.remove_subtree(child_id)
+
+                for child in children:
+                    if child["_id"] not in self.seen:
+                        self.seen.add(child["_id"])
+                        next_level.append(child)
+        return next_level
+
+    def dedupe(self, node, children):
+        unique = {}
+        for child in children:
+            if not child.get("url"):
+                continue
+            child_id = canonical_url(child["url"])
+            if child_id == node["_id"] or child_id in node["path"] or child_id in unique:
+                continue
+            unique[child_id] = {
+                **child, "_id": child_id, "parent": node["_id"],
+                "depth": node["depth"] + 1, "path": node["path"] + [node["_id"]],
+            }
+        return list(unique.values())
+
+    def fingerprint(self, children):
+        lines = []
+        for child in children:
+            line = f"{child['_id']}|{child.get('name', '')}"
+            if "payload" in child:
+                line += "|" + json.dumps(child["payload"], sort_keys=True, default=str)
+            lines.append(line)
+        return hashlib.sha1("\n".join(lines).encode("utf-8")).hexdigest()
+
+    def save(self, node, children, fingerprint=None):
+        doc = {
+            "url": node["url"],
+            "name": node.get("name", ""),
+            "parent": node["parent"],
+            "depth": node["depth"],
+            "path": node["path"],
+            "run_id": self.run_id,
+            "status": "active",
+            "fetched_at": datetime.now(timezone.utc),
+        }
+        if children is not None:
+            doc["children"] = children
+            doc["fingerprint"] = fingerprint
+        self.collection.update_one({"_id": node["_id"]}, {"$set": doc}, upsert=True)
+
+    def carry_subtree(self, node_id):
+        """Unchanged node: its stored descendants count as discovered in this run"""
+        self.stats["unchanged"] += 1
+        descendants = [doc["_id"] for doc in self.collection.find({"path": node_id, "status": "active"}, {"_id": 1})]
+        self.seen.update(descendants)
+        if descendants:
+            self.collection.update_many({"_id": {"$in": descendants}}, {"$set": {"run_id": self.run_id}})
+            self.stats["carried"] += len(descendants)
+
+    def remove_subtree(self, node_id):
+        """Gone from its parent; nodes already saved or carried this run moved elsewhere and stay"""
+        if node_id in self.seen:
+            return
+        result = self.collection.update_many(
+            {"$or": [{"_id": node_id}, {"path": node_id}], "run_id": {"$ne": self.run_id}},
+            {"$set": {"status": "removed", "removed_at": datetime.now(timezone.utc)}},
+        )
+        self.stats["removed"] += result.modified_count
+
+    def nodes(self):
+        """Active nodes of this run, parents before children"""
+        return self.collection.find({"run_id": self.run_id, "status": "active"}).sort("depth", 1)
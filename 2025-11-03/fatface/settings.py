@@ -34,6 +34,10 @@ MONGO_COLLECTION_CATEGORY = f"{PROJECT_NAME}_category_url"
 MONGO_COLLECTION_URL_FAILED = f"{PROJECT_NAME}_url_failed"
 MONGO_COLLECTION_DATA = f"{PROJECT_NAME}_data"
 MONGO_COLLECTION_PRODUCT_URL = f"{PROJECT_NAME}_product_url"
+MONGO_COLLECTION_CATEGORY_TREE = f"{PROJECT_NAME}_category_tree"
+
+CATEGORY_MAX_DEPTH = None       # None walks the whole menu tree
+CATEGORY_CONCURRENCY = 8
 
 
 HEADERS = {
@@ -1,21 +1,27 @@
 import logging
+import argparse
 from urllib.parse import urljoin
 from parsel import Selector
 from curl_cffi import requests
 from mongoengine import connect
-from settings import BASE_URL, MONGO_DB, HEADERS
+from settings import BASE_URL, MONGO_DB, HEADERS, HTTP_CACHE_PATH, HTTP_CACHE_MAX_MB, HTTP_CACHE_RULES
 from items import CategoryUrlItem
+from httpcache import HttpCache
+import settings
 
 
 class Crawler:
     """Crawls all category names and URLs from the OfficeDepot homepage."""
 
-    def __init__(self):
+    def __init__(self, use_cache=None):
         self.mongo = connect(alias="default", db=MONGO_DB, host="mongodb://localhost:27017/")
+        if use_cache is None:
+            use_cache = settings.HTTP_CACHE   # read per instance, so a runner can switch it off after import
+        self.cache = HttpCache(HTTP_CACHE_PATH, HTTP_CACHE_RULES, HTTP_CACHE_MAX_MB, enabled=use_cache)
         logging.info("MongoDB connected successfully.")
 
     def start(self):
-        response = requests.get(BASE_URL, headers=HEADERS, impersonate="chrome124")
+        response = self.cache.get(lambda: requests.get(BASE_URL, headers=HEADERS, impersonate="chrome124"), BASE_URL)
 
         if response.status_code == 200:
             self.parse_item(response)
@@ -57,12 +63,17 @@ class Crawler:
         return True
 
     def close(self):
+        self.cache.close()
         self.mongo.close()
         logging.info("MongoDB connection closed.")
 
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
-    crawler = Crawler()
+    arg_parser = argparse.ArgumentParser(description="OfficeDepot category crawler")
+    arg_parser.add_argument("--no-cache", action="store_true", help="fetch the homepage, ignoring the HTTP cache")
+    args = arg_parser.parse_args()
+
+    crawler = Crawler(use_cache=False if args.no_cache else None)
     crawler.start()
     crawler.close()
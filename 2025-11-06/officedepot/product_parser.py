@@ -1,9 +1,14 @@
 import logging
+import argparse
 from parsel import Selector
 from curl_cffi import requests
 from mongoengine import connect
 from items import ProductUrlItem, ProductItem, ProductFailedItem
-from settings import HEADERS, MONGO_DB
+from settings import (
+    HEADERS, MONGO_DB, MONGO_HOST, MONGO_COLLECTION_PRODUCT_URL,
+    SHARD_COLLECTION, QUEUE_LEASE_SECONDS, QUEUE_MAX_ATTEMPTS, iteration,
+)
+from workqueue import WorkQueue, shard_spec, run_workers
 
 
 class Parser:
@@ -13,8 +18,24 @@ class Parser:
         self.db = connect(alias="default", db=MONGO_DB, host="mongodb://localhost:27017/")
         logging.info("MongoDB connected successfully")
 
-    def start(self):
-        """Fetch product URLs and parse each one."""
+    def start(self, queue=None):
+        """Fetch product URLs and parse each one, with a WorkQueue only the urls this worker claims."""
+        if queue is not None:
+            for record in queue.claims():
+                product = ProductUrlItem._from_son(record)
+                logging.info(f"[{queue.worker_id}] Parsing: {product.product_name} ({product.url})")
+                try:
+                    if self.parse_product(product):
+                        queue.ack(record)
+                    else:
+                        queue.fail(record, "fetch_failed")
+                except Exception as e:
+                    logging.error(f"Error parsing {product.url}: {e}")
+                    ProductFailedItem(url=product.url).save()
+                    queue.fail(record, e)
+            logging.info(f"[{queue.worker_id}] Queue drained: {queue.stats}")
+            return
+
         products = ProductUrlItem.objects()
 
         if not products:
@@ -36,7 +57,7 @@ class Parser:
         if response.status_code != 200:
             logging.warning(f"Status {response.status_code} for {product.url}")
             ProductFailedItem(url=product.url).save()
-            return
+            return False
 
         select = Selector(text=response.text)
 
@@ -81,14 +102,53 @@ class Parser:
         else:
             ProductItem(**data).save()
             logging.info(f"Saved product: {name or 'Unnamed'}")
+        return True
 
     def close(self):
         self.db.close()
         logging.info("MongoDB connection closed")
 
 
+def url_queue():
+    return WorkQueue(MONGO_HOST, MONGO_DB, shard_spec(SHARD_COLLECTION, MONGO_COLLECTION_PRODUCT_URL),
+                     QUEUE_LEASE_SECONDS, QUEUE_MAX_ATTEMPTS)
+
+
+def run_worker():
+    """One queue worker process: claim, parse and ack urls until the queue is empty"""
+    queue = url_queue()
+    parser = Parser()
+    try:
+        parser.start(queue)
+    finally:
+        queue.close()
+        parser.close()
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
-    parser = Parser()
-    parser.start()
-    parser.close()
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--seed", nargs="?", const=iteration, metavar="RUN_ID",
+                            help="one-shot: open run RUN_ID (default today's iteration) on the queue and exit")
+    arg_parser.add_argument("--queue", action="store_true", help="claim urls from the shared lease queue")
+    arg_parser.add_argument("--workers", type=int, default=1, help="queue worker processes on this node")
+    args = arg_parser.parse_args()
+
+    if args.seed:
+        queue = url_queue()
+        queue.seed(args.seed)
+        logging.info(f"Queue status: {queue.summary()[0]}")
+        queue.client.close()
+    elif args.queue:
+        queue = url_queue()
+        run_workers(run_worker, args.workers)
+        counts, workers = queue.summary()
+        logging.info(f"Queue status: {counts}")
+        for worker in workers:
+            logging.info(f"Worker {worker['_id']}: {worker['acked']} done, {worker['failed']} failed, "
+                         f"{worker['urls_per_minute']} urls/min")
+        queue.client.close()
+    else:
+        parser = Parser()
+        parser.start()
+        parser.close()
@@ -34,6 +34,14 @@ MONGO_COLLECTION_DATA = f"{PROJECT_NAME}_data"
 
 
 
+"""Cross-run HTTP cache for the homepage menu: (url regex, ttl seconds), first match wins"""
+HTTP_CACHE = True
+HTTP_CACHE_PATH = "cache/http_cache.sqlite"
+HTTP_CACHE_MAX_MB = 50
+HTTP_CACHE_RULES = [
+    (r"^https://www\.officedepot\.com/?$", 24 * 3600),
+]
+
 """Headers and useragents"""
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -51,6 +59,11 @@ SHARD_COLLECTION = [
     {'col': MONGO_COLLECTION_PRODUCT_URL, 'unique': True, 'indexfield': "url"},
 ]
 
+"""Work queue (product_parser.py --queue)"""
+MONGO_HOST = "mongodb://localhost:27017/"
+QUEUE_LEASE_SECONDS = 300   # a url leased by a crashed worker is handed out again after this
+QUEUE_MAX_ATTEMPTS = 3
+
 FILE_HEADERS = [
     "Company Name",
     "Manufacturer Name",
@@ -0,0 +1,194 @@
+import os
+import time
+import socket
+import logging
+import multiprocessing
+from datetime import datetime, timezone, timedelta
+from pymongo import MongoClient, ReturnDocument, ASCENDING
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+class WorkQueue:
+    """Lease queue over a URL collection declared in settings.SHARD_COLLECTION
+
+    Queue state lives on the url documents themselves (queue_status, queue_owner,
+    queue_lease_expires, queue_attempts), so any number of worker processes on
+    any number of nodes can share one collection:
+
+        claim  - find_one_and_update flips one pending (or lease-expired) document
+                 to leased for this worker, so no two workers get the same url
+        ack    - done, only if the lease is still ours
+        fail   - back to pending until max_attempts, then failed
+        reap   - leases of crashed workers expire and are claimed again
+
+    Every worker keeps a document in `<col>_workers` with its counters and rate.
+    Workers only claim; `seed(run_id)` is a separate one-shot step that opens a
+    run (see the --seed option of the parsers).
+    """
+
+    def __init__(self, host, db_name, spec, lease_seconds=300, max_attempts=3, worker_id=None):
+        self.client = MongoClient(host)
+        self.db = self.client[db_name]
+        self.collection = self.db[spec["col"]]
+        self.workers = self.db[f"{spec['col']}_workers"]
+        self.spec = spec
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.stats = {"claimed": 0, "acked": 0, "failed": 0, "released": 0}
+        self.started = time.monotonic()
+        self.last_report = 0
+        self.ensure_indexes()
+
+    def ensure_indexes(self):
+        self.collection.create_index(self.spec["indexfield"], unique=self.spec.get("unique", False))
+        self.collection.create_index([("queue_status", ASCENDING), ("queue_lease_expires", ASCENDING)])
+
+    def seed(self, run_id):
+        """Put every url not yet part of run `run_id` into the pending state for it
+
+        Idempotent per run id: seeding the same run again leaves leased and done
+        urls alone and only picks up urls added since, so a second weekly run
+        just uses a new id and a late node re-running the seed duplicates nothing.
+        """
+        result = self.collection.update_many({"queue_run": {"$ne": run_id}}, {
+            "$set": {"queue_status": PENDING, "queue_attempts": 0, "queue_run": run_id},
+            "$unset": {"queue_owner": "", "queue_lease_expires": "", "queue_error": ""},
+        })
+        logging.info(f"Queue {self.spec['col']}: {result.modified_count} urls set to pending for run {run_id}")
+
+    def claim(self):
+        """Atomically lease the next url, None once nothing is claimable"""
+        now = datetime.now(timezone.utc)
+        doc = self.collection.find_one_and_update(
+            {
+                "$or": [
+                    {"queue_status": PENDING},
+                    {"queue_status": LEASED, "queue_lease_expires": {"$lt": now}},
+                ],
+                "queue_attempts": {"$lt": self.max_attempts},
+            },
+            {
+                "$set": {
+                    "queue_status": LEASED,
+                    "queue_owner": self.worker_id,
+                    "queue_lease_expires": now + timedelta(seconds=self.lease_seconds),
+                },
+                "$inc": {"queue_attempts": 1},
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc:
+            self.stats["claimed"] += 1
+        return doc
+
+    def claims(self):
+        """Yield leased url documents until the queue is drained"""
+        while True:
+            self.report()
+            doc = self.claim()
+            if doc is None:
+                self.reap()
+                doc = self.claim()
+            if doc is None:
+                break
+            yield doc
+        self.report(force=True)
+
+    def ack(self, doc):
+        result = self.collection.update_one(
+            {"_id": doc["_id"], "queue_owner": self.worker_id, "queue_status": LEASED},
+            {"$set": {"queue_status": DONE, "queue_done_at": datetime.now(timezone.utc)},
+             "$unset": {"queue_lease_expires": ""}},
+        )
+        if result.modified_count:
+            self.stats["acked"] += 1
+        else:
+            logging.warning(f"Lease on {doc.get(self.spec['indexfield'])} expired before ack")
+
+    def fail(self, doc, error=""):
+        """Give the url back for a retry, or mark it failed after max_attempts"""
+        status = FAILED if doc.get("queue_attempts", 0) >= self.max_attempts else PENDING
+        self.collection.update_one(
+            {"_id": doc["_id"], "queue_owner": self.worker_id},
+            {"$set": {"queue_status": status, "queue_error": str(error)[:500]},
+             "$unset": {"queue_lease_expires": ""}},
+        )
+        self.stats["failed"] += 1
+
+    def reap(self):
+        """Expired leases that already used every attempt will never be claimed, mark them failed"""
+        result = self.collection.update_many(
+            {"queue_status": LEASED, "queue_lease_expires": {"$lt": datetime.now(timezone.utc)},
+             "queue_attempts": {"$gte": self.max_attempts}},
+            {"$set": {"queue_status": FAILED, "queue_error": "lease expired"}},
+        )
+        if result.modified_count:
+            logging.warning(f"Queue {self.spec['col']}: {result.modified_count} expired leases marked failed")
+
+    def release(self):
+        """Hand back whatever this worker still holds, e.g. on KeyboardInterrupt"""
+        result = self.collection.update_many(
+            {"queue_owner": self.worker_id, "queue_status": LEASED},
+            {"$set": {"queue_status": PENDING}, "$inc": {"queue_attempts": -1},
+             "$unset": {"queue_lease_expires": ""}},
+        )
+        self.stats["released"] += result.modified_count
+
+    def report(self, force=False, interval=10):
+        """Upsert this worker's counters into `<col>_workers` every `interval` seconds"""
+        now = time.monotonic()
+        if not force and now - self.last_report < interval:
+            return
+        self.last_report = now
+        elapsed = now - self.started
+        self.workers.update_one(
+            {"_id": self.worker_id},
+            {"$set": {
+                **self.stats,
+                "elapsed_seconds": round(elapsed, 1),
+                "urls_per_minute": round(self.stats["acked"] / elapsed * 60, 2) if elapsed else 0.0,
+                "last_seen": datetime.now(timezone.utc),
+            }},
+            upsert=True,
+        )
+
+    def summary(self):
+        """url counts per queue status and the per-worker stats documents"""
+        counts = {row["_id"]: row["count"] for row in self.collection.aggregate([
+            {"$group": {"_id": "$queue_status", "count": {"$sum": 1}}},
+        ])}
+        return counts, list(self.workers.find({}, sort=[("_id", ASCENDING)]))
+
+    def close(self):
+        self.release()
+        self.report(force=True)
+        self.client.close()
+
+
+def shard_spec(shard_collection, col):
+    """The SHARD_COLLECTION entry declaring `col`"""
+    for spec in shard_collection:
+        if spec["col"] == col:
+            return spec
+    raise KeyError(f"{col} is not declared in SHARD_COLLECTION")
+
+
+def run_workers(target, count):
+    """Run `target` in `count` fresh processes (spawned, so each opens its own Mongo connections)"""
+    if count <= 1:
+        target()
+        return
+
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=target, name=f"worker-{i}") for i in range(count)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        if process.exitcode:
+            logging.error(f"{process.name} exited with code {process.exitcode}")
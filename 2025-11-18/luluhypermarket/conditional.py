@@ -0,0 +1,57 @@
+import logging
+import threading
+from datetime import datetime, timezone
+from items import ProductValidatorItem
+
+
+class ConditionalGet:
+    """Keeps ETag / Last-Modified per url and turns them into conditional request headers"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.not_modified = 0
+        self.lock = threading.Lock()
+
+    def count_not_modified(self):
+        with self.lock:
+            self.not_modified += 1
+
+    def headers_for(self, url, headers):
+        """Return headers with If-None-Match / If-Modified-Since added when validators are stored"""
+        if not self.enabled:
+            return headers
+
+        record = ProductValidatorItem.objects(url=url).first()
+        if not record:
+            return headers
+
+        headers = dict(headers)
+        if record.etag:
+            headers["If-None-Match"] = record.etag
+        if record.last_modified:
+            headers["If-Modified-Since"] = record.last_modified
+        return headers
+
+    def remember(self, url, response):
+        """Store the validators of a 200 response for the next run"""
+        if not self.enabled:
+            return
+
+        etag = response.headers.get("ETag") or ""
+        last_modified = response.headers.get("Last-Modified") or ""
+        if not etag and not last_modified:
+            return
+
+        try:
+            ProductValidatorItem.objects(url=url).update_one(
+                set__etag=etag,
+                set__last_modified=last_modified,
+                set__updated_at=datetime.now(timezone.utc),
+                upsert=True,
+            )
+        except Exception as e:
+            logging.error(f"Validator save error for {url}: {e}")
+
+    def forget(self, url):
+        """Drop validators, forcing a full fetch next time"""
+        ProductValidatorItem.objects(url=url).delete()
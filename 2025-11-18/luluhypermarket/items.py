@@ -1,6 +1,6 @@
 from mongoengine import (
     DynamicDocument, StringField, BooleanField, DictField,
-    ListField, IntField, FloatField
+    ListField, IntField, FloatField, DateTimeField
 )
 
 from settings import (
@@ -9,6 +9,7 @@ from settings import (
     MONGO_COLLECTION_URL_FAILED,
     MONGO_COLLECTION_DATA,
     MONGO_COLLECTION_RESPONSE,
+    MONGO_COLLECTION_VALIDATORS,
 )
 
 
@@ -51,3 +52,11 @@ class ProductFailedItem(DynamicDocument):
 class ProductResponseItem(DynamicDocument):
     meta = {"db_alias": "default", "collection": MONGO_COLLECTION_RESPONSE}
     url = StringField(required=True)
+
+
+class ProductValidatorItem(DynamicDocument):
+    meta = {"db_alias": "default", "collection": MONGO_COLLECTION_VALIDATORS}
+    url = StringField(required=True, unique=True)
+    etag = StringField()
+    last_modified = StringField()
+    updated_at = DateTimeField()
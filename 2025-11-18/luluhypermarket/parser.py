@@ -1,19 +1,57 @@
 import logging
 import json
+import argparse
 from curl_cffi import requests
 from parsel import Selector
 from mongoengine import connect
 from items import ProductUrlItem, ProductItem, ProductFailedItem
-from settings import HEADERS, MONGO_DB, MONGO_HOST
+from settings import (
+    HEADERS, MONGO_DB, MONGO_HOST, CONDITIONAL_GET, MONGO_COLLECTION_URL,
+    SHARD_COLLECTION, QUEUE_LEASE_SECONDS, QUEUE_MAX_ATTEMPTS, iteration,
+)
+from conditional import ConditionalGet
+from workqueue import WorkQueue, shard_spec, run_workers
 
 
 class Parser:
     def __init__(self):
         self.mongo = connect(db=MONGO_DB, host=MONGO_HOST)
         logging.info("MongoDB connected")
+        self.conditional = ConditionalGet(enabled=CONDITIONAL_GET)
+
+    def fetch(self, url, conditional=True):
+        """GET with stored validators, a 304 means the stored product is still current"""
+        headers = self.conditional.headers_for(url, HEADERS) if conditional else HEADERS
+        return requests.get(url, headers=headers, impersonate="chrome120", timeout=25)
+
+    def carry_forward(self, url):
+        """304 - keep the previous product document, refetch in full if there is none"""
+        if ProductItem.objects(url=url).only("id").first():
+            self.conditional.count_not_modified()
+            logging.info(f"Not modified: {url}")
+            return None
+
+        self.conditional.forget(url)
+        return self.fetch(url, conditional=False)
+
+    def start(self, queue=None):
+        """Iterate over product URLs and parse details, with a WorkQueue only the urls this worker claims"""
+        if queue is not None:
+            for record in queue.claims():
+                url = record["url"].strip()
+                logging.info(f"[{queue.worker_id}] Parsing: {url}")
+                try:
+                    if self.process(url):
+                        queue.ack(record)
+                    else:
+                        queue.fail(record, "fetch_failed")
+                except Exception as e:
+                    logging.exception(f"Parser error: {url}")
+                    ProductFailedItem(url=url, reason=str(e)).save()
+                    queue.fail(record, e)
+            logging.info(f"[{queue.worker_id}] Queue drained: {queue.stats}")
+            return
 
-    def start(self):
-        """Iterate over product URLs and parse details"""
         metas = [{"url": item.url.strip()} for item in ProductUrlItem.objects()]
 
         for meta in metas:
@@ -21,22 +59,34 @@ class Parser:
             logging.info(f"Parsing: {url}")
 
             try:
-                r = requests.get(url, headers=HEADERS, impersonate="chrome120", timeout=25)
-                if r.status_code != 200:
-                    logging.error(f"FAILED: {url} (fetch_failed)")
-                    ProductFailedItem(url=url, reason="fetch_failed").save()
-                    continue
-
-                item = self.parse_item(url, r)
-                if item:
-                    self.save(url, item)
-
+                self.process(url)
             except Exception as e:
                 logging.exception(f"Parser error: {url}")
                 ProductFailedItem(url=url, reason=str(e)).save()
 
+        if self.conditional.not_modified:
+            logging.info(f"{self.conditional.not_modified} products not modified, carried forward")
         logging.info("Parsing completed")
 
+    def process(self, url):
+        """Fetch, parse and save one url, False when the page could not be fetched"""
+        r = self.fetch(url)
+        if r.status_code == 304:
+            r = self.carry_forward(url)
+            if r is None:
+                return True
+
+        if r.status_code != 200:
+            logging.error(f"FAILED: {url} (fetch_failed)")
+            ProductFailedItem(url=url, reason="fetch_failed").save()
+            return False
+
+        item = self.parse_item(url, r)
+        if item:
+            self.save(url, item)
+            self.conditional.remember(url, r)
+        return True
+
     def parse_item(self, url, response):
         """Extract product details from HTML"""
         sel = Selector(response.text)
@@ -107,7 +157,45 @@ class Parser:
         logging.info("MongoDB connection closed")
 
 
-if __name__ == "__main__":
+def url_queue():
+    return WorkQueue(MONGO_HOST, MONGO_DB, shard_spec(SHARD_COLLECTION, MONGO_COLLECTION_URL),
+                     QUEUE_LEASE_SECONDS, QUEUE_MAX_ATTEMPTS)
+
+
+def run_worker():
+    """One queue worker process: claim, parse and ack urls until the queue is empty"""
+    queue = url_queue()
     parser = Parser()
-    parser.start()
-    parser.close()
+    try:
+        parser.start(queue)
+    finally:
+        queue.close()
+        parser.close()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--seed", nargs="?", const=iteration, metavar="RUN_ID",
+                            help="one-shot: open run RUN_ID (default today's iteration) on the queue and exit")
+    arg_parser.add_argument("--queue", action="store_true", help="claim urls from the shared lease queue")
+    arg_parser.add_argument("--workers", type=int, default=1, help="queue worker processes on this node")
+    args = arg_parser.parse_args()
+
+    if args.seed:
+        queue = url_queue()
+        queue.seed(args.seed)
+        logging.info(f"Queue status: {queue.summary()[0]}")
+        queue.client.close()
+    elif args.queue:
+        queue = url_queue()
+        run_workers(run_worker, args.workers)
+        counts, workers = queue.summary()
+        logging.info(f"Queue status: {counts}")
+        for worker in workers:
+            logging.info(f"Worker {worker['_id']}: {worker['acked']} done, {worker['failed']} failed, "
+                         f"{worker['urls_per_minute']} urls/min")
+        queue.client.close()
+    else:
+        parser = Parser()
+        parser.start()
+        parser.close()
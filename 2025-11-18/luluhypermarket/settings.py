@@ -42,12 +42,20 @@ MONGO_COLLECTION_CATEGORY = f"{PROJECT_NAME}_category"
 MONGO_COLLECTION_URL_FAILED = f"{PROJECT_NAME}_url_failed"
 MONGO_COLLECTION_DATA = f"{PROJECT_NAME}_data"
 MONGO_COLLECTION_RESPONSE = f"{PROJECT_NAME}_responses"
+MONGO_COLLECTION_VALIDATORS = f"{PROJECT_NAME}_validators"
+
+"""CONDITIONAL GET (If-None-Match / If-Modified-Since) FOR PDP REFRESH RUNS"""
+CONDITIONAL_GET = True
 
 """SHARD / INDEX CONFIG"""
 SHARD_COLLECTION = [
     {"col": MONGO_COLLECTION_URL, "unique": True, "indexfield": "url"},
 ]
 
+"""WORK QUEUE (parser.py --queue)"""
+QUEUE_LEASE_SECONDS = 300   # a url leased by a crashed worker is handed out again after this
+QUEUE_MAX_ATTEMPTS = 3
+
 """HEADERS"""
 HEADERS = {
     'accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
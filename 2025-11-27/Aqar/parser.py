@@ -1,17 +1,46 @@
 import re
 import logging
 import requests
-from parsel import Selector
 from datetime import datetime
 from pymongo import MongoClient
+from extractor import Extractor
 from settings import HEADERS, MONGO_DB, MONGO_COLLECTION_DATA, MONGO_COLLECTION_URL, MONGO_COLLECTION_URL_FAILED
 
 
+""" FIELD SPEC - compiled once by Extractor, relative to the listing container """
+LISTING_CONTAINER = "//main"
+LISTING_FIELDS = {
+    "title": {"xpath": './/div[contains(@class,"_title")]//h1/text()', "default": ""},
+    "description": {"xpath": './/div[contains(@class,"_card__nZw1i")]//div[contains(@class,"_root__lFkcr")]//text()', "mode": "join", "default": ""},
+    "price": {"xpath": './/div[contains(@class,"_pricing")]//h2/span/text()'},
+    "bedrooms": {"xpath": './/*[contains(text(),"غرف النوم")]/following::div[1]//text()'},
+    "published_at": {"xpath": './/span[contains(text(),"تاريخ الإضافة")]/following-sibling::span/text()'},
+    "category": {"xpath": './/div[contains(@class,"_auction")]//h2/text()'},
+    "photos": {"xpath": './/button[contains(@class,"_more__")]', "mode": "string"},
+    "agent_name": {"xpath": './/h2[contains(@class,"_name")]/text()', "default": "", "page": True},
+    "broker_name": {"xpath": './/h2[contains(@class,"_companyName")]/text()', "default": "", "page": True},
+    "details": {
+        "xpath": './/div[contains(@class, "_newSpecCard")]//div[contains(@class, "_item___")]',
+        "mode": "items",
+        "fields": {
+            "key": {"xpath": './/div[contains(@class,"_label")]/text()'},
+            "value": {"xpath": './/div[contains(@class,"_value")]/text()'},
+        },
+    },
+    "amenities": {
+        "xpath": './/div[contains(@class,"_boolean__")]/div[contains(@class,"_label")]',
+        "mode": "items",
+        "fields": {"text": {"xpath": ".", "mode": "string", "default": ""}},
+    },
+}
+
+
 class Parser:
 
     def __init__(self):
         self.client = MongoClient("localhost", 27017)
         self.mongo = self.client[MONGO_DB]
+        self.extractor = Extractor(LISTING_FIELDS, container=LISTING_CONTAINER)
         logging.basicConfig(level=logging.INFO,format="%(asctime)s [%(levelname)s] %(message)s")
 
     """ RETRY REQUEST FUNCTION """
@@ -65,35 +94,20 @@ class Parser:
 
     def parse_item(self, url, response, category_url):
         try:
-            select = Selector(text=response.text)
             html = response.text
 
-            """ XPATH """
-            TITLE_XPATH = '//div[contains(@class,"_title")]//h1/text()'
-            DESC_XPATH = '//div[contains(@class,"_card__nZw1i")]//div[contains(@class,"_root__lFkcr")]//text()'
-            PRICE_XPATH = '//div[contains(@class,"_pricing")]//h2/span/text()'
-            BEDROOMS_XPATH = '//*[contains(text(),"غرف النوم")]/following::div[1]//text()'
-            PUBLISHED_XPATH = '//span[contains(text(),"تاريخ الإضافة")]/following-sibling::span/text()'
-            CATEGORY_XPATH = '//div[contains(@class,"_auction")]//h2/text()'
-            DETAILS_XPATH = '//div[contains(@class, "_newSpecCard")]//div[contains(@class, "_item___")]'
-            AMENITIES_XPATH = '//div[contains(@class,"_boolean__")]/div[contains(@class,"_label")]'
-            PHOTOS_COUNT_XPATH = '//button[contains(@class,"_more__")]'
-            BROKER_NAME_XPATH = '//h2[contains(@class,"_companyName")]/text()'
-            AGENT_NAME_XPATH = '//h2[contains(@class,"_name")]/text()'
-
             """ EXTRACT """
-            title = select.xpath(TITLE_XPATH).get() or ""
-            desc_nodes = select.xpath(DESC_XPATH).getall()
-            raw_desc = " ".join([d.strip() for d in desc_nodes if d.strip()])
-            price = select.xpath(PRICE_XPATH).get()
-            bedrooms = select.xpath(BEDROOMS_XPATH).get()
-            published_at_raw = select.xpath(PUBLISHED_XPATH).get()
-            category_raw = select.xpath(CATEGORY_XPATH).get()
-            photos_raw = select.xpath(PHOTOS_COUNT_XPATH).xpath('string()').get()
-            agent_name = select.xpath(AGENT_NAME_XPATH).get() or ""
-            broker_name = select.xpath(BROKER_NAME_XPATH).get() or ""
+            fields, _ = self.extractor.extract(html)
+            title = fields["title"]
+            raw_desc = fields["description"]
+            price = fields["price"]
+            bedrooms = fields["bedrooms"]
+            published_at_raw = fields["published_at"]
+            category_raw = fields["category"]
+            photos_raw = fields["photos"]
+            agent_name = fields["agent_name"]
+            broker_name = fields["broker_name"]
             broker_display = broker_name.upper()
-            
 
             """CLEAN """
             price = price.replace(",", "") if price else None
@@ -113,11 +127,9 @@ class Parser:
 
             """ Details dict """
             details = {}
-            for box in select.xpath(DETAILS_XPATH):
-                key = box.xpath('.//div[contains(@class,"_label")]/text()').get()
-                value = box.xpath('.//div[contains(@class,"_value")]/text()').get()
-                if key and value:
-                    details[key.strip()] = value.strip()
+            for box in fields["details"]:
+                if box["key"] and box["value"]:
+                    details[box["key"].strip()] = box["value"].strip()
 
             """ Extract number of photos """
             photos_count = ""
@@ -136,11 +148,7 @@ class Parser:
                 sub_category_1 = ""
 
             """ Amenities """
-            amenities = []
-            for a in select.xpath(AMENITIES_XPATH):
-                txt = "".join(a.xpath('.//text()').getall()).strip()
-                if txt:
-                    amenities.append(txt)
+            amenities = [a["text"].strip() for a in fields["amenities"] if a["text"].strip()]
 
             """ Furnished """
             furnished = ""
@@ -223,6 +231,7 @@ class Parser:
             logging.error(f"Parse crashed: {e}")
 
     def close(self):
+        self.extractor.log_timings()
         self.client.close()
         logging.info("Parser finished.")
 
@@ -1,18 +1,24 @@
 import logging
 import time
-import re
+import argparse
 from parsel import Selector
 from curl_cffi import requests
 from mongoengine import connect
-from settings import MONGO_DB, BASE_URL
+from settings import MONGO_DB, BASE_URL, HTTP_CACHE_PATH, HTTP_CACHE_MAX_MB, HTTP_CACHE_RULES
 from items import CategoryItem  
+from flight import FlightPayload
+from httpcache import HttpCache
+import settings
 
 
 class Crawler:
     """Crawling Categories"""
     
-    def __init__(self):
+    def __init__(self, use_cache=None):
         self.mongo = connect(db=MONGO_DB, alias='default', host='localhost', port=27017)
+        if use_cache is None:
+            use_cache = settings.HTTP_CACHE   # read per instance, so a runner can switch it off after import
+        self.cache = HttpCache(HTTP_CACHE_PATH, HTTP_CACHE_RULES, HTTP_CACHE_MAX_MB, enabled=use_cache)
     
     def start(self):
         """Requesting Start url"""
@@ -23,7 +29,7 @@ class Crawler:
         meta['start_url'] = url
         
         try:
-            response = requests.get(url, impersonate="chrome110", timeout=20)
+            response = self.cache.get(lambda: requests.get(url, impersonate="chrome110", timeout=20), url)
             if response.status_code == 200:
                 is_next = self.parse_item(response, meta)
                 if not is_next:
@@ -75,7 +81,6 @@ class Crawler:
                 
                 # Process each subcategory
                 for subcat in matched_subcats:
-                    time.sleep(1)  # polite delay
                     uids = self.parse_uid(subcat["sub_category_url"])
                     
                     # ITEM YEILD
@@ -99,43 +104,53 @@ class Crawler:
     def parse_uid(self, sub_url):
         """Extract UID(s) from subcategory page"""
         try:
-            response = requests.get(sub_url, impersonate="chrome110", timeout=20)
+            response = self.cache.get(lambda: self.polite_get(sub_url), sub_url)
             if response.status_code != 200:
                 logging.warning(f"Failed {response.status_code}: {sub_url}")
                 return None
             
-            sel = Selector(response.text)
-
-            SCRIPT_XPATH = '//script[contains(text(),"categoryData")]/text()'
-            
-            script_text = sel.xpath(SCRIPT_XPATH).get()
-            if not script_text:
-                return None
-            
-            # Remove push wrapper
-            payload = script_text.replace('self.__next_f.push([1,"1e:[[\"$\",\"$L1f\",null,', '')
-            payload = payload.replace(']","$L21"])', '')
-            
-            # Decode escaped characters
-            payload = payload.encode('utf-8').decode('unicode_escape')
-            payload = payload.replace("\\/", "/")
-            
-            # Extract UID(s)
-            uids = re.findall(r'"uid"\s*:\s*"([^"]+)"', payload)
+            # Extract UID(s) from the categoryData object of the flight payload
+            payload = FlightPayload.from_html(response.text)
+            uids = []
+            for category_data in payload.values("categoryData"):
+                for node in walk_uids(category_data):
+                    if node not in uids:
+                        uids.append(node)
             return uids if uids else None
             
         except Exception as e:
             logging.error(f"Error fetching {sub_url}: {e}")
             return None
     
+    def polite_get(self, url):
+        """Only requests that reach the site pay the polite delay"""
+        time.sleep(1)
+        return requests.get(url, impersonate="chrome110", timeout=20)
+
     def close(self):
         """Close function for all module object closing"""
         logging.info("Matalanme Crawling Completed")
+        self.cache.close()
         self.mongo.close()
         
 
+def walk_uids(node):
+    """uid values nested anywhere under a categoryData object"""
+    if isinstance(node, dict):
+        if isinstance(node.get("uid"), str):
+            yield node["uid"]
+        for value in node.values():
+            yield from walk_uids(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from walk_uids(value)
+
 
 if __name__ == "__main__":
-    crawler = Crawler()
+    arg_parser = argparse.ArgumentParser(description="Matalan ME category uid crawler")
+    arg_parser.add_argument("--no-cache", action="store_true", help="fetch every page, ignoring the HTTP cache")
+    args = arg_parser.parse_args()
+
+    crawler = Crawler(use_cache=False if args.no_cache else None)
     crawler.start()
     crawler.close()
\ No newline at end of file
@@ -0,0 +1,151 @@
+import re
+import json
+import logging
+
+PUSH_MARKER = "self.__next_f.push("
+ROW_ID = re.compile(r"[0-9a-fA-F]+")
+decoder = json.JSONDecoder()
+
+
+class FlightPayload:
+    """Incremental decoder for the Next.js React Server Components (flight) stream
+
+    The page ships the stream as `self.__next_f.push([1, "..."])` chunks that
+    split rows at arbitrary points. Chunks are concatenated with `feed`; every
+    complete `<id>:<row>` line is indexed by its reference id but only decoded
+    when a caller asks for it, so pulling one object out of a large page does
+    not pay for json-decoding the rest.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.rows = {}      # ref id -> (tag, raw)
+        self.decoded = {}   # ref id -> decoded value
+
+    @classmethod
+    def from_html(cls, html):
+        payload = cls()
+        for chunk in iter_push_chunks(html):
+            payload.feed(chunk)
+        payload.close()
+        return payload
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        self.scan(final=False)
+
+    def close(self):
+        self.scan(final=True)
+
+    def scan(self, final):
+        buffer = self.buffer
+        pos = 0
+        while pos < len(buffer):
+            colon = buffer.find(":", pos)
+            if colon == -1:
+                break
+            ref = buffer[pos:colon]
+            if not ROW_ID.fullmatch(ref):
+                """ Not a row start, skip the line """
+                newline = buffer.find("\n", pos)
+                if newline == -1:
+                    break
+                pos = newline + 1
+                continue
+
+            if buffer.startswith("T", colon + 1):
+                comma = buffer.find(",", colon + 2)
+                if comma == -1:
+                    break
+                size = int(buffer[colon + 2:comma], 16)
+                text = take_utf8(buffer, comma + 1, size)
+                if text is None:
+                    break
+                self.rows[ref] = ("T", text)
+                pos = comma + 1 + len(text)
+                continue
+
+            newline = buffer.find("\n", colon)
+            if newline == -1 and not final:
+                break
+            end = newline if newline != -1 else len(buffer)
+            raw = buffer[colon + 1:end]
+            tag = ""
+            while raw and raw[0].isupper():
+                tag += raw[0]
+                raw = raw[1:]
+            self.rows[ref] = (tag, raw)
+            pos = end + 1
+
+        self.buffer = buffer[pos:]
+
+    def row(self, ref):
+        """Decoded value of one row; text rows holding JSON come back decoded as well"""
+        ref = ref.lstrip("$").lstrip("L") if isinstance(ref, str) else ref
+        if ref in self.decoded:
+            return self.decoded[ref]
+        if ref not in self.rows:
+            return None
+
+        tag, raw = self.rows[ref]
+        value = raw
+        if tag == "T":
+            if raw[:1] in ("[", "{"):
+                try:
+                    value = json.loads(raw)
+                except ValueError:
+                    pass
+        else:
+            try:
+                value = json.loads(raw)
+            except ValueError as e:
+                logging.debug(f"Flight row {ref} is not JSON: {e}")
+        self.decoded[ref] = value
+        return value
+
+    def find(self, hint, predicate):
+        """Yield nested nodes matching predicate, decoding only rows whose raw text contains hint"""
+        for ref, (_, raw) in self.rows.items():
+            if hint in raw:
+                yield from walk(self.row(ref), predicate)
+
+    def values(self, key):
+        """Every value stored under `key` in any object of the stream"""
+        for node in self.find(f'"{key}"', lambda n: isinstance(n, dict) and key in n):
+            yield node[key]
+
+
+def iter_push_chunks(html):
+    """String payloads of every `self.__next_f.push([1, "..."])` call in the page, in order"""
+    pos = html.find(PUSH_MARKER)
+    while pos != -1:
+        start = pos + len(PUSH_MARKER)
+        try:
+            args, end = decoder.raw_decode(html, start)
+        except ValueError:
+            end = start
+        else:
+            if isinstance(args, list) and len(args) > 1 and args[0] == 1 and isinstance(args[1], str):
+                yield args[1]
+        pos = html.find(PUSH_MARKER, end)
+
+
+def take_utf8(buffer, start, size):
+    """The characters at buffer[start:] that make up `size` UTF-8 bytes, None if not all there yet"""
+    window = buffer[start:start + size]
+    encoded = window.encode("utf-8")
+    if len(encoded) < size:
+        return None
+    return encoded[:size].decode("utf-8", errors="ignore")
+
+
+def walk(node, predicate):
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if predicate(current):
+            yield current
+        if isinstance(current, dict):
+            stack.extend(reversed(list(current.values())))
+        elif isinstance(current, list):
+            stack.extend(reversed(current))
@@ -1,13 +1,14 @@
 import logging
-import re
 import json
 import time
 import requests
 from datetime import datetime, timezone
-from parsel import Selector
 from mongoengine import connect
-from settings import MONGO_DB, BASE_URL, PARSER_API_URL, PARSER_HEADERS, PARSER_QUERY
+from settings import (
+    MONGO_DB, BASE_URL, PARSER_API_URL, PARSER_HEADERS, PARSER_QUERY, PARSER_BATCH_SIZE, PARSER_BATCH_BLOCK
+)
 from items import ProductItem, ProductDetailItem, ProductFailedItem
+from flight import FlightPayload
 
 
 class Parser:
@@ -15,6 +16,8 @@ class Parser:
     
     def __init__(self):
         self.mongo = connect(db=MONGO_DB, alias="default", host="localhost", port=27017)
+        self.variant_cache = {}
+        self.variant_requests = 0
     
     def start(self):
         """Requesting Start url"""
@@ -22,6 +25,20 @@ class Parser:
         products = ProductItem.objects()
         logging.info(f"Found {products.count()} products to parse")
         
+        batch = []
+        for product in products:
+            batch.append(product)
+            if len(batch) >= PARSER_BATCH_SIZE:
+                self.parse_batch(batch)
+                batch = []
+        if batch:
+            self.parse_batch(batch)
+        logging.info(f"Variant API requests: {self.variant_requests}")
+
+    def parse_batch(self, products):
+        """Resolve size/colour for the whole batch in one GraphQL request, then fetch each PDP"""
+        self.prefetch_size_color([p.url_key for p in products if p.url_key])
+
         for product in products:
             meta = {}
             meta['product'] = product
@@ -49,77 +66,118 @@ class Parser:
         product = meta.get('product')
         url = f"{BASE_URL}/ae_en/{product.url_key}"
         
-        sel = Selector(response.text)
-        """XPATH"""
-        SCRIPT_XPATH = '//script[contains(text(),"Specifications")]/text()'
         """EXTRACT"""
-        script_text = sel.xpath(SCRIPT_XPATH).get()
-        
-        if script_text:
-            # Extract JSON inside self.__next_f.push([...])
-            match = re.search(r'self\.__next_f\.push\(\[1,"(.*?)"\]\)', script_text)
-            if match:
-                json_str = match.group(1)
-                # Decode escaped characters
-                json_str = json_str.encode('utf-8').decode('unicode_escape')
-                
-                try:
-                    data = json.loads(json_str)
-                    
-                    # EXTRACT
-                    specifications = {}
-                    description = ""
-                    
-                    for section in data:
-                        title = section.get("title")
-                        if title == "Specifications":
-                            for child in section.get("children", []):
-                                specifications[child.get("label")] = child.get("value")
-                        elif title == "Description":
-                            description = section.get("value", "").strip()
-                    
-                    # Fetch size and color using extra API
-                    size, color = self.parse_size_color(product.url_key)
-                    gender = specifications.get('Gender')
-                    print(gender)
-                    
-                    # ITEM YEILD
-                    item = {}
-                    item['unique_id'] = product.unique_id
-                    item['url'] = url
-                    item['product_name'] = product.product_name
-                    item['product_details'] = specifications
-                    item['color'] = color
-                    item['size'] = size
-                    item['selling_price'] = product.selling_price
-                    item['regular_price'] = product.regular_price
-                    item['image'] = product.image
-                    item['description'] = description
-                    item['currency'] = 'AED'
-                    item['gender'] = gender
-                    item['breadcrumbs'] = product.breadcrumbs
-                    item['extraction_date'] = datetime.now().strftime("%Y-%m-%d")
-                                       
-                    
-                    logging.info(item)
-                    try:
-                        detail_item = ProductDetailItem(**item)
-                        detail_item.save()
-                    except Exception as e:
-                        logging.warning(f"Mongo insert failed: {e}")
-                    
-                    return True
-                except Exception as e:
-                    logging.warning(f"JSON decode error for {url}: {e}")
-        
+        payload = FlightPayload.from_html(response.text)
+        sections = next(payload.find('"Specifications"', self.is_section_list), None)
+
+        if sections:
+            # EXTRACT
+            specifications = {}
+            description = ""
+
+            for section in sections:
+                title = section.get("title")
+                if title == "Specifications":
+                    for child in section.get("children", []):
+                        specifications[child.get("label")] = child.get("value")
+                elif title == "Description":
+                    description = (section.get("value") or "").strip()
+
+            # Fetch size and color using extra API
+            size, color = self.parse_size_color(product.url_key)
+            gender = specifications.get('Gender')
+
+            # ITEM YEILD
+            item = {}
+            item['unique_id'] = product.unique_id
+            item['url'] = url
+            item['product_name'] = product.product_name
+            item['product_details'] = specifications
+            item['color'] = color
+            item['size'] = size
+            item['selling_price'] = product.selling_price
+            item['regular_price'] = product.regular_price
+            item['image'] = product.image
+            item['description'] = description
+            item['currency'] = 'AED'
+            item['gender'] = gender
+            item['breadcrumbs'] = product.breadcrumbs
+            item['extraction_date'] = datetime.now().strftime("%Y-%m-%d")
+
+
+            logging.info(item)
+            try:
+                detail_item = ProductDetailItem(**item)
+                detail_item.save()
+            except Exception as e:
+                logging.warning(f"Mongo insert failed: {e}")
+
+            return True
+
         return False
+
+    @staticmethod
+    def is_section_list(node):
+        """PDP section list: [{"title": "Specifications", "children": [...]}, {"title": "Description", ...}]"""
+        return isinstance(node, list) and any(
+            isinstance(section, dict) and section.get("title") == "Specifications" for section in node
+        )
     
+    def prefetch_size_color(self, url_keys):
+        """Fill the variant cache for many url_keys with one aliased GraphQL request"""
+        url_keys = [k for k in dict.fromkeys(url_keys) if k not in self.variant_cache]
+        if not url_keys:
+            return
+
+        variables = {f"url_key_{i}": key for i, key in enumerate(url_keys)}
+        definitions = ", ".join(f"${name}: String!" for name in variables)
+        blocks = "".join(PARSER_BATCH_BLOCK.format(index=i) for i in range(len(url_keys)))
+        payload = {
+            "query": f"query GetProductVarientOptionsBatch({definitions}) {{{blocks}\n}}",
+            "variables": variables,
+            "operationName": "GetProductVarientOptionsBatch",
+        }
+
+        try:
+            self.variant_requests += 1
+            response = requests.post(PARSER_API_URL, headers=PARSER_HEADERS, json=payload, timeout=30)
+            if response.status_code != 200:
+                logging.warning(f"Batch variant API request failed ({response.status_code}), falling back per product")
+                return
+            data = response.json().get("data") or {}
+        except Exception as e:
+            logging.error(f"Error fetching batch variant options: {e}")
+            return
+
+        for i, key in enumerate(url_keys):
+            block = data.get(f"p{i}")
+            if block is None:
+                """ Alias errored, leave it to the single request """
+                continue
+            items = block.get("items") or []
+            options = items[0].get("selected_variant_options") or [] if items else []
+            self.variant_cache[key] = self.size_color_from_options(options)
+
+    def size_color_from_options(self, options):
+        size = None
+        color = None
+        for opt in options:
+            if opt.get("code") == "size":
+                size = opt.get("label")
+            elif opt.get("code") == "color":
+                color = opt.get("label")
+        return size, color
+
     def parse_size_color(self, url_key):
-        """Make an API call to fetch size and color variant options for a product"""
+        """Size and color variant options for a product, from the batch cache or a single API call"""
+        if url_key in self.variant_cache:
+            return self.variant_cache[url_key]
+
         variables = {"url_key": url_key}
         payload = {"query": PARSER_QUERY, "variables": json.dumps(variables), "operationName": "GetProductVarientOptions"}
         
         try:
+            self.variant_requests += 1
             response = requests.get(PARSER_API_URL, headers=PARSER_HEADERS, params=payload, timeout=10)
             if response.status_code != 200:
                 logging.warning(f"Variant API request failed for {url_key}")
@@ -131,15 +189,8 @@ class Parser:
                 return None, None
             
             options = item[0].get("selected_variant_options", [])
-            size = None
-            color = None
-            for opt in options:
-                if opt.get("code") == "size":
-                    size = opt.get("label")
-                elif opt.get("code") == "color":
-                    color = opt.get("label")
-            
-            return size, color
+            self.variant_cache[url_key] = self.size_color_from_options(options)
+            return self.variant_cache[url_key]
         
         except Exception as e:
             logging.error(f"Error fetching variant options for {url_key}: {e}")
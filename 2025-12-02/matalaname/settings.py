@@ -34,6 +34,14 @@ MONGO_COLLECTION_URL_FAILED = f"{PROJECT_NAME}_url_failed"
 MONGO_COLLECTION_PLP = f"{PROJECT_NAME}_products"
 MONGO_COLLECTION_PDP = f"{PROJECT_NAME}_products_data"
 
+# Cross-run HTTP cache for category discovery: (url regex, ttl seconds), first match wins
+HTTP_CACHE = True
+HTTP_CACHE_PATH = "cache/http_cache.sqlite"
+HTTP_CACHE_MAX_MB = 100
+HTTP_CACHE_RULES = [
+    (r"^https://www\.matalanme\.com/ae_en(/|$)", 24 * 3600),     # homepage widget and subcategory pages
+]
+
 
 HEADERS = {
  'accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
@@ -321,6 +329,19 @@ query GetProductVarientOptions($url_key: String!) {
 }
 """
 
+# variant options for this many url_keys per GraphQL request (one aliased products block each)
+PARSER_BATCH_SIZE = 25
+
+PARSER_BATCH_BLOCK = """
+  p{index}: products(filter: {{url_key: {{eq: $url_key_{index}}}}}) {{
+    items {{
+      selected_variant_options(url_key: $url_key_{index}) {{
+        label
+        code
+      }}
+    }}
+  }}"""
+
 
 
 
@@ -0,0 +1,79 @@
+import os
+import json
+import hashlib
+import logging
+import zstandard
+from settings import ARCHIVE_DIR, ARCHIVE_LEVEL, MONGO_COLLECTION_RESPONSE, iteration
+
+
+class ArchivedResponse:
+    """Response rebuilt from the archive, exposes the attributes parse_item uses"""
+
+    def __init__(self, url, content, status_code=200, headers=None):
+        self.url = url
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class ResponseArchive:
+    """Content-addressed, zstd compressed store of raw responses keyed by url and fetch date"""
+
+    def __init__(self, mongo, root=ARCHIVE_DIR, level=ARCHIVE_LEVEL):
+        self.collection = mongo[MONGO_COLLECTION_RESPONSE]
+        self.collection.create_index([("url", 1), ("fetch_date", -1)], unique=True)
+        self.root = root
+        self.compressor = zstandard.ZstdCompressor(level=level)
+        self.decompressor = zstandard.ZstdDecompressor()
+        os.makedirs(self.root, exist_ok=True)
+
+    def blob_path(self, digest):
+        return os.path.join(self.root, digest[:2], f"{digest}.zst")
+
+    def save(self, url, response, fetch_date=iteration):
+        """Store response body once per digest and index it against url + fetch date"""
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.blob_path(digest)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(self.compressor.compress(content))
+            os.replace(tmp_path, path)
+
+        try:
+            self.collection.update_one(
+                {"url": url, "fetch_date": fetch_date},
+                {"$set": {"sha256": digest, "status_code": response.status_code, "size": len(content)}},
+                upsert=True,
+            )
+        except Exception as e:
+            logging.error(f"Archive index error for {url}: {e}")
+        return digest
+
+    def load(self, url, fetch_date=None):
+        """Return the archived response for url, latest fetch unless a date is given"""
+        query = {"url": url}
+        if fetch_date:
+            query["fetch_date"] = fetch_date
+        record = self.collection.find_one(query, sort=[("fetch_date", -1)])
+        if not record:
+            return None
+
+        path = self.blob_path(record["sha256"])
+        if not os.path.exists(path):
+            logging.warning(f"Archive blob missing for {url}: {record['sha256']}")
+            return None
+
+        with open(path, "rb") as f:
+            content = self.decompressor.decompress(f.read())
+        return ArchivedResponse(url, content, record.get("status_code", 200))
@@ -1,7 +1,13 @@
+import time
 import logging
+import argparse
 import requests
 from pymongo import MongoClient
-from settings import (CATEGORY_API,HEADERS,MONGO_URI,MONGO_DB,MONGO_COLLECTION_CATEGORY,)
+from metrics import RequestMetrics
+from httpcache import HttpCache
+import settings
+from settings import (CATEGORY_API,HEADERS,MONGO_URI,MONGO_DB,MONGO_COLLECTION_CATEGORY,PROJECT_NAME,METRICS_DIR,
+                      SERVICE_POINT,HTTP_CACHE_PATH,HTTP_CACHE_MAX_MB,HTTP_CACHE_RULES,)
 
 logging.basicConfig(level=logging.INFO,format="%(asctime)s %(levelname)s:%(message)s",datefmt="%Y-%m-%d %H:%M:%S",)
 
@@ -9,16 +15,20 @@ logging.basicConfig(level=logging.INFO,format="%(asctime)s %(levelname)s:%(messa
 class CategoryCrawler:
     """Crawling Product Categories from Aldi Category API"""
 
-    def __init__(self):
+    def __init__(self, use_cache=None):
         self.client = MongoClient(MONGO_URI)
         self.mongo = self.client[MONGO_DB]
+        self.metrics = RequestMetrics(f"{PROJECT_NAME}_category_crawler", METRICS_DIR)
+        if use_cache is None:
+            use_cache = settings.HTTP_CACHE   # read per instance, so a runner can switch it off after import
+        self.cache = HttpCache(HTTP_CACHE_PATH, HTTP_CACHE_RULES, HTTP_CACHE_MAX_MB, enabled=use_cache)
         logging.info("MongoDB connection established successfully")
 
     def start(self):
         """Fetch category API"""
 
         logging.info(f"Requesting: {CATEGORY_API}")
-        response = requests.get(CATEGORY_API, headers=HEADERS, timeout=20)
+        response = self.cache.get(self.request_categories, CATEGORY_API, store=SERVICE_POINT)
         response.raise_for_status()
 
         data = response.json().get("data", [])
@@ -37,6 +47,12 @@ class CategoryCrawler:
         return True
 
 
+    def request_categories(self):
+        started = time.perf_counter()
+        response = requests.get(CATEGORY_API, headers=HEADERS, timeout=20)
+        self.metrics.observe_response(CATEGORY_API, response, started)
+        return response
+
     def parse_item(self, category_data):
         """Parse and store a single category with its subcategories"""
 
@@ -67,11 +83,17 @@ class CategoryCrawler:
         logging.info(f"Inserted category: {category_name} with {len(subcategories)} subcategories")
 
     def close(self):
+        self.metrics.close()
+        self.cache.close()
         self.client.close()
         logging.info("CategoryCrawler stopped - MongoDB connection closed")
 
 
 if __name__ == "__main__":
-    crawler = CategoryCrawler()
+    arg_parser = argparse.ArgumentParser(description="Aldi category tree crawler")
+    arg_parser.add_argument("--no-cache", action="store_true", help="fetch the category tree, ignoring the HTTP cache")
+    args = arg_parser.parse_args()
+
+    crawler = CategoryCrawler(use_cache=False if args.no_cache else None)
     crawler.start()
     crawler.close()
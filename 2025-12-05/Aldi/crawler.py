@@ -3,7 +3,8 @@ import logging
 import requests
 from pymongo import MongoClient
 from pymongo.errors import PyMongoError
-from settings import (MONGO_URI,MONGO_DB,MONGO_COLLECTION_CATEGORY,MONGO_COLLECTION_URLS,MONGO_COLLECTION_URL_FAILED,HEADERS,PRODUCT_SEARCH_API,DEFAULT_QS,)
+from metrics import RequestMetrics
+from settings import (MONGO_URI,MONGO_DB,MONGO_COLLECTION_CATEGORY,MONGO_COLLECTION_URLS,MONGO_COLLECTION_URL_FAILED,HEADERS,PRODUCT_SEARCH_API,DEFAULT_QS,PROJECT_NAME,METRICS_DIR,)
 
 logging.basicConfig(level=logging.INFO,format="%(asctime)s %(levelname)s:%(message)s",datefmt="%Y-%m-%d %H:%M:%S",)
 
@@ -14,6 +15,7 @@ class ProductCrawler:
     def __init__(self):
         self.client = MongoClient(MONGO_URI)
         self.mongo = self.client[MONGO_DB]
+        self.metrics = RequestMetrics(f"{PROJECT_NAME}_crawler", METRICS_DIR)
         logging.info("MongoDB connection established successfully")
 
     def start(self):
@@ -67,6 +69,7 @@ class ProductCrawler:
             params["categoryKey"] = category_key
             params["offset"] = offset
 
+            started = time.perf_counter()
             try:
                 response = requests.get(
                     PRODUCT_SEARCH_API,
@@ -74,6 +77,7 @@ class ProductCrawler:
                     headers=HEADERS,
                     timeout=20
                 )
+                self.metrics.observe_response(PRODUCT_SEARCH_API, response, started)
 
                 if response.status_code == 400:
                     logging.info(f"No products found for {category_name}/{subcategory_name}")
@@ -118,6 +122,7 @@ class ProductCrawler:
                 time.sleep(0.2)
 
             except requests.RequestException as e:
+                self.metrics.observe_response(PRODUCT_SEARCH_API, None, started)
                 error_msg = f"Request error for category key={category_key}, offset={offset}: {e}"
                 logging.error(error_msg)
 
@@ -133,6 +138,7 @@ class ProductCrawler:
         )
 
     def close(self):
+        self.metrics.close()
         self.client.close()
         logging.info("ProductCrawler stopped - MongoDB connection closed")
 
@@ -0,0 +1,93 @@
+import re
+import json
+import hashlib
+import logging
+from datetime import datetime
+
+VOLATILE_FIELDS = {"_id", "extraction_date"}
+
+
+def normalise(item):
+    """Item without run-specific fields, strings whitespace-collapsed"""
+    normalised = {}
+    for key, value in item.items():
+        if key in VOLATILE_FIELDS:
+            continue
+        if isinstance(value, str):
+            value = re.sub(r"\s+", " ", value).strip()
+        normalised[key] = value
+    return normalised
+
+
+def fingerprint(normalised):
+    payload = json.dumps(normalised, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class ChangeTracker:
+    """Compares each parsed item with the fingerprint of its last stored version
+
+    Unchanged items come back as None so the caller can skip the write; new and
+    changed items get a delta record with only the fields that differ.
+    """
+
+    def __init__(self, fingerprint_col, delta_col, key_field, iteration=None):
+        self.fingerprints = fingerprint_col
+        self.deltas = delta_col
+        self.key_field = key_field
+        self.iteration = iteration or datetime.now().strftime("%Y_%m_%d")
+        self.fingerprints.create_index("key", unique=True)
+        self.deltas.create_index([("iteration", 1), ("key", 1)])
+        self.stats = {"new": 0, "changed": 0, "unchanged": 0}
+
+    def check(self, item):
+        """Pending change for a new or changed item, None when it matches the stored fingerprint"""
+        key = str(item.get(self.key_field) or "")
+        normalised = normalise(item)
+        digest = fingerprint(normalised)
+        stored = self.fingerprints.find_one({"key": key}, {"fingerprint": 1, "values": 1}) if key else None
+
+        if stored and stored.get("fingerprint") == digest:
+            self.stats["unchanged"] += 1
+            return None
+
+        previous = stored.get("values", {}) if stored else {}
+        change_type = "changed" if stored else "new"
+        self.stats[change_type] += 1
+        return {
+            "key": key,
+            "fingerprint": digest,
+            "values": normalised,
+            "change_type": change_type,
+            "fields": {
+                field: {"old": previous.get(field, ""), "new": value}
+                for field, value in normalised.items()
+                if previous.get(field) != value
+            },
+        }
+
+    def commit(self, change):
+        """Record the delta and new fingerprint once the item itself has been written"""
+        if not change or not change["key"]:
+            return
+        try:
+            self.deltas.insert_one({
+                "key": change["key"],
+                "iteration": self.iteration,
+                "change_type": change["change_type"],
+                "fields": change["fields"],
+                "detected_at": datetime.now(),
+            })
+            self.fingerprints.update_one(
+                {"key": change["key"]},
+                {"$set": {"fingerprint": change["fingerprint"], "values": change["values"], "updated_at": datetime.now()}},
+                upsert=True,
+            )
+        except Exception as e:
+            logging.error(f"Fingerprint save error for {change['key']}: {e}")
+
+    def log_stats(self):
+        logging.info(
+            f"Change detection: {self.stats['new']} new, {self.stats['changed']} changed, "
+            f"{self.stats['unchanged']} unchanged (writes skipped)"
+        )
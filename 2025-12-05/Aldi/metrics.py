@@ -0,0 +1,165 @@
+import os
+import json
+import time
+import logging
+import threading
+from urllib.parse import urlsplit
+import psutil
+
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RSS_SAMPLE_EVERY = 50
+
+
+def system_snapshot():
+    proc = psutil.Process()
+    mem = psutil.virtual_memory()
+    return {
+        "timestamp": time.time(),
+        "rss_bytes": proc.memory_info().rss,
+        "system_total_mem": mem.total,
+        "system_used_percent": mem.percent,
+        "cpu_percent": psutil.cpu_percent(interval=None),
+    }
+
+
+class RequestMetrics:
+    """Per-host request metrics for one crawler/parser run, written out on close"""
+
+    def __init__(self, job, output_dir="metrics"):
+        self.job = job
+        self.output_dir = output_dir
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.hosts = {}
+        self.requests = 0
+        self.peak_rss = 0
+        self.last_snapshot = {}
+        self.sample_system()
+
+    def host_stats(self, url):
+        host = urlsplit(url).netloc or "unknown"
+        if host not in self.hosts:
+            self.hosts[host] = {
+                "buckets": [0] * len(LATENCY_BUCKETS),
+                "latency_sum": 0.0,
+                "count": 0,
+                "status": {},
+                "bytes": 0,
+                "retries": 0,
+            }
+        return self.hosts[host]
+
+    def observe(self, url, status, elapsed, size=0):
+        """Record one finished request; status is None when the request raised"""
+        with self.lock:
+            stats = self.host_stats(url)
+            stats["count"] += 1
+            stats["latency_sum"] += elapsed
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if elapsed <= bound:
+                    stats["buckets"][i] += 1
+            key = str(status) if status is not None else "error"
+            stats["status"][key] = stats["status"].get(key, 0) + 1
+            stats["bytes"] += size or 0
+            self.requests += 1
+            sample = self.requests % RSS_SAMPLE_EVERY == 0
+
+        if sample:
+            self.sample_system()
+
+    def observe_response(self, url, response, started):
+        """Record a requests/curl_cffi response (or None on failure) fetched since started"""
+        elapsed = time.perf_counter() - started
+        if response is None:
+            self.observe(url, None, elapsed)
+        else:
+            self.observe(url, response.status_code, elapsed, len(response.content or b""))
+
+    def retry(self, url):
+        with self.lock:
+            self.host_stats(url)["retries"] += 1
+
+    def sample_system(self):
+        try:
+            self.last_snapshot = system_snapshot()
+            self.peak_rss = max(self.peak_rss, self.last_snapshot["rss_bytes"])
+        except Exception as e:
+            logging.debug(f"System snapshot failed: {e}")
+
+    def summary(self):
+        self.sample_system()
+        hosts = {}
+        for host, stats in self.hosts.items():
+            hosts[host] = {
+                "requests": stats["count"],
+                "avg_latency_s": round(stats["latency_sum"] / stats["count"], 4) if stats["count"] else 0,
+                "latency_buckets": dict(zip([str(b) for b in LATENCY_BUCKETS], stats["buckets"])),
+                "status": stats["status"],
+                "bytes": stats["bytes"],
+                "retries": stats["retries"],
+            }
+        return {
+            "job": self.job,
+            "started": self.started,
+            "duration_s": round(time.time() - self.started, 2),
+            "requests": self.requests,
+            "peak_rss_bytes": self.peak_rss,
+            "system": self.last_snapshot,
+            "hosts": hosts,
+        }
+
+    def prometheus(self):
+        """Render the run in Prometheus text exposition format"""
+        job = self.job
+        lines = [
+            "# HELP scraper_request_duration_seconds Request latency per host",
+            "# TYPE scraper_request_duration_seconds histogram",
+        ]
+        for host, stats in self.hosts.items():
+            labels = f'job="{job}",host="{host}"'
+            for bound, count in zip(LATENCY_BUCKETS, stats["buckets"]):
+                lines.append(f'scraper_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'scraper_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats["count"]}')
+            lines.append(f"scraper_request_duration_seconds_sum{{{labels}}} {stats['latency_sum']:.6f}")
+            lines.append(f"scraper_request_duration_seconds_count{{{labels}}} {stats['count']}")
+
+        lines += ["# HELP scraper_requests_total Requests per host and status", "# TYPE scraper_requests_total counter"]
+        for host, stats in self.hosts.items():
+            for status, count in stats["status"].items():
+                lines.append(f'scraper_requests_total{{job="{job}",host="{host}",status="{status}"}} {count}')
+
+        lines += ["# HELP scraper_response_bytes_total Response bytes per host", "# TYPE scraper_response_bytes_total counter"]
+        for host, stats in self.hosts.items():
+            lines.append(f'scraper_response_bytes_total{{job="{job}",host="{host}"}} {stats["bytes"]}')
+
+        lines += ["# HELP scraper_retries_total Retries per host", "# TYPE scraper_retries_total counter"]
+        for host, stats in self.hosts.items():
+            lines.append(f'scraper_retries_total{{job="{job}",host="{host}"}} {stats["retries"]}')
+
+        lines += [
+            "# HELP scraper_peak_rss_bytes Peak resident memory sampled during the run",
+            "# TYPE scraper_peak_rss_bytes gauge",
+            f'scraper_peak_rss_bytes{{job="{job}"}} {self.peak_rss}',
+            "# HELP scraper_run_duration_seconds Wall time of the run",
+            "# TYPE scraper_run_duration_seconds gauge",
+            f'scraper_run_duration_seconds{{job="{job}"}} {time.time() - self.started:.2f}',
+        ]
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        """Write <job>.prom (textfile collector) and <job>.json summaries"""
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            summary = self.summary()
+            with open(os.path.join(self.output_dir, f"{self.job}.json"), "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2)
+
+            prom_path = os.path.join(self.output_dir, f"{self.job}.prom")
+            with open(f"{prom_path}.tmp", "w", encoding="utf-8") as f:
+                f.write(self.prometheus())
+            os.replace(f"{prom_path}.tmp", prom_path)
+
+            logging.info(f"Metrics: {summary['requests']} requests, peak RSS {summary['peak_rss_bytes'] / 1048576:.1f} MB -> {self.output_dir}")
+        except Exception as e:
+            logging.error(f"Failed to write metrics: {e}")
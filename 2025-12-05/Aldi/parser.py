@@ -1,11 +1,15 @@
 import time
 import re
 import logging
+import argparse
 import requests
 from pymongo import MongoClient
 from datetime import datetime
 from parsel import Selector
-from settings import (MONGO_URI,MONGO_DB,MONGO_COLLECTION_URLS,MONGO_COLLECTION_DATA,MONGO_COLLECTION_URL_FAILED,MONGO_COLLECTION_VARIANTS,PDP_API,HEADERS,)
+from settings import (MONGO_URI,MONGO_DB,MONGO_COLLECTION_URLS,MONGO_COLLECTION_DATA,MONGO_COLLECTION_URL_FAILED,MONGO_COLLECTION_VARIANTS,PDP_API,HEADERS,PROJECT_NAME,METRICS_DIR,MONGO_COLLECTION_FINGERPRINT,MONGO_COLLECTION_DELTA,iteration,)
+from archive import ResponseArchive
+from metrics import RequestMetrics
+from fingerprint import ChangeTracker
 
 logging.basicConfig(level=logging.INFO,format="%(asctime)s %(levelname)s:%(message)s",datefmt="%Y-%m-%d %H:%M:%S",)
 
@@ -13,22 +17,43 @@ logging.basicConfig(level=logging.INFO,format="%(asctime)s %(levelname)s:%(messa
 class Parser:
     """Parser for Aldi product details"""
 
-    def __init__(self):
+    def __init__(self, reparse=False, archive_date=None):
         self.client = MongoClient(MONGO_URI)
         self.mongo = self.client[MONGO_DB]
         logging.info("MongoDB successfully connected")
+        self.archive = ResponseArchive(self.mongo)
+        self.reparse = reparse
+        self.archive_date = archive_date
+        self.metrics = RequestMetrics(f"{PROJECT_NAME}_parser", METRICS_DIR)
+        self.changes = ChangeTracker(
+            self.mongo[MONGO_COLLECTION_FINGERPRINT],
+            self.mongo[MONGO_COLLECTION_DELTA],
+            key_field="unique_id",
+            iteration=iteration,
+        )
+        if self.reparse:
+            logging.info(f"Reparse mode: reading responses from archive ({archive_date or 'latest'})")
 
 
     def request_with_retry(self, url, headers=None, max_retries=3, timeout=20):
-        """Retry wrapper for API & HTML requests"""
+        """Retry wrapper for API & HTML requests, served from the archive in reparse mode"""
+        if self.reparse:
+            return self.archive.load(url, self.archive_date)
+
         for attempt in range(1, max_retries + 1):
+            if attempt > 1:
+                self.metrics.retry(url)
+            started = time.perf_counter()
             try:
                 resp = requests.get(url, headers=headers, timeout=timeout)
+                self.metrics.observe_response(url, resp, started)
                 if resp.status_code == 200:
+                    self.archive.save(url, resp)
                     return resp
                 else:
                     logging.warning(f"Attempt {attempt}: HTTP {resp.status_code} for {url}")
             except Exception as e:
+                self.metrics.observe_response(url, None, started)
                 logging.warning(f"Attempt {attempt}: Error fetching {url} -> {e}")
             time.sleep(attempt)
         return None
@@ -64,8 +89,10 @@ class Parser:
                     {"url": url, "sku": sku, "reason": "Request failed after retries"}
                 )
 
-            time.sleep(0.2)
+            if not self.reparse:
+                time.sleep(0.2)
 
+        self.changes.log_stats()
         logging.info("Parser completed successfully")
         return True
     
@@ -165,6 +192,7 @@ class Parser:
         url_slug = data.get("urlSlugText", "")
         
         variant_names = []
+        variant_docs = []
         variants_data = data.get("variants", {})
         
         if variants_data:
@@ -176,12 +204,12 @@ class Parser:
                 variant_values = buckets[0].get("values", [])
                 variant_names = variant_values
                 
-                """Store variants in separate collection"""
+                """Variants go to their own collection once the product is known to have changed"""
                 for idx, variant_value in enumerate(variant_values):
                     if idx < len(options) and options[idx]:
                         variant_sku = options[idx][0].get("sku", "")
                         if variant_sku:
-                            variant_doc = {
+                            variant_docs.append({
                                 "parent_sku": parent_sku,
                                 "parent_name": parent_name,
                                 "parent_brand": parent_brand,
@@ -192,14 +220,7 @@ class Parser:
                                 "extraction_date": extraction_date,
                                 "pdp_url": f"https://www.aldi.co.uk/product/{url_slug}-{variant_sku}",
                                 "display_info": f"{parent_brand} - {parent_name} - {variant_value} (SKU: {variant_sku})"
-                            }
-                            
-                            try:
-                                self.mongo[MONGO_COLLECTION_VARIANTS].insert_one(variant_doc)
-
-                                logging.info(f"Stored variant: {variant_value} (SKU: {variant_sku})")
-                            except Exception as e:
-                                logging.error(f"Failed to insert variant: {e}")
+                            })
 
         """ITEM YIELD"""
         item = {}
@@ -233,19 +254,43 @@ class Parser:
         item["ingredients"] = data.get("ingredients", "")
         item["product_unique_key"] = f"{parent_sku}P"
 
-        logging.info(f"Inserted product: {item['product_name']}")
+        """SKIP UNCHANGED"""
+        change = self.changes.check(item)
+        if change is None:
+            logging.info(f"Unchanged product: {item['product_name']}")
+            return
 
         try:
-            self.mongo[MONGO_COLLECTION_DATA].insert_one(item)
+            self.mongo[MONGO_COLLECTION_DATA].update_one(
+                {"unique_id": item["unique_id"]}, {"$set": item}, upsert=True
+            )
+            self.changes.commit(change)
+            logging.info(f"Inserted product: {item['product_name']}")
         except Exception as e:
             logging.error(f"Failed to insert item: {e}")
 
+        for variant_doc in variant_docs:
+            try:
+                self.mongo[MONGO_COLLECTION_VARIANTS].update_one(
+                    {"parent_sku": variant_doc["parent_sku"], "variant_sku": variant_doc["variant_sku"]},
+                    {"$set": variant_doc}, upsert=True,
+                )
+                logging.info(f"Stored variant: {variant_doc['variant_value']} (SKU: {variant_doc['variant_sku']})")
+            except Exception as e:
+                logging.error(f"Failed to insert variant: {e}")
+
     def close(self):
+        self.metrics.close()
         self.mongo.client.close()
         logging.info("MongoDB connection closed")
 
 
 if __name__ == "__main__":
-    parser = Parser()
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--reparse", action="store_true", help="re-run parse_item from the response archive, no network")
+    arg_parser.add_argument("--date", default=None, help="archive fetch date to reparse (YYYY_MM_DD), latest by default")
+    args = arg_parser.parse_args()
+
+    parser = Parser(reparse=args.reparse, archive_date=args.date)
     parser.start()
     parser.close()
\ No newline at end of file
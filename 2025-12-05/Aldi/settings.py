@@ -22,6 +22,7 @@ MONTH_VALUE = calendar.month_abbr[int(MONTH.lstrip("0"))]
 WEEK = (int(DAY) - 1) // 7 + 1
 
 FILE_NAME = f"aldi_{iteration}_sample.csv"
+DELTA_FILE_NAME = f"aldi_{iteration}_delta.csv"
 
 # Mongo db and collections
 MONGO_DB = (f"{PROJECT_NAME}_db")
@@ -33,12 +34,40 @@ MONGO_COLLECTION_URLS = f"{PROJECT_NAME}_urls"
 MONGO_COLLECTION_DATA = f"{PROJECT_NAME}_data"
 MONGO_COLLECTION_URL_FAILED = f"{PROJECT_NAME}_url_failed"
 MONGO_COLLECTION_VARIANTS = f"{PROJECT_NAME}_variants" 
+MONGO_COLLECTION_RESPONSE = f"{PROJECT_NAME}_responses"
+MONGO_COLLECTION_FINGERPRINT = f"{PROJECT_NAME}_fingerprint"
+MONGO_COLLECTION_DELTA = f"{PROJECT_NAME}_delta"
 
+# Run metrics (prometheus textfile + json summary)
+METRICS_DIR = "metrics"
+
+# Raw response archive
+ARCHIVE_DIR = "archive"
+ARCHIVE_LEVEL = 10
+
+
+# Store the single-store crawl prices against
+SERVICE_POINT = "C092"
+
+# Store matrix (store_prices.py): service points priced per run, add stores here or pass --stores
+STORE_MATRIX = [
+    {"store_id": "C092"},
+]
+STORE_MATRIX_CONCURRENCY = 4
+STORE_MATRIX_DIR = "store_matrix"
 
 # API endpoints
-CATEGORY_API = "https://api.aldi.co.uk/v2/product-category-tree?serviceType=walk-in&servicePoint=C092"
+CATEGORY_API = f"https://api.aldi.co.uk/v2/product-category-tree?serviceType=walk-in&servicePoint={SERVICE_POINT}"
 PRODUCT_SEARCH_API = "https://api.aldi.co.uk/v3/product-search"
-PDP_API = "https://api.aldi.co.uk/v2/products/{SKU}?servicePoint=C092&serviceType=walk-in"
+PDP_API = "https://api.aldi.co.uk/v2/products/{SKU}?servicePoint=" + SERVICE_POINT + "&serviceType=walk-in"
+
+# Cross-run HTTP cache for category discovery: (url regex, ttl seconds), first match wins
+HTTP_CACHE = True
+HTTP_CACHE_PATH = "cache/http_cache.sqlite"
+HTTP_CACHE_MAX_MB = 50
+HTTP_CACHE_RULES = [
+    (r"/v2/product-category-tree", 24 * 3600),
+]
 
 # HTTP headers
 HEADERS = {
@@ -54,7 +83,7 @@ DEFAULT_QS = {
     "limit": 30,
     "offset": 0,
     "sort": "relevance",
-    "servicePoint": "C092",
+    "servicePoint": SERVICE_POINT,
 }
 
 # CSV Export headers
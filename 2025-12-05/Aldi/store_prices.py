@@ -0,0 +1,87 @@
+import logging
+import argparse
+import requests
+from pymongo import MongoClient
+from storematrix import StoreMatrix
+from settings import (
+    MONGO_URI, MONGO_DB, MONGO_COLLECTION_CATEGORY, HEADERS, PRODUCT_SEARCH_API, DEFAULT_QS,
+    PROJECT_NAME, STORE_MATRIX, STORE_MATRIX_CONCURRENCY, STORE_MATRIX_DIR,
+)
+
+
+class StorePrices:
+    """Price and availability of every listed product for each service point in STORE_MATRIX
+
+    Walks the same product-search pages as crawler.py, once per service point;
+    name, brand and url are kept once per SKU, the price fields per store.
+    """
+
+    def __init__(self, stores):
+        self.stores = stores
+        client = MongoClient(MONGO_URI)
+        self.category_keys = []
+        for cat in client[MONGO_DB][MONGO_COLLECTION_CATEGORY].find({}):
+            subcategories = cat.get("subcategories", [])
+            if subcategories:
+                self.category_keys.extend(sub["key"] for sub in subcategories if sub.get("key"))
+            elif cat.get("category_key"):
+                self.category_keys.append(cat["category_key"])
+        client.close()
+        logging.info(f"{len(self.category_keys)} category keys x {len(stores)} stores")
+
+    def start(self):
+        if not self.category_keys:
+            logging.warning("No categories found. Please run category_crawler first.")
+            return
+        StoreMatrix(PROJECT_NAME, self.stores, self.fetch_store, STORE_MATRIX_CONCURRENCY,
+                    STORE_MATRIX_DIR, currency="GBP").start()
+
+    def fetch_store(self, store):
+        session = requests.Session()
+        try:
+            for category_key in self.category_keys:
+                offset = 0
+                while True:
+                    params = {**DEFAULT_QS, "servicePoint": store["store_id"], "categoryKey": category_key, "offset": offset}
+                    response = session.get(PRODUCT_SEARCH_API, params=params, headers=HEADERS, timeout=20)
+                    if response.status_code == 400:
+                        break
+                    response.raise_for_status()
+
+                    data = response.json().get("data", [])
+                    if not data:
+                        break
+                    for product in data:
+                        if product.get("sku"):
+                            yield self.split(product)
+                    offset += DEFAULT_QS.get("limit", 30)
+        finally:
+            session.close()
+
+    @staticmethod
+    def split(product):
+        """(store-invariant product, per-store price) from one product-search entry"""
+        price_data = product.get("price") or {}
+        selling = (price_data.get("amountRelevantDisplay") or "").replace("£", "").strip()
+        regular = (price_data.get("amountWasDisplay") or "").replace("£", "").strip() or selling
+
+        sku = str(product["sku"])
+        return {
+            "product_id": sku,
+            "product_name": product.get("name", ""),
+            "brand": product.get("brandName", ""),
+            "pdp_url": f"https://www.aldi.co.uk/product/{product.get('urlSlugText', '')}-{sku}",
+        }, {
+            "selling_price": selling,
+            "regular_price": regular,
+            "in_stock": not product.get("notForSale", False),
+        }
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--stores", nargs="*", help="service points, STORE_MATRIX by default")
+    args = arg_parser.parse_args()
+
+    stores = [{"store_id": s} for s in args.stores] if args.stores else STORE_MATRIX
+    StorePrices(stores).start()
@@ -3,10 +3,31 @@ import json
 import time
 from curl_cffi import requests
 from pymongo import MongoClient
-from parsel import Selector
+from extractor import Extractor
 from settings import (HEADERS, MONGO_URI, MONGO_DB,MONGO_COLLECTION_MATCHED, MONGO_COLLECTION_DATA,REQUEST_DELAY, REQUEST_TIMEOUT)
 
 
+""" FIELD SPEC - compiled once by Extractor, relative to the product container """
+PDP_CONTAINER = "//main"
+PDP_FIELDS = {
+    "brand": {"xpath": './/div[contains(@class,"product_detail-brand")]//a/text()'},
+    "ld_json": {"xpath": './/script[@type="application/ld+json"]/text()', "mode": "all", "page": True},
+    "breadcrumbs": {"xpath": './/ul[@id="breadcrumbs"]//li//span/text()', "mode": "all", "page": True},
+    "images": {"xpath": './/div[@id="pdp_carousel"]//picture//img/@src', "mode": "all"},
+    "description": {"xpath": './/div[@class="product_detail-description"]//p/text()'},
+    "model": {"xpath": './/div[contains(text(),"Modelo")]/text()'},
+    "reference": {"xpath": './/div[contains(text(),"Referencia")]/text()'},
+    "additional_details": {
+        "xpath": './/div[contains(@class,"infoGroup")]',
+        "mode": "items",
+        "fields": {
+            "key": {"xpath": './/dt[@class="titleInfoProduct"]/text()'},
+            "value": {"xpath": './/dd//div/text()'},
+        },
+    },
+}
+
+
 class Parser:
     """Parser for extracting product details from PDP"""
 
@@ -14,6 +35,7 @@ class Parser:
         """Initialize MongoDB connection"""
         self.client = MongoClient(MONGO_URI)
         self.mongo = self.client[MONGO_DB]
+        self.extractor = Extractor(PDP_FIELDS, container=PDP_CONTAINER)
         logging.info("Parser initialized with MongoDB connection")
 
     def start(self):
@@ -71,36 +93,28 @@ class Parser:
 
     def parse_item(self, url, response, product_name, db_ean, match_type, score):
         """Extract product details from PDP response"""
-        sel = Selector(text=response.text)
-
-        """ XPATH """
-        BRAND_XPATH = '//div[contains(@class,"product_detail-brand")]//a/text()'
-        BREADCRUMBS_XPATH_SCRIPTS = '//script[@type="application/ld+json"]/text()'
-        BREADCRUMBS_XPATH_FALLBACK = '//ul[@id="breadcrumbs"]//li//span/text()'
-        IMAGES_XPATH = '//div[@id="pdp_carousel"]//picture//img/@src'
-        DESCRIPTION_XPATH = '//div[@class="product_detail-description"]//p/text()'
-        MODEL_XPATH = '//div[contains(text(),"Modelo")]/text()'
-        REFERENCE_XPATH = '//div[contains(text(),"Referencia")]/text()'
-        ADDITIONAL_DETAILS_XPATH = '//div[contains(@class,"infoGroup")]'
-
+        fields, _ = self.extractor.extract(response.text)
 
         price = None
         ean = None
-        brand = sel.xpath(BRAND_XPATH).get()
+        brand = fields["brand"]
 
         """Extract Price and EAN from JSON-LD"""
-        for block in sel.xpath(BREADCRUMBS_XPATH_SCRIPTS).getall():
+        ld_blocks = []
+        for block in fields["ld_json"]:
             try:
-                data = json.loads(block.strip())
-                if isinstance(data, dict) and data.get("@type") == "Product":
-                    if "offers" in data and "price" in data["offers"]:
-                        price = data["offers"]["price"]
-                    if "sku" in data:
-                        ean = str(data["sku"]).strip()
-                    break
+                ld_blocks.append(json.loads(block.strip()))
             except Exception:
                 pass
 
+        for data in ld_blocks:
+            if isinstance(data, dict) and data.get("@type") == "Product":
+                if "offers" in data and "price" in data["offers"]:
+                    price = data["offers"]["price"]
+                if "sku" in data:
+                    ean = str(data["sku"]).strip()
+                break
+
         """CLEAN"""
         brand = brand.strip() if brand else None
 
@@ -116,33 +130,30 @@ class Parser:
 
         """Breadcrumbs"""
         breadcrumbs = []
-        for block in sel.xpath(BREADCRUMBS_XPATH_SCRIPTS).getall():
-            try:
-                data = json.loads(block.strip())
-                if isinstance(data, dict) and data.get("@type") == "BreadcrumbList":
+        for data in ld_blocks:
+            if isinstance(data, dict) and data.get("@type") == "BreadcrumbList":
+                try:
                     for bc in data.get("itemListElement", []):
                         breadcrumbs.append(bc["item"]["name"].strip())
                     break
-            except Exception:
-                pass
+                except Exception:
+                    pass
 
         if not breadcrumbs:
-            breadcrumbs = sel.xpath(BREADCRUMBS_XPATH_FALLBACK).getall()
-            breadcrumbs = [b.strip() for b in breadcrumbs if b.strip()]
+            breadcrumbs = [b.strip() for b in fields["breadcrumbs"] if b.strip()]
 
         breadcrumbs_path = " > ".join(breadcrumbs) if breadcrumbs else None
 
         """ Images """
-        images = sel.xpath(IMAGES_XPATH).getall()
-        images = list(dict.fromkeys(images))
+        images = list(dict.fromkeys(fields["images"]))
 
         """Description """
-        description = sel.xpath(DESCRIPTION_XPATH).get()
+        description = fields["description"]
         description = description.strip() if description else None
 
         """ Model and Reference """
-        model = sel.xpath(MODEL_XPATH).get()
-        reference = sel.xpath(REFERENCE_XPATH).get()
+        model = fields["model"]
+        reference = fields["reference"]
 
         if model:
             model = model.replace("Modelo:", "").strip()
@@ -151,13 +162,9 @@ class Parser:
 
         """ Additional Details """
         additional_details = {}
-        info_blocks = sel.xpath(ADDITIONAL_DETAILS_XPATH)
-
-        for block in info_blocks:
-            key = block.xpath('.//dt[@class="titleInfoProduct"]/text()').get()
-            value = block.xpath('.//dd//div/text()').get()
-            if key and value:
-                additional_details[key.strip()] = value.strip()
+        for block in fields["additional_details"]:
+            if block["key"] and block["value"]:
+                additional_details[block["key"].strip()] = block["value"].strip()
 
 
         """ ITEM YEILD """
@@ -185,6 +192,7 @@ class Parser:
 
 
     def close(self):
+        self.extractor.log_timings()
         self.client.close()
         logging.info("MongoDB connection closed")
         
@@ -1,4 +1,5 @@
 import logging
+import argparse
 from urllib.parse import urljoin
 from parsel import Selector
 from curl_cffi import requests
@@ -8,23 +9,34 @@ from settings import (
     HEADERS,
     MONGO_DB,
     MONGO_COLLECTION_CATEGORY,
+    HTTP_CACHE_PATH,
+    HTTP_CACHE_MAX_MB,
+    HTTP_CACHE_RULES,
 )
+from httpcache import HttpCache
+import settings
 
 
 class Crawler:
     """Crawls category URLs from Office Depot homepage"""
 
-    def __init__(self):
+    def __init__(self, use_cache=None):
         self.client = MongoClient("mongodb://localhost:27017/")
         self.mongo = self.client[MONGO_DB]
+        if use_cache is None:
+            use_cache = settings.HTTP_CACHE   # read per instance, so a runner can switch it off after import
+        self.cache = HttpCache(HTTP_CACHE_PATH, HTTP_CACHE_RULES, HTTP_CACHE_MAX_MB, enabled=use_cache)
         logging.info("MongoDB connected")
 
     def start(self):
-        response = requests.get(
+        response = self.cache.get(
+            lambda: requests.get(
+                BASE_URL,
+                headers=HEADERS,
+                impersonate="chrome124",
+                timeout=30,
+            ),
             BASE_URL,
-            headers=HEADERS,
-            impersonate="chrome124",
-            timeout=30,
         )
 
         if response.status_code != 200:
@@ -60,6 +72,7 @@ class Crawler:
             logging.info(f"Saved category: {name}")
 
     def stop(self):
+        self.cache.close()
         self.client.close()
         logging.info("MongoDB closed")
 
@@ -69,6 +82,10 @@ if __name__ == "__main__":
         level=logging.INFO,
         format="%(asctime)s - %(levelname)s - %(message)s"
     )
-    crawler = Crawler()
+    arg_parser = argparse.ArgumentParser(description="Office Depot category crawler")
+    arg_parser.add_argument("--no-cache", action="store_true", help="fetch the homepage, ignoring the HTTP cache")
+    args = arg_parser.parse_args()
+
+    crawler = Crawler(use_cache=False if args.no_cache else None)
     crawler.start()
     crawler.stop()
@@ -0,0 +1,74 @@
+import json
+import logging
+import argparse
+import requests
+from parsel import Selector
+from urllib.parse import urljoin
+from pymongo import MongoClient
+from categorytree import CategoryTreeExplorer
+
+# =================================
+# CONFIG
+# =================================
+BASE_URL = "https://www.staplesadvantage.com"
+MONGO_URI = "mongodb://localhost:27017/"
+MONGO_DB = "staples_advantage_db"
+MONGO_COLLECTION_CATEGORY_TREE = "staples_advantage_category_tree"
+
+MAX_DEPTH = 3           # home -> main category -> subcategory -> sub-subcategory
+CONCURRENCY = 8
+
+HEADERS = {
+    "user-agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36",
+    "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+}
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s:%(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+
+
+# =================================
+# FETCH
+# =================================
+def fetch_children(node):
+    """Main categories from the homepage seoL1Links, below that the seo-component links of each page"""
+    response = requests.get(node["url"], headers=HEADERS, timeout=30)
+    response.raise_for_status()
+    sel = Selector(response.text)
+
+    if node["depth"] == 0:
+        script_text = sel.xpath("//script[@id='__NEXT_DATA__']/text()").get()
+        data = json.loads(script_text) if script_text else {}
+        links = data.get("props", {}).get("initialStateOrStore", {}).get("headerState", {}).get("sparq-index", {}).get("seoL1Links", [])
+        return [
+            {"url": urljoin(BASE_URL, link["destinationURL"]), "name": link.get("ariaLabel", "")}
+            for link in links if link.get("destinationURL")
+        ]
+
+    return [
+        {"url": urljoin(BASE_URL, a.xpath("@href").get()), "name": a.xpath("normalize-space(.)").get()}
+        for a in sel.xpath("//a[@class='seo-component__seoLink']")
+        if a.xpath("@href").get()
+    ]
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Crawl the Staples Advantage category tree")
+    arg_parser.add_argument("start", nargs="?", default=BASE_URL, help="homepage, or one main category url")
+    arg_parser.add_argument("--max-depth", type=int, default=MAX_DEPTH)
+    arg_parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    arg_parser.add_argument("--refresh", action="store_true", help="only re-walk subtrees whose children changed")
+    args = arg_parser.parse_args()
+
+    client = MongoClient(MONGO_URI)
+    root = {"url": args.start, "name": "home"}
+    fetch = fetch_children
+    if args.start.rstrip("/") != BASE_URL:
+        """ A main category url starts one level down, at the seo-component links """
+        fetch = lambda node: fetch_children({**node, "depth": node["depth"] + 1})
+
+    explorer = CategoryTreeExplorer(
+        client[MONGO_DB][MONGO_COLLECTION_CATEGORY_TREE], fetch,
+        max_depth=args.max_depth, concurrency=args.concurrency, refresh=args.refresh,
+    )
+    explorer.start([root])
+    client.close()
@@ -1,9 +1,11 @@
 import csv
+import json
 import logging
+import argparse
 from pymongo import MongoClient
 from settings import (
-    MONGO_URI, MONGO_DB, MONGO_COLLECTION_DATA,
-    FILE_NAME, FILE_HEADERS
+    MONGO_URI, MONGO_DB, MONGO_COLLECTION_DATA, MONGO_COLLECTION_DELTA,
+    FILE_NAME, FILE_HEADERS, iteration
 )
 
 
@@ -112,8 +114,52 @@ class JabraExporter:
         logging.info("Exporter finished & MongoDB closed")
 
 
+class JabraDeltaExporter:
+    """Export only the fields that changed in this iteration, one row per field"""
+
+    DELTA_HEADERS = ["sku", "change_type", "field", "old_value", "new_value", "iteration"]
+
+    def __init__(self, writer):
+        self.mongo = MongoClient(MONGO_URI)
+        self.db = self.mongo[MONGO_DB]
+        self.collection = self.db[MONGO_COLLECTION_DELTA]
+        self.writer = writer
+
+    def start(self):
+        self.writer.writerow(self.DELTA_HEADERS)
+
+        count = 0
+        for delta in self.collection.find({"iteration": iteration}, no_cursor_timeout=True):
+            for field, change in delta.get("fields", {}).items():
+                self.writer.writerow([
+                    delta["key"],
+                    delta.get("change_type", ""),
+                    field,
+                    self.to_text(change.get("old")),
+                    self.to_text(change.get("new")),
+                    delta.get("iteration", ""),
+                ])
+            count += 1
+
+        logging.info(f"Delta export completed. Products with changes: {count}")
+
+    def to_text(self, value):
+        if value is None:
+            return ""
+        if isinstance(value, (list, dict)):
+            return json.dumps(value, ensure_ascii=False)
+        return str(value)
+
+    def stop(self):
+        self.mongo.close()
+
+
 if __name__ == "__main__":
-    output_file = f"{FILE_NAME}.csv"
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--delta", action="store_true", help="export only changed fields of this iteration")
+    args = arg_parser.parse_args()
+
+    output_file = f"{FILE_NAME}_{iteration}_delta.csv" if args.delta else f"{FILE_NAME}.csv"
 
     with open(output_file, "w", encoding="utf-8", newline="") as f:
         writer = csv.writer(
@@ -123,7 +169,7 @@ if __name__ == "__main__":
             quoting=csv.QUOTE_MINIMAL
         )
 
-        exporter = JabraExporter(writer)
+        exporter = JabraDeltaExporter(writer) if args.delta else JabraExporter(writer)
         exporter.start()
         exporter.stop()
 
@@ -6,8 +6,10 @@ from settings import (
     PARSER_HEADERS, PARSER_TIMEOUT,
     MONGO_URI, MONGO_DB, MONGO_COLLECTION_PRODUCT_URLS,
     MONGO_COLLECTION_PRODUCT_DETAILS, MONGO_COLLECTION_GROUP_IDS,
-    MONGO_COLLECTION_DOCUMENTS, MONGO_COLLECTION_DATA
+    MONGO_COLLECTION_DOCUMENTS, MONGO_COLLECTION_DATA,
+    MONGO_COLLECTION_FINGERPRINT, MONGO_COLLECTION_DELTA, iteration
 )
+from fingerprint import ChangeTracker
 
 
 class JabraProductParser:
@@ -23,6 +25,12 @@ class JabraProductParser:
         self.group_ids_col = self.db[MONGO_COLLECTION_GROUP_IDS]
         self.documents_col = self.db[MONGO_COLLECTION_DOCUMENTS]
         self.collection = self.db[MONGO_COLLECTION_DATA]
+        self.changes = ChangeTracker(
+            self.db[MONGO_COLLECTION_FINGERPRINT],
+            self.db[MONGO_COLLECTION_DELTA],
+            key_field="sku",
+            iteration=iteration,
+        )
 
         self.headers = PARSER_HEADERS
         
@@ -58,18 +66,28 @@ class JabraProductParser:
                 selector = Selector(text=response.text)
                 item = self.parse_item(selector, product)
 
-                if item:
-                    try:
-                        self.collection.insert_one(item)
-                        logging.info(f"Saved → {sku}")
-                    except Exception as e:
-                        logging.error(f"Failed to save {sku}: {e}")
-                else:
+                if not item:
                     logging.warning(f"No data parsed → {sku}")
+                    continue
+
+                # Skip the write when nothing changed since the last run
+                change = self.changes.check(item)
+                if change is None:
+                    logging.info(f"Unchanged → {sku}")
+                    continue
+
+                try:
+                    self.collection.update_one({"sku": sku}, {"$set": item}, upsert=True)
+                    self.changes.commit(change)
+                    logging.info(f"Saved → {sku}")
+                except Exception as e:
+                    logging.error(f"Failed to save {sku}: {e}")
 
             except requests.RequestException as e:
                 logging.error(f"Request failed for {sku}: {e}")
 
+        self.changes.log_stats()
+
     def parse_item(self, selector, product):
         """Parse product page and combine with database data"""
         
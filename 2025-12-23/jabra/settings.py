@@ -22,6 +22,7 @@ BASE_URL = "https://www.jabra.com/"
 # DATE INFORMATION
 # ==========================
 # datetime_obj = datetime.now(pytz.timezone("Asia/Kolkata"))
+iteration = datetime.now().strftime("%Y_%m_%d")
 
 # iteration = datetime_obj.strftime("%Y_%m_%d")
 # YEAR = datetime_obj.strftime("%Y")
@@ -44,6 +45,8 @@ MONGO_COLLECTION_PRODUCT_DETAILS = f"{PROJECT_NAME}_product_details"
 MONGO_COLLECTION_PRODUCT_URLS = f"{PROJECT_NAME}_product_urls"
 MONGO_COLLECTION_DOCUMENTS = f"{PROJECT_NAME}_documents"
 MONGO_COLLECTION_DATA = f"{PROJECT_NAME}_product_data"
+MONGO_COLLECTION_FINGERPRINT = f"{PROJECT_NAME}_fingerprint"
+MONGO_COLLECTION_DELTA = f"{PROJECT_NAME}_delta"
 
 # ==========================
 # API ENDPOINTS
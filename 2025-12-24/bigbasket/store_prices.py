@@ -0,0 +1,94 @@
+import sys
+import time
+import random
+import logging
+from urllib.parse import urljoin
+from curl_cffi import requests
+from storematrix import StoreMatrix
+
+# =====================================================
+# CONFIG
+# =====================================================
+BASE_URL = "https://www.bigbasket.com"
+LISTING_API = f"{BASE_URL}/listing-svc/v2/products"
+
+CATEGORIES = {
+    "tea": {"type": "pc", "slug": "tea"},
+    "coffee": {"type": "pc", "slug": "coffee"},
+}
+
+# Delivery pin codes priced per run, pass others on the command line
+PIN_CODES = ["400054"]
+CONCURRENCY = 4
+
+BASE_HEADERS = {
+    "accept": "application/json, text/plain, */*",
+    "accept-language": "en-US,en;q=0.9",
+    "x-channel": "BB-WEB",
+    "x-entry-context": "bbnow",
+    "x-entry-context-id": "10",
+    "user-agent": "Mozilla/5.0 (X11; Linux x86_64) Chrome/142.0.0.0 Safari/537.36",
+    "referer": BASE_URL,
+}
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s:%(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+
+
+# =====================================================
+# -------------------- PER PIN CODE -------------------
+# =====================================================
+def fetch_store(store):
+    """Listing pages with _bb_pin_code set to this store's pin code, own session per pin code"""
+    cookies = {"_bb_locSrc": "default", "_bb_pin_code": store["store_id"], "x-channel": "web"}
+    session = requests.Session(impersonate="chrome120")
+    try:
+        session.get(BASE_URL, headers=BASE_HEADERS, cookies=cookies, timeout=30)
+
+        for category in CATEGORIES.values():
+            page = 1
+            total_pages = 1
+            while page <= total_pages:
+                r = session.get(
+                    LISTING_API,
+                    params={"type": category["type"], "slug": category["slug"], "page": page},
+                    headers=BASE_HEADERS,
+                    cookies=cookies,
+                    timeout=30,
+                )
+                if r.status_code != 200:
+                    raise Exception(f"BLOCKED | Pin {store['store_id']} | Page {page} | Status {r.status_code}")
+
+                info = r.json()["tabs"][0]["product_info"]
+                total_pages = info.get("number_of_pages", 1)
+
+                for p in info.get("products", []):
+                    if p.get("id"):
+                        yield split(p)
+
+                page += 1
+                time.sleep(random.uniform(0.5, 1.0))
+    finally:
+        session.close()
+
+
+def split(p):
+    """(store-invariant product, per-pin-code price) from one listing product"""
+    pricing = p.get("pricing", {}).get("discount", {})
+    return {
+        "product_id": p.get("id"),
+        "name": p.get("desc"),
+        "brand": (p.get("brand") or {}).get("name"),
+        "weight": p.get("w"),
+        "unit": p.get("unit"),
+        "usp": p.get("usp"),
+        "product_url": urljoin(BASE_URL, p.get("absolute_url", "")),
+    }, {
+        "selling_price": pricing.get("prim_price", {}).get("sp"),
+        "regular_price": pricing.get("mrp"),
+        "in_stock": (p.get("availability") or {}).get("avail_status", "001") == "001",
+    }
+
+
+if __name__ == "__main__":
+    stores = [{"store_id": pin} for pin in (sys.argv[1:] or PIN_CODES)]
+    StoreMatrix("bigbasket", stores, fetch_store, CONCURRENCY, currency="INR").start()
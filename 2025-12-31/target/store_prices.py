@@ -0,0 +1,129 @@
+from curl_cffi import requests
+import re
+import time
+import random
+import logging
+from storematrix import StoreMatrix
+
+# ======================
+# CONFIG
+# ======================
+API_URL = "https://redsky.target.com/redsky_aggregations/v1/web/plp_search_v2"
+
+CATEGORY_ID = "5xsy9"
+CATEGORY_PAGE = "/c/snacks-grocery/-/N-5xsy9"
+
+PAGE_SIZE = 24
+SLEEP_RANGE = (1.1, 2.2)
+VISITOR_ID = "019B729332920201AC1F61A30AC14C1E"
+
+# Stores the workflow's store_ids covered, each priced on its own
+STORES = [
+    {"store_id": "1771", "zip": "52404"},
+    {"store_id": "1768", "zip": "52404"},
+    {"store_id": "1113", "zip": "52404"},
+    {"store_id": "3374", "zip": "52404"},
+    {"store_id": "1792", "zip": "52404"},
+]
+CONCURRENCY = 3
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s:%(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+
+# ======================
+# HEADERS
+# ======================
+HEADERS = {
+    "accept": "application/json",
+    "accept-language": "en-US,en;q=0.9",
+    "origin": "https://www.target.com",
+    "referer": f"https://www.target.com{CATEGORY_PAGE}",
+    "user-agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/142.0.0.0 Safari/537.36"
+    ),
+}
+
+BASE_PARAMS = {
+    "key": "9f36aeafbe60771e321a7cc95a78140772ab3e96",
+    "category": CATEGORY_ID,
+    "count": PAGE_SIZE,
+    "platform": "desktop",
+    "visitor_id": VISITOR_ID,
+    "channel": "WEB",
+    "default_purchasability_filter": "true",
+    "include_sponsored": "false",
+    "page": CATEGORY_PAGE,
+}
+
+
+# ======================
+# PER STORE WALK
+# ======================
+def fetch_store(store):
+    """Same offset pagination as the workflow, priced at one store"""
+    session = requests.Session(impersonate="chrome120")
+    try:
+        params = {
+            **BASE_PARAMS,
+            "pricing_store_id": store["store_id"],
+            "store_ids": store["store_id"],
+            "scheduled_delivery_store_id": store["store_id"],
+            "zip": store["zip"],
+        }
+        offset = 0
+        while True:
+            resp = session.get(API_URL, params={**params, "offset": offset}, headers=HEADERS, timeout=60)
+
+            """Soft block handling"""
+            if resp.status_code in (403, 429):
+                time.sleep(random.uniform(10, 20))
+                continue
+            if resp.status_code != 200:
+                logging.error(f"Store {store['store_id']}: HTTP {resp.status_code} at offset {offset}")
+                break
+
+            products = resp.json().get("data", {}).get("search", {}).get("products", [])
+            if not products:
+                break
+
+            for p in products:
+                if p.get("tcin"):
+                    yield split(p)
+
+            offset += PAGE_SIZE
+            time.sleep(random.uniform(*SLEEP_RANGE))
+    finally:
+        session.close()
+
+
+def split(p):
+    """(store-invariant product, per-store price) from one PLP product"""
+    enrichment = p.get("enrichment", {})
+    description = p.get("product_description", {})
+    price = p.get("price", {})
+
+    images = []
+    primary_img = enrichment.get("image_info", {}).get("primary_image_url")
+    if primary_img:
+        images.append(primary_img)
+    images.extend(enrichment.get("images", {}).get("alternate_image_urls", []))
+
+    product = {
+        "product_id": p["tcin"],
+        "title": description.get("title"),
+        "brand": p.get("primary_brand", {}).get("name"),
+        "buy_url": enrichment.get("buy_url"),
+        "images": images,
+        "description": [re.sub(r"<[^>]+>", "", d).strip() for d in description.get("bullet_descriptions", []) if d],
+    }
+    store_price = {
+        "selling_price": price.get("current_retail") or price.get("formatted_current_price"),
+        "regular_price": price.get("reg_retail") or "",
+        "in_stock": not p.get("fulfillment", {}).get("is_out_of_stock_in_all_store_locations", False),
+    }
+    return product, store_price
+
+
+if __name__ == "__main__":
+    StoreMatrix("target", STORES, fetch_store, CONCURRENCY, currency="USD").start()
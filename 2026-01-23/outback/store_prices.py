@@ -0,0 +1,69 @@
+import sys
+import json
+import logging
+import requests
+from parsel import Selector
+from storematrix import StoreMatrix
+
+BASE_URL = "https://www.outback.com"
+
+# Restaurant slugs from /menu/<slug>, pass others on the command line
+LOCATIONS = ["maumee"]
+CONCURRENCY = 4
+
+HEADERS = {
+    "user-agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/142.0.0.0 Safari/537.36"
+    ),
+    "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+}
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s:%(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+
+
+# -------- per location ----------------
+def fetch_store(store):
+    """One menu page per location carries every category; menu items are the same chain-wide,
+    product ids are per restaurant, so items are keyed on chainproductid"""
+    location = store["store_id"]
+    resp = requests.get(f"{BASE_URL}/menu/{location}/category/0", headers=HEADERS, timeout=30)
+    resp.raise_for_status()
+
+    next_data_text = Selector(text=resp.text).xpath('//script[@id="__NEXT_DATA__"]/text()').get()
+    if not next_data_text:
+        raise ValueError(f"__NEXT_DATA__ not found for {location}")
+
+    categories = (
+        json.loads(next_data_text)
+        .get("props", {})
+        .get("pageProps", {})
+        .get("params", {})
+        .get("restaurantMenu", {})
+        .get("categories", [])
+    )
+
+    for category in categories:
+        for product in category.get("products", []):
+            product_key = product.get("chainproductid") or product.get("name")
+            if not product_key:
+                continue
+            yield {
+                "product_id": product_key,
+                "category_name": category.get("name"),
+                "product_name": product.get("name"),
+                "description": product.get("description"),
+                "image_url": (f"https://media.outback.com/{product.get('imagefilename')}"
+                              if product.get("imagefilename") else None),
+                "calories": product.get("basecalories"),
+            }, {
+                "selling_price": product.get("cost"),
+                "regular_price": product.get("cost"),
+                "in_stock": not product.get("unavailablehandoffmodes"),
+            }
+
+
+if __name__ == "__main__":
+    stores = [{"store_id": location} for location in (sys.argv[1:] or LOCATIONS)]
+    StoreMatrix("outback", stores, fetch_store, CONCURRENCY, currency="USD").start()
@@ -0,0 +1,94 @@
+import os
+import csv
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+PRICE_FIELDS = ["store_id", "product_id", "selling_price", "regular_price", "in_stock", "currency", "extraction_date"]
+
+
+class StoreMatrix:
+    """Runs one retailer's listing walk for every store in a store list and splits the result
+
+    `fetch_store(store)` yields `(product, price)` pairs for one store. `product`
+    holds the store-invariant fields (name, brand, images, ...) and is written
+    once per product_id however many stores list it; `price` holds what changes
+    per store (selling/regular price, stock) and becomes one compact row of the
+    store price file, written once per (store_id, product_id) even when the walk
+    meets the product under several categories. Stores run concurrently,
+    `concurrency` at a time.
+
+        products:  <output_dir>/<name>_products.jsonl
+        prices:    <output_dir>/<name>_store_prices.csv
+    """
+
+    def __init__(self, name, stores, fetch_store, concurrency=4, output_dir="store_matrix", currency=""):
+        self.name = name
+        self.stores = stores
+        self.fetch_store = fetch_store
+        self.concurrency = concurrency
+        self.currency = currency
+        self.extraction_date = datetime.now().strftime("%Y-%m-%d")
+        self.seen = set()
+        self.priced = set()
+        self.lock = threading.Lock()
+        self.stats = {}
+
+        os.makedirs(output_dir, exist_ok=True)
+        self.products_path = os.path.join(output_dir, f"{name}_products.jsonl")
+        self.prices_path = os.path.join(output_dir, f"{name}_store_prices.csv")
+
+    def start(self):
+        started = time.perf_counter()
+        with open(self.products_path, "w", encoding="utf-8") as products_file, \
+                open(self.prices_path, "w", newline="", encoding="utf-8") as prices_file:
+            self.products_file = products_file
+            self.prices = csv.DictWriter(prices_file, fieldnames=PRICE_FIELDS, extrasaction="ignore")
+            self.prices.writeheader()
+
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                futures = {executor.submit(self.run_store, store): store for store in self.stores}
+                for future in as_completed(futures):
+                    store_id = futures[future]["store_id"]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logging.error(f"Store {store_id} failed: {e}")
+                        self.stats.setdefault(store_id, {"rows": 0})["error"] = str(e)
+
+        elapsed = time.perf_counter() - started
+        rows = sum(s["rows"] for s in self.stats.values())
+        logging.info(
+            f"{self.name}: {len(self.stores)} stores, {len(self.seen)} products, {rows} store price rows "
+            f"in {elapsed:.1f}s -> {self.products_path}, {self.prices_path}"
+        )
+        return self.stats
+
+    def run_store(self, store):
+        store_id = store["store_id"]
+        self.stats[store_id] = {"rows": 0}
+        for product, price in self.fetch_store(store):
+            self.add(store_id, product, price)
+        logging.info(f"Store {store_id}: {self.stats[store_id]['rows']} price rows")
+
+    def add(self, store_id, product, price):
+        product_id = str(product["product_id"])
+        row = {
+            "currency": self.currency,
+            **price,
+            "store_id": store_id,
+            "product_id": product_id,
+            "extraction_date": self.extraction_date,
+        }
+        with self.lock:
+            if product_id not in self.seen:
+                self.seen.add(product_id)
+                self.products_file.write(json.dumps(product, ensure_ascii=False, default=str) + "\n")
+            if (store_id, product_id) in self.priced:
+                return
+            self.priced.add((store_id, product_id))
+            self.prices.writerow(row)
+            self.stats[store_id]["rows"] += 1
@@ -0,0 +1,313 @@
+import os
+import re
+import json
+import math
+import time
+import logging
+import argparse
+from datetime import datetime
+from urllib.parse import urljoin
+from curl_cffi import requests
+from parsel import Selector
+from settings import (
+    RESULT_DIR, SITES, SAMPLE_CATEGORIES, SAMPLE_PAGES, SAMPLE_PDPS, SAMPLE_DELAY, REQUEST_TIMEOUT,
+    CONCURRENCY, BLOCK_STATUSES, BLOCK_MARKERS, DEFAULT_HEADERS,
+)
+
+
+def pluck(data, path):
+    """Values at a dotted path; `key[]` flattens a list, numeric parts index into lists"""
+    values = [data]
+    for part in path.split("."):
+        flatten = part.endswith("[]")
+        key = part[:-2] if flatten else part
+        found = []
+        for value in values:
+            if isinstance(value, list) and key.isdigit():
+                value = value[int(key)] if int(key) < len(value) else None
+            elif isinstance(value, dict):
+                value = value.get(key)
+            else:
+                value = None
+            if value is None:
+                continue
+            if flatten and isinstance(value, list):
+                found.extend(value)
+            else:
+                found.append(value)
+        values = found
+    return values
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def spread(items, count):
+    """`count` items evenly spaced over the list, so samples are not all from its head"""
+    if len(items) <= count:
+        return list(items)
+    step = len(items) / count
+    return [items[int(i * step)] for i in range(count)]
+
+
+def is_xpath(expression):
+    return expression.startswith(("/", "("))
+
+
+class FeasibilityProfiler:
+    """Samples a few categories and PDPs of one site and sizes the full run from them
+
+    Every sample request records latency, status, bytes and whether it looks
+    blocked. Pagination totals (or, without one, the pages actually seen) give
+    products per category, which times the category count gives the catalogue.
+    Request count, bytes and wall time at each concurrency follow from that and
+    the measured latency, with blocked requests counted as retries.
+    """
+
+    def __init__(self, site):
+        if site not in SITES:
+            raise ValueError(f"Unknown site {site}, choose from {sorted(SITES)}")
+        self.site = site
+        self.spec = SITES[site]
+        self.base = self.spec["base"]
+        self.session = requests.Session(impersonate=self.spec.get("impersonate"))
+        self.samples = []
+        self.categories = []
+        self.category_results = []
+        self.pdp_urls = []
+
+    def fetch(self, url, kind):
+        """GET and record one sample; returns the response, None when it failed or was blocked"""
+        time.sleep(SAMPLE_DELAY)
+        sample = {"kind": kind, "url": url, "status": 0, "seconds": 0.0, "bytes": 0, "blocked": False, "error": ""}
+        started = time.perf_counter()
+        try:
+            response = self.session.get(
+                url, headers=self.spec.get("headers", DEFAULT_HEADERS), cookies=self.spec.get("cookies"),
+                timeout=REQUEST_TIMEOUT,
+            )
+        except Exception as e:
+            sample["seconds"] = time.perf_counter() - started
+            sample["error"] = str(e)
+            self.samples.append(sample)
+            logging.warning(f"[{self.site}] {kind} {url} failed: {e}")
+            return None
+
+        sample["seconds"] = time.perf_counter() - started
+        sample["status"] = response.status_code
+        sample["bytes"] = len(response.content)
+        head = response.text[:20000].lower()
+        sample["blocked"] = response.status_code in BLOCK_STATUSES or any(m in head for m in BLOCK_MARKERS)
+        self.samples.append(sample)
+        logging.info(f"[{self.site}] {kind} {response.status_code} {sample['seconds']:.2f}s "
+                     f"{sample['bytes'] / 1024:.0f}KB {url}")
+
+        if sample["blocked"] or response.status_code != 200:
+            return None
+        return response
+
+    def document(self, response, next_data=False):
+        """JSON body, __NEXT_DATA__ JSON, or a Selector for HTML pages"""
+        if next_data:
+            script = Selector(text=response.text).xpath('//script[@id="__NEXT_DATA__"]/text()').get()
+            return json.loads(script) if script else {}
+        try:
+            return response.json()
+        except ValueError:
+            return Selector(text=response.text)
+
+    def select(self, document, expression):
+        if is_xpath(expression):
+            return document.xpath(expression).getall() if isinstance(document, Selector) else []
+        return [] if isinstance(document, Selector) else pluck(document, expression)
+
+    def absolute(self, value):
+        value = str(value).strip()
+        return urljoin(self.base, value).rstrip("/") if value.startswith(("/", "http")) else value
+
+    def load_categories(self):
+        source = self.spec["categories"]
+        if "list" in source:
+            self.categories = list(source["list"])
+        else:
+            response = self.fetch(source["url"], "category")
+            if response is not None:
+                document = self.document(response)
+                values = self.select(document, source.get("json") or source.get("xpath"))
+                self.categories = list(dict.fromkeys(self.absolute(v) for v in values if v))
+        logging.info(f"[{self.site}] {len(self.categories)} categories")
+
+    def sample_category(self, category):
+        listing = self.spec["listing"]
+        first_page = listing.get("first_page", 0)
+        max_pages = listing.get("pages", SAMPLE_PAGES)
+        result = {"category": category, "total": None, "pages_seen": 0, "products_seen": 0, "page_size": listing.get("page_size")}
+
+        for i in range(max_pages):
+            url = listing["url"].format(category=category, page=first_page + i, offset=i * (listing.get("page_size") or 0))
+            response = self.fetch(url, "listing")
+            if response is None:
+                break
+            document = self.document(response, listing.get("next_data", False))
+            products = self.select(document, listing["products"])
+            if not products:
+                break
+
+            result["pages_seen"] += 1
+            result["products_seen"] += len(products)
+            result["page_size"] = result["page_size"] or len(products)
+            self.collect_pdps(products)
+
+            if i == 0 and listing.get("total"):
+                total = self.select(document, listing["total"])
+                digits = re.sub(r"\D", "", str(total[0])) if total else ""
+                result["total"] = int(digits) if digits else None
+            if len(products) < result["page_size"]:
+                break
+
+        """ Without a total the pages seen are a lower bound once the last one was full """
+        result["full_last_page"] = result["pages_seen"] == max_pages and max_pages > 1
+        if result["total"] is not None:
+            result["products"] = result["total"]
+            result["pages"] = math.ceil(result["total"] / result["page_size"]) if result["page_size"] else 1
+        else:
+            result["products"] = result["products_seen"]
+            result["pages"] = result["pages_seen"]
+        self.category_results.append(result)
+
+    def collect_pdps(self, products):
+        pdp = self.spec.get("pdp")
+        if not pdp:
+            return
+        for product in products:
+            try:
+                url = product if pdp is True else pdp.format_map(product)
+            except (KeyError, AttributeError, ValueError, IndexError):
+                continue
+            self.pdp_urls.append(urljoin(self.base, str(url).split("#")[0]))
+
+    def start(self):
+        if self.spec.get("warmup"):
+            """ Same homepage GET the project makes first, so the samples carry its cookies """
+            self.fetch(self.spec["warmup"], "warmup")
+        self.load_categories()
+        for category in spread(self.categories, SAMPLE_CATEGORIES):
+            self.sample_category(category)
+        for url in spread(list(dict.fromkeys(self.pdp_urls)), SAMPLE_PDPS):
+            self.fetch(url, "pdp")
+        self.session.close()
+
+    def stats(self, kind):
+        samples = [s for s in self.samples if s["kind"] == kind]
+        ok = [s for s in samples if s["status"] == 200 and not s["blocked"]]
+        latencies = [s["seconds"] for s in samples]
+        return {
+            "requests": len(samples),
+            "ok": len(ok),
+            "blocked": sum(s["blocked"] for s in samples),
+            "errors": sum(1 for s in samples if s["error"] or (s["status"] and s["status"] != 200 and not s["blocked"])),
+            "latency_mean": sum(latencies) / len(latencies) if latencies else 0.0,
+            "latency_p95": percentile(latencies, 95),
+            "bytes_mean": sum(s["bytes"] for s in ok) / len(ok) if ok else 0.0,
+        }
+
+    def estimate(self, concurrency_levels):
+        """Full-run request count, bytes and wall time extrapolated from the samples"""
+        sampled = [r for r in self.category_results if r["pages_seen"]]
+        categories = max(len(self.categories), 1)
+        products_per_category = sum(r["products"] for r in sampled) / len(sampled) if sampled else 0
+        pages_per_category = sum(r["pages"] for r in sampled) / len(sampled) if sampled else 0
+
+        products = round(products_per_category * categories)
+        listing_requests = round(pages_per_category * categories)
+        pdp_requests = products if self.spec.get("pdp") else 0
+        warmup_requests = 1 if self.spec.get("warmup") else 0
+        category_requests = 0 if "list" in self.spec["categories"] else 1
+        requests_total = warmup_requests + category_requests + listing_requests + pdp_requests
+
+        blocked = sum(s["blocked"] for s in self.samples)
+        block_rate = blocked / len(self.samples) if self.samples else 0.0
+        attempts = requests_total / (1 - min(block_rate, 0.95))
+
+        listing, pdp = self.stats("listing"), self.stats("pdp")
+        pdp_unmeasured = bool(pdp_requests) and not pdp["ok"]
+        if pdp_unmeasured:
+            """ No PDP sampled: cost them like listing pages rather than as free """
+            pdp = {**pdp, **{k: listing[k] for k in ("latency_mean", "latency_p95", "bytes_mean")}}
+        weights = [(listing_requests, listing), (pdp_requests, pdp)]
+        weight = sum(n for n, _ in weights) or 1
+        latency_mean = sum(n * s["latency_mean"] for n, s in weights) / weight
+        latency_p95 = sum(n * s["latency_p95"] for n, s in weights) / weight
+        total_bytes = sum(n * s["bytes_mean"] for n, s in weights)
+
+        return {
+            "categories": len(self.categories),
+            "sampled_categories": len(sampled),
+            "products": products,
+            "products_lower_bound": any(r["total"] is None and r["full_last_page"] for r in sampled),
+            "requests": {"warmup": warmup_requests, "category": category_requests, "listing": listing_requests, "pdp": pdp_requests,
+                         "total": requests_total, "with_retries": round(attempts)},
+            "pdp_unmeasured": pdp_unmeasured,
+            "block_rate": block_rate,
+            "bytes_total_mb": total_bytes / 1048576,
+            "wall_time": {
+                str(c): {"expected_hours": attempts * latency_mean / c / 3600,
+                         "p95_hours": attempts * latency_p95 / c / 3600}
+                for c in concurrency_levels
+            },
+        }
+
+    def report(self, concurrency_levels):
+        estimate = self.estimate(concurrency_levels)
+        result = {
+            "site": self.site,
+            "project": self.spec.get("project"),
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "stats": {kind: self.stats(kind) for kind in ("warmup", "category", "listing", "pdp")},
+            "category_samples": self.category_results,
+            "estimate": estimate,
+            "samples": self.samples,
+        }
+
+        lines = [f"\n{self.site} ({self.spec.get('project')})"]
+        for kind, s in result["stats"].items():
+            if s["requests"]:
+                lines.append(
+                    f"  {kind:<9} {s['ok']}/{s['requests']} ok, {s['blocked']} blocked, "
+                    f"latency {s['latency_mean']:.2f}s (p95 {s['latency_p95']:.2f}s), {s['bytes_mean'] / 1024:.0f}KB/page"
+                )
+        bound = " (lower bound, no pagination total)" if estimate["products_lower_bound"] else ""
+        lines.append(f"  catalogue  ~{estimate['products']} products in {estimate['categories']} categories{bound}")
+        lines.append(
+            f"  requests   {estimate['requests']['total']} ({estimate['requests']['listing']} listing, "
+            f"{estimate['requests']['pdp']} pdp), {estimate['requests']['with_retries']} with retries at "
+            f"{estimate['block_rate'] * 100:.1f}% blocked, ~{estimate['bytes_total_mb']:.0f}MB"
+        )
+        if estimate["pdp_unmeasured"]:
+            lines.append("  pdp        unmeasured, latency and size taken from the listing pages")
+        for c, wall in estimate["wall_time"].items():
+            lines.append(f"  wall time  concurrency {c}: {wall['expected_hours']:.2f}h (p95 {wall['p95_hours']:.2f}h)")
+        print("\n".join(lines))
+
+        os.makedirs(RESULT_DIR, exist_ok=True)
+        path = os.path.join(RESULT_DIR, f"{self.site}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        logging.info(f"Report written to {path}")
+        return result
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Sample sites and estimate full-run size, time and block rate")
+    arg_parser.add_argument("sites", nargs="*", help=f"all by default, from {sorted(SITES)}")
+    arg_parser.add_argument("--concurrency", nargs="*", type=int, default=CONCURRENCY)
+    args = arg_parser.parse_args()
+
+    for site in args.sites or sorted(SITES):
+        profiler = FeasibilityProfiler(site)
+        profiler.start()
+        profiler.report(args.concurrency)
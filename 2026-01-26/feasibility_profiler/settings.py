@@ -0,0 +1,196 @@
+import os
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s:%(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+"""PATHS"""
+PROFILER_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULT_DIR = os.path.join(PROFILER_DIR, "results")
+
+"""SAMPLING"""
+SAMPLE_CATEGORIES = 3       # categories walked per site, spread over the category list
+SAMPLE_PAGES = 2            # listing pages walked per sampled category
+SAMPLE_PDPS = 5             # product pages fetched per site
+SAMPLE_DELAY = 0.5          # seconds between sample requests
+REQUEST_TIMEOUT = 30
+CONCURRENCY = [4, 16]       # estimate the full run at each of these concurrencies
+
+"""BLOCK DETECTION"""
+BLOCK_STATUSES = {401, 403, 429, 503}
+BLOCK_MARKERS = ["captcha", "access denied", "cf-chl", "px-captcha", "are you a robot", "request unsuccessful"]
+
+DEFAULT_HEADERS = {
+    "user-agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36",
+    "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "accept-language": "en-US,en;q=0.9",
+}
+JSON_HEADERS = {**DEFAULT_HEADERS, "accept": "application/json, text/plain, */*"}
+
+"""SITES
+Taken from each project's feasibility_workflow.py / feasibility_report.py.
+
+    categories  {"list": [...]} or {"url": ..., "json" | "xpath": ...} listing every category
+    listing     url template with {category}, {page} and/or {offset}
+                page_size / first_page for the pagination, pages=1 for single-page listings
+                products   json path (a.b[].c, numeric parts index lists) or xpath to product hrefs
+                total      json path or xpath to the category's product total, if the page has one
+                next_data  parse the __NEXT_DATA__ script instead of the response body
+    pdp         url template filled from a JSON product, or True when products are hrefs;
+                omitted when the listing already carries every field
+    warmup      page fetched once before sampling, for sites that hand out session cookies there
+"""
+SITES = {
+    "aldi": {
+        "project": "2025-12-05/Aldi",
+        "base": "https://www.aldi.co.uk",
+        "headers": JSON_HEADERS,
+        "categories": {
+            "url": "https://api.aldi.co.uk/v2/product-category-tree?serviceType=walk-in&servicePoint=C092",
+            "json": "data[].children[].key",
+        },
+        "listing": {
+            "url": "https://api.aldi.co.uk/v3/product-search?currency=GBP&serviceType=walk-in&servicePoint=C092"
+                   "&limit=30&sort=relevance&categoryKey={category}&offset={offset}",
+            "page_size": 30,
+            "products": "data[]",
+            "total": "meta.pagination.totalCount",
+        },
+        "pdp": "https://api.aldi.co.uk/v2/products/{sku}?servicePoint=C092&serviceType=walk-in",
+    },
+    "aqar": {
+        "project": "2025-11-27/Aqar",
+        "base": "https://sa.aqar.fm/",
+        "categories": {"url": "https://sa.aqar.fm/", "xpath": '//div[contains(@class, "_list__")]/a/@href'},
+        "listing": {
+            "url": "{category}/{page}",
+            "first_page": 1,
+            "products": '//div[contains(@class, "_list__")]/div/a/@href',
+        },
+        "pdp": True,
+    },
+    "bigbasket": {
+        "project": "2025-12-24/bigbasket",
+        "base": "https://www.bigbasket.com",
+        "impersonate": "chrome120",
+        "warmup": "https://www.bigbasket.com",
+        "headers": {**JSON_HEADERS, "x-channel": "BB-WEB", "x-entry-context": "bbnow", "x-entry-context-id": "10"},
+        "cookies": {"_bb_locSrc": "default", "_bb_pin_code": "400054", "x-channel": "web"},
+        "categories": {"list": ["tea", "coffee"]},
+        "listing": {
+            "url": "https://www.bigbasket.com/listing-svc/v2/products?type=pc&slug={category}&page={page}",
+            "first_page": 1,
+            "products": "tabs.0.product_info.products[]",
+            "total": "tabs.0.product_info.total_count",
+        },
+        "pdp": "{absolute_url}",
+    },
+    "target": {
+        "project": "2025-12-31/target",
+        "base": "https://www.target.com",
+        "impersonate": "chrome120",
+        "headers": {**JSON_HEADERS, "origin": "https://www.target.com"},
+        "categories": {"list": ["5xsy9"]},
+        "listing": {
+            "url": "https://redsky.target.com/redsky_aggregations/v1/web/plp_search_v2"
+                   "?key=9f36aeafbe60771e321a7cc95a78140772ab3e96&category={category}&count=24&offset={offset}"
+                   "&platform=desktop&pricing_store_id=1771&store_ids=1771&zip=52404&channel=WEB"
+                   "&visitor_id=019B729332920201AC1F61A30AC14C1E&page=%2Fc%2Fsnacks-grocery%2F-%2FN-{category}",
+            "page_size": 24,
+            "products": "data.search.products[]",
+            "total": "data.search.search_response.metadata.total_results",
+        },
+    },
+    "jcpenney": {
+        "project": "2025-12-19/jcpenney",
+        "base": "https://www.jcpenney.com",
+        "headers": {**JSON_HEADERS, "origin": "https://www.jcpenney.com", "x-channel": "desktop"},
+        "categories": {"list": ["g/women/tops?id=cat100210006"]},
+        "listing": {
+            "url": "https://search-api.jcpenney.com/v1/search-service/{category}&productGridView=medium"
+                   "&responseType=organic&page={page}",
+            "first_page": 1,
+            "products": "organicZoneInfo.products[]",
+            "total": "organicZoneInfo.totalNumRecs",
+        },
+    },
+    "staples_advantage": {
+        "project": "2025-12-19/staples_advantage",
+        "base": "https://www.staplesadvantage.com",
+        "categories": {
+            "url": "https://www.staplesadvantage.com/office-supplies/cat_SC273214",
+            "xpath": "//a[@class='seo-component__seoLink']/@href",
+        },
+        "listing": {
+            "url": "{category}?pn={page}",
+            "first_page": 1,
+            "next_data": True,
+            "products": "props.initialStateOrStore.searchState.itemData[]",
+            "total": "props.initialStateOrStore.searchState.totalItemCount",
+        },
+    },
+    "staple_ca": {
+        "project": "2025-12-18/staple_ca",
+        "base": "https://staples-canada.myshopify.com",
+        "impersonate": "chrome",
+        "headers": JSON_HEADERS,
+        "categories": {"list": ["printer-copy-paper-8454"]},
+        "listing": {
+            "url": "https://staples-canada.myshopify.com/collections/{category}/products.json?limit=250&page={page}",
+            "first_page": 1,
+            "page_size": 250,
+            "products": "products[]",
+        },
+        "pdp": "/products/{handle}",
+    },
+    "outback": {
+        "project": "2026-01-23/outback",
+        "base": "https://www.outback.com",
+        "categories": {"list": ["maumee"]},
+        "listing": {
+            "url": "https://www.outback.com/menu/{category}/category/0",
+            "pages": 1,
+            "next_data": True,
+            "products": "props.pageProps.params.restaurantMenu.categories[].products[]",
+        },
+    },
+    "officedepot": {
+        "project": "2025-12-16/officedepot",
+        "base": "https://www.officedepot.com",
+        "impersonate": "chrome",
+        "categories": {"list": ["https://www.officedepot.com/b/office-supplies/N-1676"]},
+        "listing": {
+            "url": "{category}?page={page}",
+            "first_page": 1,
+            "products": '//a[@class="od-product-card-image"]/@href',
+        },
+        "pdp": True,
+    },
+    "elcorteingles": {
+        "project": "2025-12-10/elcorteingles",
+        "base": "https://www.elcorteingles.es",
+        "impersonate": "chrome",
+        "categories": {"list": ["8470001901200"]},
+        "listing": {
+            "url": "https://www.elcorteingles.es/search-nwx/{page}/?s={category}&stype=text_box",
+            "first_page": 1,
+            "products": '//li[contains(@class,"products_list-item")]//a[contains(@class,"product_preview-title")]/@href',
+        },
+        "pdp": True,
+    },
+    "fatface": {
+        "project": "2025-11-03/fatface",
+        "base": "https://www.fatface.com",
+        "categories": {"url": "https://www.fatface.com/headerstatic/seo-content", "json": "items[].items[].target"},
+        "listing": {
+            "url": "{category}?p={page}",
+            "first_page": 1,
+            "products": '//a[contains(@class,"MuiCardMedia-root")]/@href',
+            "total": '//span[@class="esi-count"]/text()',
+        },
+        "pdp": True,
+    },
+}
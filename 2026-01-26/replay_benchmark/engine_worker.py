@@ -0,0 +1,188 @@
+"""Runs one carbon38 engine over the recorded product pages served by the stand-in server.
+
+Started by engines.py, one process per engine, so the CPU time and peak RSS it
+reports (browser and driver child processes included) belong to that engine alone.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import threading
+import psutil
+
+
+class TreeSampler(threading.Thread):
+    """Samples RSS and CPU time of this process and all of its descendants"""
+
+    def __init__(self, interval):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.cpu = {}
+        self.peak_rss = 0
+
+    def sample(self):
+        root = psutil.Process()
+        rss = 0
+        for proc in [root] + root.children(recursive=True):
+            try:
+                rss += proc.memory_info().rss
+                times = proc.cpu_times()
+                self.cpu[proc.pid] = times.user + times.system
+            except psutil.Error:
+                continue
+        self.peak_rss = max(self.peak_rss, rss)
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
+        self.sample()
+
+    @property
+    def cpu_seconds(self):
+        return sum(self.cpu.values())
+
+
+def run_curl(urls, args):
+    sys.path.insert(0, os.path.join(args["carbon38_dir"], "carbon38_curl"))
+    import curl_parser
+    return [curl_parser.parse_product_page(url) for url in urls]
+
+
+def run_scrapy(urls, args):
+    sys.path.insert(0, os.path.join(args["carbon38_dir"], "carbon38_scraper"))
+    import scrapy
+    from scrapy import signals
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.settings import Settings
+    from carbon38.spiders.carbon_parser import ProductDetailsSpider
+
+    class BenchProductSpider(ProductDetailsSpider):
+        name = "bench_product_details"
+        allowed_domains = []
+
+        def start_requests(self):
+            for url in urls:
+                yield scrapy.Request(url, callback=self.parse_product, dont_filter=True)
+
+    settings = Settings()
+    settings.setmodule("carbon38.settings")
+    settings.update({
+        "ITEM_PIPELINES": {},
+        "DOWNLOAD_DELAY": 0,
+        "CONCURRENT_REQUESTS": args["concurrency"],
+        "CONCURRENT_REQUESTS_PER_DOMAIN": args["concurrency"],
+        "ROBOTSTXT_OBEY": False,
+        "TELNETCONSOLE_ENABLED": False,
+        "LOG_LEVEL": "WARNING",
+    })
+
+    items = []
+    process = CrawlerProcess(settings)
+    crawler = process.create_crawler(BenchProductSpider)
+    crawler.signals.connect(lambda item, **kwargs: items.append(dict(item)), signal=signals.item_scraped)
+    process.crawl(crawler)
+    process.start()
+    return items
+
+
+def run_selenium(urls, args):
+    sys.path.insert(0, os.path.join(args["carbon38_dir"], "carbon38_selenium"))
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.support.ui import WebDriverWait
+    import selenium_praser
+
+    """ Same parser, but headless and with every host except the stand-in unresolvable """
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument(f"--host-resolver-rules=MAP * ~NOTFOUND , EXCLUDE {args['server_host']}")
+
+    parser = selenium_praser.Carbon38Parser.__new__(selenium_praser.Carbon38Parser)
+    parser.logger = logging.getLogger("Carbon38Parser")
+    parser.driver = webdriver.Chrome(options=options)
+    parser.wait = WebDriverWait(parser.driver, 30)
+    try:
+        return [parser.parse_product_page(url) for url in urls]
+    finally:
+        parser.driver.quit()
+
+
+def run_playwright(urls, args):
+    sys.path.insert(0, os.path.join(args["carbon38_dir"], "carbon38_plawright"))
+    from playwright.async_api import async_playwright
+    import playwright_parser
+
+    local = f"http://{args['server']}/"
+
+    async def crawl():
+        semaphore = asyncio.Semaphore(args["concurrency"])
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            context = await browser.new_context()
+            await context.route(
+                "**/*",
+                lambda route: route.continue_() if route.request.url.startswith(local) else route.abort(),
+            )
+
+            async def one(url):
+                async with semaphore:
+                    page = await context.new_page()
+                    try:
+                        return await playwright_parser.extract_product_details(page, url)
+                    finally:
+                        await page.close()
+
+            results = await asyncio.gather(*(one(url) for url in urls))
+            await browser.close()
+            return results
+
+    return asyncio.run(crawl())
+
+
+ENGINES = {
+    "curl": run_curl,
+    "scrapy": run_scrapy,
+    "selenium": run_selenium,
+    "playwright": run_playwright,
+}
+
+
+def run_engine(args):
+    """Project modules write their own log files into the working directory, keep them in results"""
+    os.makedirs(args["work_dir"], exist_ok=True)
+    os.chdir(args["work_dir"])
+
+    sampler = TreeSampler(args["sample_interval"])
+    sampler.start()
+    result = {"engine": args["engine"], "error": "", "items": []}
+    started = time.perf_counter()
+    try:
+        result["items"] = [item for item in ENGINES[args["engine"]](args["urls"], args) if item]
+    except Exception as e:
+        logging.exception(f"Engine {args['engine']} failed")
+        result["error"] = repr(e)
+    result["wall_seconds"] = time.perf_counter() - started
+    sampler.stop()
+
+    result.update({
+        "pages": len(args["urls"]),
+        "products": len(result["items"]),
+        "cpu_seconds": sampler.cpu_seconds,
+        "peak_rss_mb": sampler.peak_rss / 1048576,
+    })
+    with open(args["result_path"], "w", encoding="utf-8") as f:
+        json.dump(result, f, default=str)
+    return 1 if result["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_engine(json.loads(sys.argv[1])))
@@ -0,0 +1,179 @@
+import os
+import re
+import sys
+import json
+import logging
+import argparse
+import subprocess
+from datetime import datetime
+from urllib.parse import urlsplit
+from curl_cffi import requests
+from pymongo import MongoClient
+from server import StandInServer
+from fixtures import FixtureStore, request_key, path_of
+from settings import (
+    BENCH_DIR, FIXTURE_DIR, RESULT_DIR, SERVER_HOST, SERVER_PORT, MONGO_HOST,
+    CARBON38_DIR, CARBON38_FIXTURES, CARBON38_URL_DB, ENGINES, ENGINE_CONCURRENCY,
+    PARITY_REFERENCE, PARITY_FIELDS, SAMPLE_INTERVAL,
+)
+
+
+def normalise(item):
+    """Common shape for the four engines' outputs so fields can be compared"""
+    def text(value):
+        return re.sub(r"\s+", " ", str(value or "")).strip()
+
+    price = re.search(r"\d[\d,]*(?:\.\d+)?", text(item.get("price")))
+    images = item.get("images") or item.get("image_urls") or []
+    return {
+        "product_name": text(item.get("product_name")),
+        "brand": text(item.get("brand")),
+        "price": f"{float(price.group().replace(',', '')):.2f}" if price else "",
+        "colour": text(item.get("colour")).lower(),
+        "sizes": sorted(text(s) for s in item.get("sizes") or []),
+        "images": sorted({urlsplit(i if "//" in i else f"//{i}").path for i in images if i}),
+        "description": text(item.get("description")),
+    }
+
+
+class EngineBenchmark:
+    """Runs the carbon38 curl / Scrapy / Selenium / Playwright parsers over the same recorded pages"""
+
+    def __init__(self, engines=None, concurrency=ENGINE_CONCURRENCY, latency_ms=0, jitter_ms=0, limit=None):
+        self.engines = engines or ENGINES
+        self.concurrency = concurrency
+        self.limit = limit
+        self.store = FixtureStore(os.path.join(FIXTURE_DIR, CARBON38_FIXTURES))
+        self.server = StandInServer(CARBON38_FIXTURES, latency_ms, jitter_ms, 0.0)
+        self.results = {}
+        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        os.makedirs(RESULT_DIR, exist_ok=True)
+
+    def record(self, limit=50):
+        """Fetch live product pages once (urls from the Scrapy crawler's collection) into the fixture store"""
+        client = MongoClient(MONGO_HOST)
+        urls = [doc["url"] for doc in client[CARBON38_URL_DB]["product_urls"].find({}, {"url": 1}).limit(limit)]
+        client.close()
+
+        for url in urls:
+            try:
+                response = requests.get(url, impersonate="chrome", timeout=60)
+            except Exception as e:
+                logging.warning(f"Record failed for {url}: {e}")
+                continue
+            self.store.record(request_key("GET", url), "GET", url, response.status_code,
+                              response.headers.get("Content-Type", ""), response.content)
+            logging.info(f"Recorded {response.status_code} {url}")
+
+    def local_urls(self):
+        urls = [
+            f"http://{SERVER_HOST}:{SERVER_PORT}{path_of(entry['url'])}"
+            for entry in self.store.entries.values()
+            if entry["status"] == 200 and "/products/" in entry["url"]
+        ]
+        return urls[:self.limit] if self.limit else urls
+
+    def start(self):
+        urls = self.local_urls()
+        if not urls:
+            logging.error(f"No recorded product pages in {self.store.root}, run with --record first")
+            return
+
+        self.server.start()
+        for engine in self.engines:
+            logging.info(f"Running {engine} over {len(urls)} pages")
+            result_path = os.path.join(RESULT_DIR, f"engines_{self.run_id}_{engine}.json")
+            args = {
+                "engine": engine,
+                "urls": urls,
+                "carbon38_dir": CARBON38_DIR,
+                "concurrency": self.concurrency,
+                "server": f"{SERVER_HOST}:{SERVER_PORT}",
+                "server_host": SERVER_HOST,
+                "sample_interval": SAMPLE_INTERVAL,
+                "work_dir": os.path.join(RESULT_DIR, f"engines_{self.run_id}_{engine}"),
+                "result_path": result_path,
+            }
+            subprocess.run([sys.executable, os.path.join(BENCH_DIR, "engine_worker.py"), json.dumps(args)])
+
+            if not os.path.exists(result_path):
+                self.results[engine] = {"engine": engine, "error": "worker crashed", "items": []}
+                continue
+            with open(result_path, encoding="utf-8") as f:
+                self.results[engine] = json.load(f)
+
+    def parity(self):
+        """Per engine and field, share of reference products whose value matches the reference engine"""
+        def by_path(result):
+            return {urlsplit(item.get("product_url") or "").path: normalise(item) for item in result.get("items", [])}
+
+        reference = by_path(self.results.get(PARITY_REFERENCE, {}))
+        parity = {}
+        for engine, result in self.results.items():
+            items = by_path(result)
+            shared = [path for path in reference if path in items]
+            parity[engine] = {
+                field: (sum(items[p][field] == reference[p][field] for p in shared) / len(reference) * 100) if reference else 0.0
+                for field in PARITY_FIELDS
+            }
+        return parity
+
+    def report(self):
+        """products/sec, CPU and peak RSS per engine, then field parity against the reference engine"""
+        parity = self.parity()
+        headers = ["engine", "products", "products/sec", "cpu s", "cpu ms/product", "peak rss mb", "wall s", "parity %", "error"]
+        rows = []
+        for engine, r in self.results.items():
+            wall = r.get("wall_seconds", 0)
+            products = r.get("products", 0)
+            fields = parity.get(engine, {})
+            rows.append([
+                engine,
+                f"{products}/{r.get('pages', 0)}",
+                f"{products / wall:.2f}" if wall else "-",
+                f"{r.get('cpu_seconds', 0):.2f}",
+                f"{r.get('cpu_seconds', 0) / products * 1000:.1f}" if products else "-",
+                f"{r.get('peak_rss_mb', 0):.1f}",
+                f"{wall:.2f}",
+                f"{sum(fields.values()) / len(fields):.1f}" if fields else "-",
+                r.get("error", "")[:40],
+            ])
+
+        widths = [max(len(str(x)) for x in col) for col in zip(headers, *rows)]
+        lines = ["  ".join(str(v).ljust(w) for v, w in zip(row, widths)) for row in [headers] + rows]
+        lines.append(f"\nfield parity vs {PARITY_REFERENCE} (%):")
+        for engine, fields in parity.items():
+            lines.append(f"  {engine}: " + ", ".join(f"{field} {value:.0f}" for field, value in fields.items()))
+        print("\n".join(lines))
+
+        summary_path = os.path.join(RESULT_DIR, f"engines_{self.run_id}_summary.json")
+        with open(summary_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "server": self.server.stats,
+                "parity_reference": PARITY_REFERENCE,
+                "parity": parity,
+                "engines": [{k: v for k, v in r.items() if k != "items"} for r in self.results.values()],
+            }, f, indent=2)
+        logging.info(f"Summary written to {summary_path}")
+
+    def close(self):
+        if self.server.thread:
+            self.server.close()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Compare the carbon38 engines on the same recorded product pages")
+    arg_parser.add_argument("--engines", nargs="*", choices=ENGINES, help="engines to run, all by default")
+    arg_parser.add_argument("--record", type=int, metavar="N", help="record N live product pages before running")
+    arg_parser.add_argument("--limit", type=int, help="only use the first N recorded pages")
+    arg_parser.add_argument("--concurrency", type=int, default=ENGINE_CONCURRENCY, help="for Scrapy and Playwright")
+    arg_parser.add_argument("--latency", type=float, default=0, help="stand-in server latency in ms")
+    arg_parser.add_argument("--jitter", type=float, default=0, help="+/- latency jitter in ms")
+    args = arg_parser.parse_args()
+
+    benchmark = EngineBenchmark(args.engines, args.concurrency, args.latency, args.jitter, args.limit)
+    if args.record:
+        benchmark.record(args.record)
+    benchmark.start()
+    benchmark.report()
+    benchmark.close()
@@ -0,0 +1,77 @@
+import os
+import json
+import hashlib
+import threading
+from urllib.parse import urlsplit
+
+
+def path_of(url):
+    """Path plus query, how a browser pointed at the stand-in server asks for the page"""
+    parts = urlsplit(url)
+    return f"{parts.path or '/'}?{parts.query}" if parts.query else (parts.path or "/")
+
+
+def request_key(method, url, body=b""):
+    """Stable key for a request: method, full url and a digest of the body"""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    body_digest = hashlib.sha1(body or b"").hexdigest()
+    return hashlib.sha1(f"{method.upper()} {url} {body_digest}".encode("utf-8")).hexdigest()
+
+
+class FixtureStore:
+    """Recorded responses of one project, a manifest.jsonl plus one body file per key"""
+
+    def __init__(self, root):
+        self.root = root
+        self.manifest_path = os.path.join(self.root, "manifest.jsonl")
+        self.entries = {}
+        self.paths = {}
+        self.lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.manifest_path):
+            return
+        with open(self.manifest_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.entries[entry["key"]] = entry
+                    self.index_path(entry)
+
+    def index_path(self, entry):
+        if entry["method"] == "GET":
+            self.paths.setdefault(path_of(entry["url"]), entry["key"])
+
+    def key_for_path(self, path):
+        """Fixture key of a GET recorded for this path, for clients that cannot send the key header"""
+        return self.paths.get(path)
+
+    def get(self, key):
+        """Return (entry, body bytes) for a recorded request key, or (None, None)"""
+        entry = self.entries.get(key)
+        if not entry:
+            return None, None
+        with open(os.path.join(self.root, entry["file"]), "rb") as f:
+            return entry, f.read()
+
+    def record(self, key, method, url, status, content_type, content):
+        """Store a live response so it can be served by the stand-in server"""
+        entry = {
+            "key": key,
+            "method": method.upper(),
+            "url": url,
+            "status": status,
+            "content_type": content_type or "",
+            "file": f"{key}.body",
+        }
+        with self.lock:
+            with open(os.path.join(self.root, entry["file"]), "wb") as f:
+                f.write(content)
+            if key not in self.entries:
+                with open(self.manifest_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+            self.entries[key] = entry
+            self.index_path(entry)
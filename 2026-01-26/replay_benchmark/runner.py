@@ -0,0 +1,152 @@
+import os
+import sys
+import json
+import logging
+import argparse
+import subprocess
+from datetime import datetime
+from pymongo import MongoClient
+from server import StandInServer
+from worker import percentile
+from settings import (
+    REPO_DIR, BENCH_DIR, FIXTURE_DIR, RESULT_DIR, PROJECTS,
+    SERVER_HOST, SERVER_PORT, ORIGINAL_URL_HEADER, FIXTURE_KEY_HEADER,
+    MONGO_HOST, BENCH_DB_SUFFIX,
+)
+
+
+class Benchmark:
+    """Replays recorded fixtures through a project's crawler, parser and exporter stages"""
+
+    def __init__(self, project, mode="replay", stages=None, latency_ms=0, jitter_ms=0,
+                 error_rate=0.0, skip_sleep=False):
+        if project not in PROJECTS:
+            raise ValueError(f"Unknown project {project}, choose from {sorted(PROJECTS)}")
+        self.project = project
+        self.config = PROJECTS[project]
+        self.mode = mode
+        self.stages = [s for s in self.config["stages"] if not stages or s[0] in stages]
+        self.skip_sleep = skip_sleep
+        self.server = None
+        if self.mode == "replay":
+            self.server = StandInServer(project, latency_ms, jitter_ms, error_rate)
+        self.results = []
+        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        os.makedirs(RESULT_DIR, exist_ok=True)
+
+    def reset_database(self):
+        """Drop the benchmark copy of the project database so every run starts empty"""
+        client = MongoClient(MONGO_HOST)
+        client.drop_database(f"{self.config['db']}{BENCH_DB_SUFFIX}")
+        client.close()
+
+    def start(self):
+        if self.server:
+            self.server.start()
+
+        for module, cls in self.stages:
+            logging.info(f"[{self.project}] running {module}.{cls} ({self.mode})")
+            result_path = os.path.join(RESULT_DIR, f"{self.project}_{self.run_id}_{module}.json")
+            args = {
+                "project_dir": os.path.join(REPO_DIR, self.config["path"]),
+                "module": module,
+                "cls": cls,
+                "mode": self.mode,
+                "server": f"{SERVER_HOST}:{SERVER_PORT}",
+                "original_url_header": ORIGINAL_URL_HEADER,
+                "fixture_key_header": FIXTURE_KEY_HEADER,
+                "fixture_dir": os.path.join(FIXTURE_DIR, self.project),
+                "db_suffix": BENCH_DB_SUFFIX,
+                "skip_sleep": self.skip_sleep,
+                "export_path": os.path.join(RESULT_DIR, f"{self.project}_{self.run_id}_export.csv"),
+                "result_path": result_path,
+            }
+            subprocess.run([sys.executable, os.path.join(BENCH_DIR, "worker.py"), json.dumps(args)])
+
+            if not os.path.exists(result_path):
+                self.results.append({"stage": f"{module}.{cls}", "error": "worker crashed"})
+                continue
+            with open(result_path, encoding="utf-8") as f:
+                self.results.append(json.load(f))
+
+    def report(self):
+        """Per stage and total pages/sec, latency percentiles, CPU and peak RSS"""
+        rows = []
+        all_latencies = []
+        for r in self.results:
+            all_latencies.extend(r.get("latencies", []))
+            wall = r.get("wall_seconds", 0)
+            rows.append([
+                r["stage"],
+                r.get("requests", 0),
+                f"{r.get('requests', 0) / wall:.2f}" if wall else "-",
+                f"{r.get('p50_ms', 0):.1f}",
+                f"{r.get('p99_ms', 0):.1f}",
+                f"{r.get('cpu_seconds', 0):.2f}",
+                f"{r.get('peak_rss_mb', 0):.1f}",
+                f"{wall:.2f}",
+                r.get("error", "")[:40],
+            ])
+
+        total_wall = sum(r.get("wall_seconds", 0) for r in self.results)
+        rows.append([
+            "TOTAL",
+            len(all_latencies),
+            f"{len(all_latencies) / total_wall:.2f}" if total_wall else "-",
+            f"{percentile(all_latencies, 50) * 1000:.1f}",
+            f"{percentile(all_latencies, 99) * 1000:.1f}",
+            f"{sum(r.get('cpu_seconds', 0) for r in self.results):.2f}",
+            f"{max([r.get('peak_rss_mb', 0) for r in self.results] or [0]):.1f}",
+            f"{total_wall:.2f}",
+            "",
+        ])
+
+        headers = ["stage", "requests", "pages/sec", "p50 ms", "p99 ms", "cpu s", "peak rss mb", "wall s", "error"]
+        widths = [max(len(str(x)) for x in col) for col in zip(headers, *rows)]
+        lines = ["  ".join(str(v).ljust(w) for v, w in zip(row, widths)) for row in [headers] + rows]
+        if self.server:
+            lines.append(f"server: {self.server.stats}")
+        print("\n".join(lines))
+
+        summary_path = os.path.join(RESULT_DIR, f"{self.project}_{self.run_id}_summary.json")
+        with open(summary_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "project": self.project,
+                "mode": self.mode,
+                "server": self.server.stats if self.server else {},
+                "stages": [{k: v for k, v in r.items() if k != "latencies"} for r in self.results],
+            }, f, indent=2)
+        logging.info(f"Summary written to {summary_path}")
+
+    def close(self):
+        if self.server:
+            self.server.close()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Offline replay benchmark for crawler/parser/exporter stages")
+    arg_parser.add_argument("projects", nargs="+", choices=sorted(PROJECTS))
+    arg_parser.add_argument("--stages", nargs="*", help="stage modules to run, all by default")
+    arg_parser.add_argument("--record", action="store_true", help="hit the live site and record fixtures")
+    arg_parser.add_argument("--latency", type=float, default=0, help="stand-in server latency in ms")
+    arg_parser.add_argument("--jitter", type=float, default=0, help="+/- latency jitter in ms")
+    arg_parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    arg_parser.add_argument("--skip-sleep", action="store_true", help="disable time.sleep pacing inside stages")
+    arg_parser.add_argument("--fresh", action="store_true", help="drop the benchmark database before running")
+    args = arg_parser.parse_args()
+
+    for project in args.projects:
+        benchmark = Benchmark(
+            project,
+            mode="record" if args.record else "replay",
+            stages=args.stages,
+            latency_ms=args.latency,
+            jitter_ms=args.jitter,
+            error_rate=args.error_rate,
+            skip_sleep=args.skip_sleep,
+        )
+        if args.fresh:
+            benchmark.reset_database()
+        benchmark.start()
+        benchmark.report()
+        benchmark.close()
@@ -0,0 +1,90 @@
+import os
+import time
+import random
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from fixtures import FixtureStore
+from settings import (
+    FIXTURE_DIR, SERVER_HOST, SERVER_PORT, ORIGINAL_URL_HEADER, FIXTURE_KEY_HEADER,
+    DEFAULT_LATENCY_MS, DEFAULT_JITTER_MS, DEFAULT_ERROR_RATE,
+)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves the recorded fixture named by the key header the worker attaches"""
+
+    def do_GET(self):
+        self.serve("GET")
+
+    def do_POST(self):
+        self.serve("POST")
+
+    def serve(self, method):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        url = self.headers.get(ORIGINAL_URL_HEADER, "")
+        server = self.server
+        key = self.headers.get(FIXTURE_KEY_HEADER) or server.store.key_for_path(self.path) or ""
+
+        delay = server.latency_ms + random.uniform(-server.jitter_ms, server.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        if random.random() < server.error_rate:
+            server.count("errors")
+            self.reply(503, b"injected error", "text/plain")
+            return
+
+        entry, content = server.store.get(key)
+        if entry is None:
+            server.count("misses")
+            logging.warning(f"No fixture for {method} {url}")
+            self.reply(404, b"no fixture", "text/plain")
+            return
+
+        server.count("hits")
+        self.reply(entry["status"], content, entry["content_type"])
+
+    def reply(self, status, content, content_type):
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Local stand-in site with configurable latency and error rate"""
+
+    daemon_threads = True
+
+    def __init__(self, project, latency_ms=DEFAULT_LATENCY_MS, jitter_ms=DEFAULT_JITTER_MS,
+                 error_rate=DEFAULT_ERROR_RATE, host=SERVER_HOST, port=SERVER_PORT):
+        super().__init__((host, port), StandInHandler)
+        self.store = FixtureStore(os.path.join(FIXTURE_DIR, project))
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.stats = {"hits": 0, "misses": 0, "errors": 0}
+        self.stats_lock = threading.Lock()
+        self.thread = None
+
+    def count(self, name):
+        with self.stats_lock:
+            self.stats[name] += 1
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        logging.info(f"Stand-in server on http://{self.server_address[0]}:{self.server_address[1]} "
+                     f"({len(self.store.entries)} fixtures)")
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
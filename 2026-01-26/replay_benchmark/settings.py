@@ -0,0 +1,76 @@
+import os
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s:%(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+"""PATHS"""
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(os.path.dirname(BENCH_DIR))
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+RESULT_DIR = os.path.join(BENCH_DIR, "results")
+
+"""STAND-IN SERVER"""
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+DEFAULT_LATENCY_MS = 0
+DEFAULT_JITTER_MS = 0
+DEFAULT_ERROR_RATE = 0.0
+ORIGINAL_URL_HEADER = "X-Bench-Original-Url"
+FIXTURE_KEY_HEADER = "X-Bench-Fixture-Key"
+
+"""MONGO SETTINGS"""
+MONGO_HOST = "mongodb://localhost:27017/"
+BENCH_DB_SUFFIX = "_bench"
+
+"""PROJECTS
+Each stage is (module, class) and runs in its own process with the project
+directory as working directory, in the order listed.
+"""
+PROJECTS = {
+    "aldi": {
+        "path": "2025-12-05/Aldi",
+        "db": "aldi_db",
+        "stages": [
+            ("category_crawler", "CategoryCrawler"),
+            ("crawler", "ProductCrawler"),
+            ("parser", "Parser"),
+            ("exporter", "Export"),
+        ],
+    },
+    "rewe": {
+        "path": "2025-10-17/rewe",
+        "db": "rewe_db",
+        "stages": [
+            ("crawler", "Crawler"),
+            ("parser", "Parser"),
+            ("exporter", "Export"),
+        ],
+    },
+    "haraj": {
+        "path": "2025-11-13/haraj",
+        "db": "haraj_property_db",
+        "stages": [
+            ("category_crawler", "Crawler"),
+            ("crawler", "Crawler"),
+            ("post_parser", "Parser"),
+            ("parser", "Parser"),
+        ],
+    },
+}
+
+"""ENGINE COMPARISON
+The four carbon38 implementations parse the same recorded product pages,
+served by path from the stand-in server.
+"""
+CARBON38_DIR = os.path.join(REPO_DIR, "2025-09-12")
+CARBON38_FIXTURES = "carbon38"
+CARBON38_URL_DB = "carbon38_scraper"
+ENGINES = ["curl", "scrapy", "selenium", "playwright"]
+ENGINE_CONCURRENCY = 5
+PARITY_REFERENCE = "curl"
+PARITY_FIELDS = ["product_name", "brand", "price", "colour", "sizes", "images", "description"]
+SAMPLE_INTERVAL = 0.2  # seconds between process-tree CPU/RSS samples
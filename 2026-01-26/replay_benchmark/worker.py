@@ -0,0 +1,172 @@
+"""Runs one project stage inside the project directory with its HTTP clients
+routed through the stand-in server (replay) or recorded to fixtures (record).
+
+Started by runner.py, never imports the benchmark settings module because the
+project's own settings.py has to win the `from settings import ...` lookups.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import inspect
+import logging
+import resource
+import importlib
+import importlib.util
+from urllib.parse import urlencode, urlsplit, urlunsplit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_fixtures_module():
+    spec = importlib.util.spec_from_file_location("bench_fixtures", os.path.join(BENCH_DIR, "fixtures.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def full_url(url, params):
+    """Url with params merged in, the way the client would send it"""
+    if not params:
+        return url
+    query = params if isinstance(params, str) else urlencode(params, doseq=True)
+    parts = urlsplit(url)
+    merged = f"{parts.query}&{query}" if parts.query else query
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, merged, parts.fragment))
+
+
+def canonical_body(data=None, json_body=None):
+    """Body used for the fixture key, independent of client serialisation"""
+    if json_body is not None:
+        return json.dumps(json_body, sort_keys=True)
+    if isinstance(data, dict):
+        return urlencode(sorted(data.items()))
+    return data or b""
+
+
+class Transport:
+    """Wraps Session.request of requests / curl_cffi and measures every call"""
+
+    def __init__(self, args, store, fixtures):
+        self.mode = args["mode"]
+        self.server = args["server"]
+        self.url_header = args["original_url_header"]
+        self.key_header = args["fixture_key_header"]
+        self.store = store
+        self.fixtures = fixtures
+        self.latencies = []
+        self.statuses = {}
+        self.bytes = 0
+
+    def install(self):
+        for module_name in ("requests", "curl_cffi.requests"):
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError:
+                continue
+            self.patch(module.Session)
+
+    def patch(self, session_cls):
+        original = session_cls.request
+        transport = self
+
+        def request(session, method, url, *args, **kwargs):
+            return transport.send(original, session, method, url, *args, **kwargs)
+
+        session_cls.request = request
+
+    def send(self, original, session, method, url, *args, **kwargs):
+        target = full_url(url, kwargs.get("params"))
+        key = self.fixtures.request_key(method, target, canonical_body(kwargs.get("data"), kwargs.get("json")))
+
+        if self.mode == "replay":
+            parts = urlsplit(target)
+            url = urlunsplit(("http", self.server, parts.path or "/", parts.query, ""))
+            kwargs["params"] = None
+            headers = dict(kwargs.get("headers") or {})
+            headers[self.url_header] = target
+            headers[self.key_header] = key
+            kwargs["headers"] = headers
+
+        started = time.perf_counter()
+        response = original(session, method, url, *args, **kwargs)
+        self.latencies.append(time.perf_counter() - started)
+
+        content = response.content or b""
+        self.bytes += len(content)
+        self.statuses[str(response.status_code)] = self.statuses.get(str(response.status_code), 0) + 1
+
+        if self.mode == "record":
+            self.store.record(key, method, target, response.status_code,
+                              response.headers.get("Content-Type", ""), content)
+        return response
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_stage(args):
+    sys.path[0] = args["project_dir"]
+    os.chdir(args["project_dir"])
+
+    """Point the project at the benchmark database and off its HTTP cache before any stage module imports it"""
+    project_settings = importlib.import_module("settings")
+    if hasattr(project_settings, "MONGO_DB"):
+        project_settings.MONGO_DB = f"{project_settings.MONGO_DB}{args['db_suffix']}"
+    if hasattr(project_settings, "HTTP_CACHE"):
+        project_settings.HTTP_CACHE = False
+
+    fixtures = load_fixtures_module()
+    store = fixtures.FixtureStore(args["fixture_dir"])
+    transport = Transport(args, store, fixtures)
+    transport.install()
+
+    if args["skip_sleep"]:
+        time.sleep = lambda seconds: None
+
+    module = importlib.import_module(args["module"])
+    stage_cls = getattr(module, args["cls"])
+
+    result = {"stage": f"{args['module']}.{args['cls']}", "error": ""}
+    export_file = None
+    started = time.perf_counter()
+    try:
+        if "writer" in inspect.signature(stage_cls.__init__).parameters:
+            export_file = open(args["export_path"], "w", newline="", encoding="utf-8")
+            stage = stage_cls(csv.writer(export_file))
+        else:
+            stage = stage_cls()
+        stage.start()
+        stage.close()
+    except Exception as e:
+        logging.exception(f"Stage {result['stage']} failed")
+        result["error"] = repr(e)
+    finally:
+        if export_file:
+            export_file.close()
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    result.update({
+        "wall_seconds": time.perf_counter() - started,
+        "cpu_seconds": usage.ru_utime + usage.ru_stime,
+        "peak_rss_mb": usage.ru_maxrss / 1024,
+        "requests": len(transport.latencies),
+        "bytes": transport.bytes,
+        "statuses": transport.statuses,
+        "latencies": transport.latencies,
+        "p50_ms": percentile(transport.latencies, 50) * 1000,
+        "p99_ms": percentile(transport.latencies, 99) * 1000,
+    })
+    with open(args["result_path"], "w", encoding="utf-8") as f:
+        json.dump(result, f)
+    return 1 if result["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_stage(json.loads(sys.argv[1])))